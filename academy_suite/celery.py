@@ -0,0 +1,13 @@
+import os
+from celery import Celery
+
+# Set the default Django settings module for the 'celery' program.
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'academy_suite.settings')
+
+app = Celery('academy_suite')
+
+# All Celery settings live in settings.py under the CELERY_ namespace.
+app.config_from_object('django.conf:settings', namespace='CELERY')
+
+# Load tasks.py modules from all installed apps.
+app.autodiscover_tasks()
@@ -81,6 +81,38 @@ DATABASES = {
     }
 }
 
+# --- Cache (shared by all gunicorn workers when Redis is configured) ---
+REDIS_URL = os.getenv('REDIS_URL')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# --- Enrollment activity ---
+# Lesson page views are buffered per worker and written at most this many seconds later.
+LAST_ACCESS_FLUSH_SECONDS = int(os.getenv('LAST_ACCESS_FLUSH_SECONDS', 5))
+
+# --- Celery (background jobs) ---
+CELERY_BROKER_URL = os.getenv('CELERY_BROKER_URL', REDIS_URL or 'redis://localhost:6379/0')
+CELERY_TASK_IGNORE_RESULT = True
+CELERY_BEAT_SCHEDULE = {
+    # Corrects any drift in the admin dashboard's incrementally maintained counters.
+    'refresh-platform-stats': {
+        'task': 'apps.reports.tasks.refresh_platform_stats_task',
+        'schedule': int(os.getenv('PLATFORM_STATS_REFRESH_SECONDS', 15 * 60)),
+        'kwargs': {'estimate': os.getenv('PLATFORM_STATS_ESTIMATE', 'False') == 'True'},
+    },
+}
+
 # --- Authentication ---
 AUTH_USER_MODEL = 'users.CustomUser'
 
@@ -1,5 +1,6 @@
 from django.contrib import admin
 from .models import Contract
+from apps.enrollment.services import enroll_contract_students
 
 @admin.register(Contract)
 class ContractAdmin(admin.ModelAdmin):
@@ -12,6 +13,7 @@ class ContractAdmin(admin.ModelAdmin):
     
     # Use filter_horizontal for a better experience with ManyToManyFields
     filter_horizontal = ('enrolled_students', 'learning_paths')
+    actions = ['enroll_students']
     
     fieldsets = (
         (None, {
@@ -35,4 +37,10 @@ class ContractAdmin(admin.ModelAdmin):
         # Filter the 'enrolled_students' selector to only show users with the 'student' role
         if db_field.name == "enrolled_students":
             kwargs["queryset"] = settings.AUTH_USER_MODEL.objects.filter(role='student')
-        return super().formfield_for_manytomany(db_field, request, **kwargs)
\ No newline at end of file
+        return super().formfield_for_manytomany(db_field, request, **kwargs)
+
+    @admin.action(description="Enroll contract students into its learning paths")
+    def enroll_students(self, request, queryset):
+        for contract in queryset:
+            totals = enroll_contract_students(contract)
+            self.message_user(request, f"{contract}: {totals['created']} enrolled, {totals['skipped']} already enrolled.")
\ No newline at end of file
@@ -3,4 +3,8 @@ from django.apps import AppConfig
 
 class ContractsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'apps.contracts'
\ No newline at end of file
+    name = 'apps.contracts'
+
+    def ready(self):
+        # This imports the signals file when the app is ready
+        import apps.contracts.signals
@@ -0,0 +1,93 @@
+# =================================================================
+# apps/contracts/services.py
+# -----------------------------------------------------------------
+# KEEPS THE SYSTEM INTEGRATED: This new file builds the contract
+# progress rollup shared by the client dashboard and the Excel
+# export. All per-student figures come from one grouped MongoDB
+# aggregation, and the result is cached per contract.
+# =================================================================
+
+from django.core.cache import cache
+
+from apps.core.cache import bump_version, versioned_key
+from apps.enrollment.models import Enrollment
+
+# Progress changes constantly, so the rollup is only reused for a short while.
+CONTRACT_ROLLUP_CACHE_TIMEOUT = 60 * 5
+
+
+def contract_scope(contract_id):
+    """ The cache-version scope for everything derived from a contract. """
+    return f'contract:{contract_id}'
+
+
+def aggregate_student_progress(student_ids):
+    """
+    Returns {student_id: stats} for the given students in a single aggregation.
+    Each stats dict holds the average progress across the student's enrollments,
+    the number of enrollments and completed enrollments, and the last activity.
+    """
+    if not student_ids:
+        return {}
+    pipeline = [
+        {'$match': {'student_id': {'$in': list(student_ids)}}},
+        {'$group': {
+            '_id': '$student_id',
+            'progress_sum': {'$sum': '$progress'},
+            'enrollments': {'$sum': 1},
+            'completed': {'$sum': {'$cond': [{'$eq': ['$status', 'completed']}, 1, 0]}},
+            'last_activity_at': {'$max': {'$ifNull': ['$last_activity_at', '$enrollment_date']}},
+        }},
+    ]
+    return {row.pop('_id'): row for row in Enrollment.objects.mongo_aggregate(pipeline)}
+
+
+def build_contract_rollup(contract):
+    """
+    Computes the contract rollup: totals for the contract plus one row per
+    contracted student, in the order the students are stored on the contract.
+    """
+    students = list(contract.enrolled_students.values('id', 'username', 'full_name', 'email', 'date_joined'))
+    stats = aggregate_student_progress([student['id'] for student in students])
+
+    employees = []
+    total_progress = 0
+    total_enrollments = 0
+    for student in students:
+        row = stats.get(student['id'], {})
+        enrollments = row.get('enrollments', 0)
+        progress_sum = row.get('progress_sum', 0)
+        total_progress += progress_sum
+        total_enrollments += enrollments
+        employees.append({
+            'id': student['id'],
+            'name': student['full_name'] or student['username'],
+            'email': student['email'],
+            'date_joined': student['date_joined'],
+            'progress': progress_sum / enrollments if enrollments else 0,
+            'enrollments': enrollments,
+            'completed': row.get('completed', 0),
+            'last_activity_at': row.get('last_activity_at'),
+        })
+
+    return {
+        'total_employees': len(students),
+        # Matches the previous Avg('progress') over all of the contract's enrollments.
+        'average_progress': total_progress / total_enrollments if total_enrollments else 0,
+        'employees': employees,
+    }
+
+
+def get_contract_rollup(contract):
+    """ Returns the (cached) rollup for a contract. """
+    cache_key = versioned_key(contract_scope(contract.pk), 'rollup')
+    rollup = cache.get(cache_key)
+    if rollup is None:
+        rollup = build_contract_rollup(contract)
+        cache.set(cache_key, rollup, CONTRACT_ROLLUP_CACHE_TIMEOUT)
+    return rollup
+
+
+def invalidate_contract(contract_id):
+    """ Drops the cached rollup, e.g. when the contract's students change. """
+    bump_version(contract_scope(contract_id))
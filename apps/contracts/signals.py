@@ -0,0 +1,20 @@
+from django.db.models.signals import post_save, m2m_changed
+from django.dispatch import receiver
+from apps.core.cache import invalidate_dashboards
+from .models import Contract
+from .services import invalidate_contract
+
+@receiver(post_save, sender=Contract)
+@receiver(m2m_changed, sender=Contract.enrolled_students.through)
+def invalidate_contract_rollup(sender, instance, **kwargs):
+    """
+    The cached rollup lists the contract's students, so it is rebuilt whenever
+    the contract or its student list changes.
+    """
+    contracts = [instance] if isinstance(instance, Contract) else (
+        # Reverse m2m change (from the user side): invalidate every affected contract.
+        Contract.objects.filter(pk__in=kwargs.get('pk_set') or [])
+    )
+    for contract in contracts:
+        invalidate_contract(contract.pk)
+        invalidate_dashboards('client', [contract.client_id])
@@ -10,10 +10,9 @@
 from django.views import View
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.shortcuts import get_object_or_404, redirect
-from django.db.models import Avg
 
 from .models import Contract
-from apps.enrollment.models import Enrollment
+from .services import get_contract_rollup
 from apps.reports.services.excel_generator import ExcelReportGenerator
 from apps.users.models import CustomUser
 
@@ -30,24 +29,17 @@ class ExportContractReportView(LoginRequiredMixin, UserPassesTestMixin, View):
         contract = get_object_or_404(Contract, pk=self.kwargs['pk'])
         
         # --- Data Gathering Logic (Live Data) ---
-        # Get all students associated with this contract
-        enrolled_students_qs = contract.enrolled_students.all()
-        student_ids = enrolled_students_qs.values_list('id', flat=True)
-        
-        # Get all their enrollments
-        all_enrollments = Enrollment.objects.filter(student_id__in=student_ids)
-        
+        # The same cached rollup the client dashboard shows: one aggregation for all students.
+        rollup = get_contract_rollup(contract)
+
         report_data = []
-        for student in enrolled_students_qs:
-            # Calculate the average progress for this specific student across all their enrollments
-            avg_progress = all_enrollments.filter(student=student).aggregate(Avg('progress'))['progress__avg'] or 0
-            
+        for employee in rollup['employees']:
             report_data.append({
-                'student_name': student.full_name or student.username,
-                'student_email': student.email,
-                'enrollment_date': student.date_joined.strftime("%Y-%m-%d"), # Approximation of enrollment date
-                'progress': f"{avg_progress:.2f}", # Format to 2 decimal places
-                'status': 'Completed' if avg_progress >= 100 else 'In Progress',
+                'student_name': employee['name'],
+                'student_email': employee['email'],
+                'enrollment_date': employee['date_joined'].strftime("%Y-%m-%d"), # Approximation of enrollment date
+                'progress': f"{employee['progress']:.2f}", # Format to 2 decimal places
+                'status': 'Completed' if employee['progress'] >= 100 else 'In Progress',
             })
         
         # --- Generate and Return Excel File ---
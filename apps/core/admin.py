@@ -0,0 +1,22 @@
+from django.contrib import admin
+from django.utils import timezone
+from .models import OutboxEvent
+
+@admin.register(OutboxEvent)
+class OutboxEventAdmin(admin.ModelAdmin):
+    """
+    Admin interface for inspecting webhook deliveries and the dead-letter store.
+    """
+    list_display = ('event_type', 'status', 'attempts', 'next_attempt_at', 'created_at', 'delivered_at')
+    list_filter = ('status', 'event_type')
+    search_fields = ('event_type', 'last_error')
+    actions = ['requeue_events']
+
+    @admin.action(description="Requeue selected events for delivery")
+    def requeue_events(self, request, queryset):
+        updated = queryset.exclude(status=OutboxEvent.Status.DELIVERED).update(
+            status=OutboxEvent.Status.PENDING,
+            attempts=0,
+            next_attempt_at=timezone.now(),
+        )
+        self.message_user(request, f"{updated} event(s) requeued.")
@@ -0,0 +1,100 @@
+# =================================================================
+# apps/core/api/pagination.py
+# -----------------------------------------------------------------
+# KEEPS THE SYSTEM INTEGRATED: This new file provides cursor (keyset)
+# pagination for list APIs that read raw MongoDB documents. A page is
+# one indexed `_id > cursor` range query with a projection, so its
+# cost does not grow with how deep into the collection a client is,
+# and each list only reads the fields it serializes.
+# =================================================================
+
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as Base64Error
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class MongoCursorPagination(BasePagination):
+    """
+    Forward-only pagination in `_id` order. Responses look like
+    {'next': <url or null>, 'results': [...]}; clients follow `next` until it
+    is null. Documents inserted while a client pages through are picked up if
+    they sort after its cursor, and none are ever returned twice.
+    """
+    cursor_query_param = 'cursor'
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    invalid_cursor_message = 'Invalid cursor'
+
+    def get_page_size(self, request):
+        try:
+            requested = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(requested, 1), self.max_page_size)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            return ObjectId(urlsafe_b64decode(encoded.encode()).decode())
+        except (Base64Error, InvalidId, UnicodeDecodeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, object_id):
+        return urlsafe_b64encode(str(object_id).encode()).decode()
+
+    def paginate_documents(self, manager, query, projection, request, view=None):
+        """ Returns the raw documents of the requested page of `manager.mongo_find(query, projection)`. """
+        self.request = request
+        page_size = self.get_page_size(request)
+        after = self.decode_cursor(request)
+        if after is not None:
+            query = {'$and': [query, {'_id': {'$gt': after}}]} if query else {'_id': {'$gt': after}}
+        documents = list(manager.mongo_find(query, projection).sort('_id', 1).limit(page_size + 1))
+        # The extra document only tells whether a next page exists.
+        self.next_cursor = documents[page_size - 1]['_id'] if len(documents) > page_size else None
+        return documents[:page_size]
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        return replace_query_param(
+            self.request.build_absolute_uri(), self.cursor_query_param, self.encode_cursor(self.next_cursor),
+        )
+
+    def get_paginated_response(self, data):
+        return Response({'next': self.get_next_link(), 'results': data})
+
+
+class MongoListMixin:
+    """
+    Replaces a viewset's list action with a cursor-paginated read of raw
+    documents. Views describe the read with get_list_query() and
+    get_list_projection(), and can wrap each document with to_list_item()
+    before it reaches the list serializer.
+    """
+    pagination_class = MongoCursorPagination
+
+    def get_list_query(self):
+        return {}
+
+    def get_list_projection(self):
+        return None
+
+    def to_list_item(self, document):
+        return document
+
+    def list(self, request, *args, **kwargs):
+        documents = self.paginator.paginate_documents(
+            self.queryset.model.objects, self.get_list_query(), self.get_list_projection(), request, view=self,
+        )
+        items = [self.to_list_item(document) for document in documents]
+        return self.paginator.get_paginated_response(self.get_serializer(items, many=True).data)
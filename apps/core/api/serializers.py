@@ -0,0 +1,51 @@
+# =================================================================
+# apps/core/api/serializers.py
+# -----------------------------------------------------------------
+# KEEPS THE SYSTEM INTEGRATED: This new file lets API clients choose
+# the fields they receive. `?fields=` keeps only the listed fields
+# and `?expand=` adds the heavy fields a serializer leaves out by
+# default, such as a course's lessons in list responses.
+# =================================================================
+
+
+def query_param_set(request, name):
+    """ Parses a comma-separated query parameter, e.g. ?fields=_id,title, into a set. """
+    if request is None:
+        return set()
+    return {value.strip() for value in request.query_params.get(name, '').split(',') if value.strip()}
+
+
+class SparseFieldsetsMixin:
+    """
+    Serializer mixin for `?fields=a,b` and `?expand=c`. Fields named in
+    Meta.expandable_fields are only included when expanded (or explicitly
+    listed in `fields`). Views can call requested_fields() to shrink their
+    MongoDB projection to match.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        for name in set(self.fields) - self.requested_fields(request, self.fields):
+            self.fields.pop(name)
+
+    @classmethod
+    def requested_fields(cls, request, available):
+        """ Returns which of the `available` field names the request asks for. """
+        meta = getattr(cls, 'Meta', None)
+        expandable = set(getattr(meta, 'expandable_fields', ()))
+        only = query_param_set(request, 'fields')
+        expand = query_param_set(request, 'expand')
+        selected = (set(available) - expandable) | (expandable & expand)
+        return (set(available) & only) if only else selected
+
+
+def sparse_projection(serializer_class, request, sources):
+    """
+    Builds the MongoDB projection for a request from the serializer fields it asks
+    for, so unrequested fields are never read. `sources` maps serializer fields to
+    the document fields they are built from (by default, a field of the same name).
+    """
+    fields = serializer_class.requested_fields(request, serializer_class._declared_fields)
+    projection = {source: 1 for field in fields for source in sources.get(field, [field])}
+    return projection or {'_id': 1}
@@ -0,0 +1,96 @@
+# =================================================================
+# apps/core/http.py
+# -----------------------------------------------------------------
+# KEEPS THE SYSTEM INTEGRATED: This new file adds conditional GET
+# support. Responses carry a strong ETag (and Last-Modified where the
+# document records it), and a client revalidating with matching
+# validators gets a 304 before any heavy serialization or template
+# rendering happens.
+# =================================================================
+
+import hashlib
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+from apps.core.cache import get_version
+
+# The only fields read to validate a cached document.
+VALIDATOR_PROJECTION = {'content_version': 1, 'updated_at': 1}
+
+
+def make_etag(*parts):
+    """ Builds a strong ETag from the values a response is rendered from. """
+    digest = hashlib.sha1('|'.join(str(part) for part in parts).encode()).hexdigest()
+    return f'"{digest}"'
+
+
+def set_validators(response, etag, last_modified=None):
+    """
+    Adds the validators to a response. Clients may store it but must revalidate
+    before every reuse, so changes are always picked up.
+    """
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def conditional_response(request, etag, last_modified=None):
+    """
+    Returns a 304 Not Modified response (or 412 for a failed precondition) when
+    the request's validators match, otherwise None and the view renders as usual.
+    """
+    timestamp = int(last_modified.timestamp()) if last_modified is not None else None
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    return set_validators(response, etag, last_modified) if response is not None else None
+
+
+class ConditionalGetMixin:
+    """
+    Conditional GET for DRF viewsets over documents that carry `content_version`
+    and `updated_at`. Detail requests are validated from a projected read of those
+    two fields, before the document is loaded. List requests are validated against
+    the cache version of `list_version_scope`, which must be bumped whenever any
+    document of the collection changes.
+    """
+    list_version_scope = None
+
+    def get_detail_validators(self):
+        """ Returns (etag, last_modified) for the requested document, or None if it does not exist. """
+        model = self.queryset.model
+        try:
+            object_id = ObjectId(str(self.kwargs[self.lookup_url_kwarg or self.lookup_field]))
+        except (InvalidId, TypeError):
+            return None
+        document = model.objects.mongo_find_one({'_id': object_id}, VALIDATOR_PROJECTION)
+        if document is None:
+            return None
+        # The query string (?fields=, ?expand=) changes the body, so it is part of the tag.
+        etag = make_etag(model._meta.label, object_id, document.get('content_version', 0), self.request.get_full_path())
+        return etag, document.get('updated_at')
+
+    def get_list_validators(self):
+        if self.list_version_scope is None:
+            return None
+        model = self.queryset.model
+        etag = make_etag(model._meta.label, get_version(self.list_version_scope), self.request.get_full_path())
+        return etag, None
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._conditional(self.get_detail_validators(), super().retrieve, request, *args, **kwargs)
+
+    def list(self, request, *args, **kwargs):
+        return self._conditional(self.get_list_validators(), super().list, request, *args, **kwargs)
+
+    def _conditional(self, validators, handler, request, *args, **kwargs):
+        if validators is None:
+            return handler(request, *args, **kwargs)
+        not_modified = conditional_response(request, *validators)
+        if not_modified is not None:
+            return not_modified
+        response = handler(request, *args, **kwargs)
+        return set_validators(response, *validators) if response.status_code == 200 else response
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+from apps.core.outbox import OutboxDispatcher
+
+class Command(BaseCommand):
+    help = "Delivers queued webhooks from the outbox (runs until stopped unless --once is given)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Deliver one batch and exit.")
+        parser.add_argument('--workers', type=int, default=8, help="Maximum concurrent HTTP deliveries.")
+        parser.add_argument('--batch-size', type=int, default=100, help="Events claimed per batch.")
+        parser.add_argument('--max-attempts', type=int, default=8, help="Attempts before an event becomes a dead letter.")
+        parser.add_argument('--poll-interval', type=float, default=1.0, help="Seconds to wait when nothing is due.")
+
+    def handle(self, *args, **options):
+        dispatcher = OutboxDispatcher(
+            max_workers=options['workers'],
+            batch_size=options['batch_size'],
+            max_attempts=options['max_attempts'],
+        )
+        try:
+            if options['once']:
+                processed = dispatcher.run_once()
+                self.stdout.write(self.style.SUCCESS(f"Processed {processed} outbox event(s)."))
+            else:
+                self.stdout.write("Outbox dispatcher started. Press Ctrl+C to stop.")
+                dispatcher.run_forever(poll_interval=options['poll_interval'])
+        except KeyboardInterrupt:
+            self.stdout.write("Outbox dispatcher stopped.")
+        finally:
+            dispatcher.close()
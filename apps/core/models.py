@@ -0,0 +1,38 @@
+from djongo import models
+from django.utils import timezone
+
+class OutboxEvent(models.Model):
+    """
+    A webhook waiting to be delivered to an external service (e.g., n8n).
+    Events are written in the same save path as the change they describe and
+    delivered later by the outbox dispatcher, so requests never wait on the network.
+    """
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'Pending'
+        PROCESSING = 'processing', 'Processing'
+        DELIVERED = 'delivered', 'Delivered'
+        DEAD = 'dead', 'Dead Letter'
+
+    _id = models.ObjectIdField()
+    event_type = models.CharField(max_length=100)
+    url = models.URLField(max_length=500)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    lock_token = models.CharField(max_length=32, blank=True, null=True)
+    locked_until = models.DateTimeField(blank=True, null=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    delivered_at = models.DateTimeField(blank=True, null=True)
+
+    objects = models.DjongoManager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+            models.Index(fields=['lock_token']),
+        ]
+
+    def __str__(self):
+        return f"{self.event_type} ({self.status})"
@@ -0,0 +1,9 @@
+from django.db import connections
+
+
+def get_collection(model, using='default'):
+    """
+    Returns the raw pymongo collection behind a model. Useful for models such
+    as CustomUser whose manager is not a DjongoManager (no `mongo_*` methods).
+    """
+    return connections[using].cursor().db_conn[model._meta.db_table]
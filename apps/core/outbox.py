@@ -0,0 +1,150 @@
+# =================================================================
+# apps/core/outbox.py
+# -----------------------------------------------------------------
+# KEEPS THE SYSTEM INTEGRATED: This new file implements the webhook
+# outbox. Signals only record an OutboxEvent; the dispatcher below
+# delivers events in the background with a pooled HTTP session,
+# bounded concurrency, retries with exponential backoff and a
+# dead-letter state for events that keep failing.
+# =================================================================
+
+import logging
+import os
+import random
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+import requests
+from django.utils import timezone
+from pymongo import UpdateOne
+from requests.adapters import HTTPAdapter
+
+from .models import OutboxEvent
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_webhook(event_type, url_setting, payload):
+    """
+    Records a webhook for background delivery. `url_setting` is the name of the
+    environment variable holding the target URL; nothing is recorded if it is unset.
+    """
+    webhook_url = os.getenv(url_setting)
+    if not webhook_url:
+        logger.warning(f"{url_setting} is not set. Skipping webhook.")
+        return None
+    return OutboxEvent.objects.create(event_type=event_type, url=webhook_url, payload=payload)
+
+
+class OutboxDispatcher:
+    """
+    Delivers pending OutboxEvents. Several dispatchers can run side by side:
+    each claims a batch with a unique lock token, and a claim that is not
+    finished before its lease expires is picked up again by another dispatcher.
+
+    Worker threads only perform HTTP calls; all database writes happen on the
+    calling thread, with one bulk write per batch.
+    """
+
+    def __init__(self, max_workers=8, batch_size=100, max_attempts=8, timeout=10,
+                 base_delay=5, max_delay=60 * 60, lease_seconds=120):
+        self.max_workers = max_workers
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.timeout = timeout
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.lease_seconds = lease_seconds
+
+        # One pooled session: connections to n8n are reused across deliveries.
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='outbox')
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        self.session.close()
+
+    def claim_batch(self):
+        """ Claims up to `batch_size` due events and returns them as raw documents. """
+        now = timezone.now()
+        due = {'$or': [
+            {'status': OutboxEvent.Status.PENDING, 'next_attempt_at': {'$lte': now}},
+            # Claims whose dispatcher died before finishing.
+            {'status': OutboxEvent.Status.PROCESSING, 'locked_until': {'$lt': now}},
+        ]}
+        candidate_ids = [
+            document['_id'] for document in
+            OutboxEvent.objects.mongo_find(due, {'_id': 1}).sort('next_attempt_at', 1).limit(self.batch_size)
+        ]
+        if not candidate_ids:
+            return []
+
+        lock_token = uuid.uuid4().hex
+        # Re-checking the due condition makes the claim safe against other dispatchers.
+        OutboxEvent.objects.mongo_update_many(
+            {'_id': {'$in': candidate_ids}, **due},
+            {
+                '$set': {
+                    'status': OutboxEvent.Status.PROCESSING,
+                    'lock_token': lock_token,
+                    'locked_until': now + timedelta(seconds=self.lease_seconds),
+                },
+                '$inc': {'attempts': 1},
+            },
+        )
+        return list(OutboxEvent.objects.mongo_find(
+            {'lock_token': lock_token, 'status': OutboxEvent.Status.PROCESSING},
+            {'_id': 1, 'url': 1, 'payload': 1, 'attempts': 1, 'event_type': 1},
+        ))
+
+    def deliver(self, event):
+        """ POSTs one event. Returns None on success or an error message. """
+        try:
+            response = self.session.post(event['url'], json=event['payload'], timeout=self.timeout)
+            response.raise_for_status() # Raises an HTTPError for bad responses (4xx or 5xx)
+            return None
+        except requests.exceptions.RequestException as e:
+            return str(e)
+
+    def backoff(self, attempts):
+        """ Exponential backoff with jitter, capped at `max_delay` seconds. """
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempts - 1)))
+        return delay * random.uniform(0.5, 1.0)
+
+    def run_once(self):
+        """ Claims and delivers one batch. Returns the number of events processed. """
+        events = self.claim_batch()
+        if not events:
+            return 0
+
+        errors = list(self.executor.map(self.deliver, events))
+
+        now = timezone.now()
+        operations = []
+        for event, error in zip(events, errors):
+            unlock = {'lock_token': None, 'locked_until': None}
+            if error is None:
+                update = {**unlock, 'status': OutboxEvent.Status.DELIVERED, 'delivered_at': now, 'last_error': ''}
+                logger.info(f"Delivered '{event['event_type']}' webhook {event['_id']}")
+            elif event['attempts'] >= self.max_attempts:
+                update = {**unlock, 'status': OutboxEvent.Status.DEAD, 'last_error': error}
+                logger.error(f"Webhook {event['_id']} moved to dead letters after {event['attempts']} attempts: {error}")
+            else:
+                retry_at = now + timedelta(seconds=self.backoff(event['attempts']))
+                update = {**unlock, 'status': OutboxEvent.Status.PENDING, 'next_attempt_at': retry_at, 'last_error': error}
+                logger.warning(f"Webhook {event['_id']} failed (attempt {event['attempts']}), retrying: {error}")
+            operations.append(UpdateOne({'_id': event['_id']}, {'$set': update}))
+
+        OutboxEvent.objects.mongo_bulk_write(operations, ordered=False)
+        return len(events)
+
+    def run_forever(self, poll_interval=1.0):
+        """ Keeps dispatching; sleeps only when there is nothing due. """
+        while True:
+            if self.run_once() == 0:
+                time.sleep(poll_interval)
@@ -0,0 +1,149 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from django.core.cache import cache
+from django.test import RequestFactory, SimpleTestCase, TestCase
+from apps.core.cache import get_cache_metrics, get_version, invalidate_dashboards, dashboard_scope, record_cache_access
+from apps.core.api.serializers import SparseFieldsetsMixin, sparse_projection
+from apps.core.http import conditional_response, make_etag
+from apps.core.models import OutboxEvent
+from apps.core.outbox import OutboxDispatcher
+
+class StubWebhookHandler(BaseHTTPRequestHandler):
+    """ Records JSON bodies POSTed to '/ok' and fails every other path. """
+    received = []
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        if self.path == '/ok':
+            StubWebhookHandler.received.append(json.loads(body))
+            self.send_response(200)
+        else:
+            self.send_response(503)
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass # Keep test output clean
+
+class OutboxDispatcherTest(TestCase):
+    """
+    Test suite for webhook delivery through the outbox, against a local stub server.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = HTTPServer(('127.0.0.1', 0), StubWebhookHandler)
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_port}"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        StubWebhookHandler.received = []
+        self.dispatcher = OutboxDispatcher(max_workers=2, max_attempts=2, base_delay=0)
+
+    def tearDown(self):
+        self.dispatcher.close()
+
+    def test_successful_delivery(self):
+        event = OutboxEvent.objects.create(event_type='test.ok', url=f"{self.base_url}/ok", payload={'id': 1})
+
+        self.assertEqual(self.dispatcher.run_once(), 1)
+
+        event.refresh_from_db()
+        self.assertEqual(event.status, OutboxEvent.Status.DELIVERED)
+        self.assertEqual(event.attempts, 1)
+        self.assertEqual(StubWebhookHandler.received, [{'id': 1}])
+
+    def test_failed_delivery_is_retried_then_dead_lettered(self):
+        event = OutboxEvent.objects.create(event_type='test.fail', url=f"{self.base_url}/fail", payload={})
+
+        self.dispatcher.run_once()
+        event.refresh_from_db()
+        self.assertEqual(event.status, OutboxEvent.Status.PENDING)
+        self.assertIn('503', event.last_error)
+
+        self.dispatcher.run_once()
+        event.refresh_from_db()
+        self.assertEqual(event.status, OutboxEvent.Status.DEAD)
+        self.assertEqual(event.attempts, 2)
+
+    def test_nothing_due(self):
+        self.assertEqual(self.dispatcher.run_once(), 0)
+
+class CacheMetricsTest(SimpleTestCase):
+    """
+    Test suite for cache versioning and hit-rate counters.
+    """
+
+    def setUp(self):
+        cache.clear()
+
+    def test_hit_rate(self):
+        record_cache_access('panel', hit=False)
+        record_cache_access('panel', hit=True)
+        record_cache_access('panel', hit=True)
+        record_cache_access('panel', hit=True)
+        metrics = get_cache_metrics(['panel', 'unused'])
+        self.assertEqual(metrics['panel'], {'hits': 3, 'misses': 1, 'hit_rate': 0.75})
+        self.assertIsNone(metrics['unused']['hit_rate'])
+
+    def test_invalidating_a_dashboard_changes_its_version(self):
+        scope = dashboard_scope('student', 7)
+        before = get_version(scope)
+        invalidate_dashboards('student', [7])
+        self.assertNotEqual(get_version(scope), before)
+
+class ConditionalResponseTest(SimpleTestCase):
+    """
+    Test suite for ETag validation.
+    """
+
+    def test_etag_changes_with_its_parts(self):
+        self.assertEqual(make_etag('course', 1, 3), make_etag('course', 1, 3))
+        self.assertNotEqual(make_etag('course', 1, 3), make_etag('course', 1, 4))
+
+    def test_matching_etag_is_not_modified(self):
+        etag = make_etag('course', 1, 3)
+        request = RequestFactory().get('/', HTTP_IF_NONE_MATCH=etag)
+        response = conditional_response(request, etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_stale_etag_renders(self):
+        request = RequestFactory().get('/', HTTP_IF_NONE_MATCH=make_etag('course', 1, 2))
+        self.assertIsNone(conditional_response(request, make_etag('course', 1, 3)))
+
+class SparseFieldsetsTest(SimpleTestCase):
+    """
+    Test suite for ?fields= / ?expand= field selection.
+    """
+
+    class CourseListSerializer(SparseFieldsetsMixin):
+        _declared_fields = {'_id': None, 'title': None, 'instructor': None, 'lessons': None}
+
+        class Meta:
+            expandable_fields = ('lessons',)
+
+    def request(self, **params):
+        return type('Request', (), {'query_params': params})()
+
+    def test_expandable_fields_are_left_out_by_default(self):
+        fields = self.CourseListSerializer.requested_fields(self.request(), self.CourseListSerializer._declared_fields)
+        self.assertEqual(fields, {'_id', 'title', 'instructor'})
+
+    def test_expand_and_fields(self):
+        serializer = self.CourseListSerializer
+        self.assertIn('lessons', serializer.requested_fields(self.request(expand='lessons'), serializer._declared_fields))
+        self.assertEqual(serializer.requested_fields(self.request(fields='title, lessons'), serializer._declared_fields), {'title', 'lessons'})
+
+    def test_projection_uses_field_sources(self):
+        projection = sparse_projection(
+            self.CourseListSerializer, self.request(fields='_id,instructor'), {'_id': [], 'instructor': ['instructor_id']},
+        )
+        self.assertEqual(projection, {'instructor_id': 1})
@@ -1,11 +1,13 @@
 from django.urls import path
 from .views.authentication import CustomLoginView, CustomLogoutView
-from .views.dashboards import DashboardView
+from .views.dashboards import DashboardView, DashboardPanelView, DashboardCacheMetricsView
 
 urlpatterns = [
     path('login/', CustomLoginView.as_view(), name='login'),
     path('logout/', CustomLogoutView.as_view(), name='logout'),
     path('dashboard/', DashboardView.as_view(), name='dashboard'),
+    path('dashboard/panels/<str:panel>/', DashboardPanelView.as_view(), name='dashboard_panel'),
+    path('dashboard/metrics/', DashboardCacheMetricsView.as_view(), name='dashboard_metrics'),
     
     # The root path will redirect to the dashboard if logged in, or login page if not
     path('', DashboardView.as_view(), name='home'), 
@@ -1,129 +1,212 @@
 # =================================================================
 # apps/core/views/dashboards.py
 # -----------------------------------------------------------------
-# KEEPS THE SYSTEM INTEGRATED: This file is updated to implement
-# the full data-fetching logic for the student dashboard, fulfilling
-# [cite_start]the user story defined in the foundational document[cite: 650].
+# KEEPS THE SYSTEM INTEGRATED: Dashboards now render their page shell
+# immediately and load each data panel lazily through HTMX. Panels
+# are cached as rendered HTML under keys built from the user, the
+# language and the versions of the data they show, so only a panel
+# whose data changed pays for its queries. Hit rates are exposed to
+# admins through DashboardCacheMetricsView.
 # =================================================================
 
+from django.core.cache import cache
+from django.http import Http404, HttpResponse, HttpResponseForbidden, JsonResponse
 from django.shortcuts import render, redirect
+from django.template.loader import render_to_string
+from django.utils.translation import get_language
 from django.views import View
-from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import Avg, Count, Q
+from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.urls import reverse
 
+from apps.core.cache import dashboard_scope, get_cache_metrics, get_versions, record_cache_access
 from apps.enrollment.models import Enrollment
 from apps.learning.models import Course, LearningPath
+from apps.learning.services import get_course_summaries, to_object_id
 from apps.users.models import CustomUser
 from apps.contracts.models import Contract
-from apps.interactions.models import DiscussionThread, DiscussionPost
+from apps.contracts.services import get_contract_rollup
+from apps.reports.models import CourseStats, InstructorStats
+from apps.reports.services.path_progress import get_paths_progress, module_course_ids
+from apps.reports.services.platform_stats import get_platform_stats
+
+
+def _continue_url(course, enrollment):
+    """ The lesson a student should resume a course at: the last one accessed, else the first. """
+    manifest = course.manifest
+    last_lesson_id = enrollment.get('last_accessed_lesson_id') if enrollment else None
+    lesson = (manifest.get(last_lesson_id) if last_lesson_id else None) or manifest.first()
+    lesson_order = lesson.order if lesson else 1
+    return reverse('learning:lesson_detail', kwargs={'course_slug': course.slug, 'lesson_order': lesson_order})
+
+
+class DashboardPanel:
+    """
+    One lazily loaded dashboard fragment: who may see it, how its context is
+    built, and which data-version scopes (besides the user) its cache key uses.
+    `timeout` bounds the staleness of data that is not versioned, such as
+    counters that change on every lesson completion.
+    """
+
+    def __init__(self, role, template_name, build, scope_kinds=(), timeout=60 * 5):
+        self.role = role
+        self.template_name = template_name
+        self.build = build
+        self.scope_kinds = scope_kinds
+        self.timeout = timeout
+
+    def cache_key(self, name, user):
+        scopes = [dashboard_scope(kind, user.pk) for kind in self.scope_kinds]
+        versions = get_versions(scopes) if scopes else {}
+        version = '.'.join(str(versions[scope]) for scope in scopes) or '0'
+        return f'dashboard_panel:{name}:{user.pk}:{get_language()}:v{version}'
+
+
+def _admin_stats(user):
+    # A single snapshot document instead of four full collection counts.
+    stats = get_platform_stats()
+    users, courses = stats.get('users', {}), stats.get('courses', {})
+    return {
+        'total_users': stats['totals'].get('users', 0),
+        'total_students': users.get(CustomUser.Roles.STUDENT, 0),
+        'total_instructors': users.get(CustomUser.Roles.INSTRUCTOR, 0),
+        'total_courses': stats['totals'].get('courses', 0),
+        'published_courses': courses.get('published', 0),
+        'total_enrollments': stats['totals'].get('enrollments', 0),
+        'completed_enrollments': stats.get('enrollments', {}).get('completed', 0),
+        'active_contracts': stats.get('active_contracts', 0),
+        'stats_refreshed_at': stats.get('refreshed_at'),
+        'stats_estimated': stats.get('estimated', False),
+    }
+
+
+def _student_learning(user):
+    # A fixed number of queries however many enrollments the student has:
+    # enrollments, paths, courses (without lesson content) and instructors.
+    student_enrollments = list(Enrollment.objects.mongo_find(
+        {'student_id': user.id},
+        {'enrollable_id': 1, 'enrollable_type': 1, 'progress': 1, 'status': 1, 'last_accessed_lesson_id': 1},
+    ).sort('_id', 1))
+    course_enrollments = {e['enrollable_id']: e for e in student_enrollments if e.get('enrollable_type') == 'Course'}
+    path_enrollments = {e['enrollable_id']: e for e in student_enrollments if e.get('enrollable_type') == 'LearningPath'}
+
+    path_oids = [oid for oid in (to_object_id(path_id) for path_id in path_enrollments) if oid]
+    paths = list(LearningPath.objects.mongo_find(
+        {'_id': {'$in': path_oids}}, {'title': 1, 'description': 1, 'modules': 1},
+    )) if path_oids else []
+
+    module_course_ids = {module.get('course_id') for path in paths for module in path.get('modules') or []}
+    courses = get_course_summaries(set(course_enrollments) | module_course_ids)
+
+    enrolled_courses_data = []
+    for course_id, enrollment in course_enrollments.items():
+        course = courses.get(course_id)
+        if course is None:
+            continue # Skip if the enrolled course is not found
+        enrolled_courses_data.append({
+            'course': course,
+            'progress': enrollment.get('progress', 0),
+            'continue_url': _continue_url(course, enrollment),
+        })
+
+    enrolled_paths_data = []
+    for path in paths:
+        path_courses = [
+            courses[module['course_id']]
+            for module in sorted(path.get('modules') or [], key=lambda m: m.get('order', 0))
+            if module.get('course_id') in courses
+        ]
+        # Continue with the first module course the student has not completed yet.
+        next_course = next(
+            (c for c in path_courses if course_enrollments.get(str(c.pk), {}).get('status') != 'completed'),
+            path_courses[-1] if path_courses else None,
+        )
+        # Path progress is the mean progress over the path's module courses, as on the
+        # supervisor dashboard; path enrollments do not carry a progress of their own.
+        path_course_ids = module_course_ids(path)
+        progress = sum(
+            course_enrollments.get(course_id, {}).get('progress', 0) for course_id in path_course_ids
+        ) / len(path_course_ids) if path_course_ids else 0
+        enrolled_paths_data.append({
+            'path': path,
+            'course_count': len(path_courses),
+            'progress': progress,
+            'continue_url': _continue_url(next_course, course_enrollments.get(str(next_course.pk))) if next_course else None,
+        })
+
+    return {'enrolled_courses_data': enrolled_courses_data, 'enrolled_paths_data': enrolled_paths_data}
+
+
+def _instructor_overview(user):
+    instructor_courses = Course.objects.summaries({'instructor_id': user.pk})
+    # One indexed read of the pre-aggregated stats instead of scanning
+    # enrollments, threads and posts on every page load.
+    course_stats = {stats.course_id: stats for stats in CourseStats.objects.filter(instructor=user)}
+
+    for course in instructor_courses:
+        stats = course_stats.get(str(course._id))
+        course.enrolled_count = stats.enrolled_count if stats else 0
+        course.average_progress = stats.average_progress if stats else 0
+
+    return {
+        'instructor_courses': instructor_courses,
+        # Distinct students across all courses, maintained per instructor.
+        'total_students': InstructorStats.objects.filter(instructor=user).values_list('student_count', flat=True).first() or 0,
+        'total_courses': len(instructor_courses),
+        'new_questions_count': sum(stats.open_questions_count for stats in course_stats.values()),
+    }
+
+
+def _contract_report(user):
+    try:
+        contract = Contract.objects.get(client=user, is_active=True)
+    except Contract.DoesNotExist:
+        return {'contract': None}
+    rollup = get_contract_rollup(contract)
+    return {
+        'contract': contract,
+        'total_employees': rollup['total_employees'],
+        'average_progress': rollup['average_progress'],
+        'employee_data': rollup['employees'],
+    }
+
+
+def _supervisor_paths(user):
+    learning_paths = list(LearningPath.objects.filter(supervisor=user))
+    # Cached per path; only paths without a cached summary run their aggregation.
+    progress = get_paths_progress(learning_paths)
+    for path in learning_paths:
+        path.progress = progress.get(str(path.pk))
+    return {'learning_paths': learning_paths}
+
+
+DASHBOARD_PANELS = {
+    'admin_stats': DashboardPanel('admin', 'dashboards/panels/_admin_stats.html', _admin_stats, timeout=60),
+    'student_learning': DashboardPanel(
+        'student', 'dashboards/panels/_student_learning.html', _student_learning, scope_kinds=('student',), timeout=60 * 10,
+    ),
+    'instructor_overview': DashboardPanel(
+        'instructor', 'dashboards/panels/_instructor_overview.html', _instructor_overview, scope_kinds=('instructor',), timeout=60,
+    ),
+    'contract_report': DashboardPanel(
+        'third_party', 'dashboards/panels/_contract_report.html', _contract_report, scope_kinds=('client',),
+    ),
+    'supervisor_paths': DashboardPanel(
+        'supervisor', 'dashboards/panels/_supervisor_paths.html', _supervisor_paths, scope_kinds=('supervisor',), timeout=60,
+    ),
+}
+
 
 class DashboardView(LoginRequiredMixin, View):
     """
     A smart view that renders the correct dashboard template
-    based on the logged-in user's role and populates it with
-    relevant data.
+    based on the logged-in user's role. The template is only a
+    shell; its panels are fetched from DashboardPanelView.
     """
     login_url = '/login/'
 
     def get(self, request, *args, **kwargs):
         user = request.user
         context = {'user': user}
-        
-        if user.role == 'admin':
-            context.update({
-                'total_users': CustomUser.objects.count(),
-                'total_students': CustomUser.objects.filter(role=CustomUser.Roles.STUDENT).count(),
-                'total_instructors': CustomUser.objects.filter(role=CustomUser.Roles.INSTRUCTOR).count(),
-                'total_courses': Course.objects.count(),
-            })
-
-        elif user.role == 'student':
-            # --- STUDENT DASHBOARD LOGIC - FULLY IMPLEMENTED ---
-            student_enrollments = Enrollment.objects.filter(student=user).select_related('student')
-            enrolled_courses_data = []
-            
-            for enrollment in student_enrollments:
-                if enrollment.enrollable_type == 'Course':
-                    try:
-                        course = Course.objects.get(_id=enrollment.enrollable_id)
-                        
-                        # Determine the URL to continue learning
-                        last_lesson_id = enrollment.last_accessed_lesson_id
-                        if last_lesson_id:
-                            # Find the order of the last accessed lesson
-                            lesson_order = next((l.order for l in course.lessons if str(l._id) == last_lesson_id), 1)
-                        else:
-                            # Default to the first lesson if none accessed
-                            lesson_order = 1
-                            if course.lessons:
-                                lesson_order = sorted(course.lessons, key=lambda l: l.order)[0].order
-
-                        continue_url = reverse('learning:lesson_detail', kwargs={'course_slug': course.slug, 'lesson_order': lesson_order})
-
-                        enrolled_courses_data.append({
-                            'course': course,
-                            'progress': enrollment.progress,
-                            'continue_url': continue_url
-                        })
-                    except Course.DoesNotExist:
-                        continue # Skip if the enrolled course is not found
-            
-            context['enrolled_courses_data'] = enrolled_courses_data
-
-        elif user.role == 'instructor':
-            instructor_courses = Course.objects.filter(instructor=user)
-            course_ids = [str(c._id) for c in instructor_courses]
-            total_students_count = Enrollment.objects.filter(enrollable_id__in=course_ids).values('student').distinct().count()
-
-            # Logic to find unanswered questions more accurately
-            # Get all threads in the instructor's courses
-            course_threads = DiscussionThread.objects.filter(course_id__in=course_ids)
-            # Get IDs of threads the instructor has replied to
-            replied_thread_ids = DiscussionPost.objects.filter(thread__in=course_threads, user=user).values_list('thread_id', flat=True)
-            # Count threads where the instructor has not replied
-            unanswered_threads_count = course_threads.exclude(pk__in=replied_thread_ids).count()
-            
-            enrollments_per_course = Enrollment.objects.filter(enrollable_id__in=course_ids).values('enrollable_id').annotate(count=Count('student_id'))
-            enrollment_map = {item['enrollable_id']: item['count'] for item in enrollments_per_course}
-
-            for course in instructor_courses:
-                course.enrolled_count = enrollment_map.get(str(course._id), 0)
-
-            context.update({
-                'instructor_courses': instructor_courses,
-                'total_students': total_students_count,
-                'total_courses': instructor_courses.count(),
-                'new_questions_count': unanswered_threads_count,
-            })
-
-        elif user.role == 'third_party':
-            try:
-                contract = Contract.objects.get(client=user, is_active=True)
-                student_ids = contract.enrolled_students.values_list('id', flat=True)
-                enrollments = Enrollment.objects.filter(student_id__in=student_ids)
-                average_progress = enrollments.aggregate(Avg('progress'))['progress__avg'] or 0
-                
-                employee_data = []
-                for student in contract.enrolled_students.all():
-                    avg_student_progress = enrollments.filter(student=student).aggregate(Avg('progress'))['progress__avg'] or 0
-                    employee_data.append({
-                        'name': student.full_name or student.username,
-                        'email': student.email,
-                        'progress': avg_student_progress,
-                    })
-                context.update({
-                    'contract': contract,
-                    'total_employees': len(student_ids),
-                    'average_progress': average_progress,
-                    'employee_data': employee_data,
-                })
-            except Contract.DoesNotExist:
-                context['contract'] = None
-        
-        elif user.role == 'supervisor':
-            context['learning_paths'] = LearningPath.objects.filter(supervisor=user)
-
 
         # Mapping and rendering logic remains the same
         dashboard_templates = {
@@ -137,4 +220,50 @@ class DashboardView(LoginRequiredMixin, View):
         if not template_name:
             return redirect('login')
 
-        return render(request, template_name, context)
\ No newline at end of file
+        return render(request, template_name, context)
+
+
+class DashboardPanelView(LoginRequiredMixin, View):
+    """
+    Returns one dashboard panel as an HTML fragment for HTMX, served from the
+    cache when the panel's data has not changed. The X-Cache header reports
+    whether the fragment was a HIT or a MISS.
+    """
+    login_url = '/login/'
+
+    def get(self, request, panel, *args, **kwargs):
+        dashboard_panel = DASHBOARD_PANELS.get(panel)
+        if dashboard_panel is None:
+            raise Http404("Unknown dashboard panel.")
+        if request.user.role != dashboard_panel.role:
+            return HttpResponseForbidden()
+
+        cache_key = dashboard_panel.cache_key(panel, request.user)
+        html = cache.get(cache_key)
+        hit = html is not None
+        if not hit:
+            context = {'user': request.user, **dashboard_panel.build(request.user)}
+            html = render_to_string(dashboard_panel.template_name, context, request=request)
+            cache.set(cache_key, html, dashboard_panel.timeout)
+        record_cache_access(f'dashboard_panel:{panel}', hit)
+
+        response = HttpResponse(html)
+        response['X-Cache'] = 'HIT' if hit else 'MISS'
+        return response
+
+
+class DashboardCacheMetricsView(LoginRequiredMixin, UserPassesTestMixin, View):
+    """ Reports the hit rate of every dashboard panel cache (and the lesson page fragments) as JSON (admins only). """
+
+    def test_func(self):
+        return self.request.user.role == CustomUser.Roles.ADMIN
+
+    def get(self, request, *args, **kwargs):
+        metrics = get_cache_metrics([f'dashboard_panel:{name}' for name in DASHBOARD_PANELS])
+        hits = sum(m['hits'] for m in metrics.values())
+        total = hits + sum(m['misses'] for m in metrics.values())
+        return JsonResponse({
+            'panels': {name.split(':', 1)[1]: values for name, values in metrics.items()},
+            'overall_hit_rate': round(hits / total, 4) if total else None,
+            'lesson_fragments': get_cache_metrics(['lesson_fragments'])['lesson_fragments'],
+        })
@@ -0,0 +1,88 @@
+# =================================================================
+# apps/enrollment/access_buffer.py
+# -----------------------------------------------------------------
+# KEEPS THE SYSTEM INTEGRATED: Lesson page views no longer write the
+# enrollment. Each worker process buffers the latest accessed lesson
+# per (student, course) in memory and a background thread flushes
+# the buffer every few seconds as one unordered bulk write.
+# =================================================================
+
+import atexit
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.utils import timezone
+from pymongo import UpdateOne
+
+from apps.core.cache import invalidate_dashboards
+from .models import Enrollment
+
+logger = logging.getLogger(__name__)
+
+
+class LastAccessBuffer:
+    """
+    Coalesces last-access updates: however many lessons a student opens in a
+    course between two flushes, only the latest one is written.
+
+    Several gunicorn workers each have their own buffer. Every update carries
+    the time of the page view and only applies if the enrollment's recorded
+    activity is older, so a worker flushing late can never overwrite a newer
+    access (or lesson completion) recorded by another worker.
+    """
+
+    def __init__(self, flush_interval=5):
+        self.flush_interval = flush_interval
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def record(self, student_id, course_id, lesson_id, accessed_at=None):
+        """ Buffers an access; it reaches MongoDB within `flush_interval` seconds. """
+        with self._lock:
+            self._pending[(student_id, str(course_id))] = (str(lesson_id), accessed_at or timezone.now())
+            self._ensure_thread()
+
+    def flush(self):
+        """ Writes every buffered access with one bulk write. Returns the number of updates sent. """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+
+        operations = [
+            UpdateOne(
+                {
+                    'student_id': student_id,
+                    'enrollable_id': course_id,
+                    '$or': [{'last_activity_at': {'$lt': accessed_at}}, {'last_activity_at': None}],
+                },
+                {'$set': {'last_accessed_lesson_id': lesson_id, 'last_activity_at': accessed_at}},
+            )
+            for (student_id, course_id), (lesson_id, accessed_at) in pending.items()
+        ]
+        try:
+            Enrollment.objects.mongo_bulk_write(operations, ordered=False)
+        except Exception as e:
+            # Last-access data is advisory; losing one interval is better than crashing the worker.
+            logger.error(f"Failed to flush {len(operations)} last-access updates: {e}")
+            return 0
+        invalidate_dashboards('student', [student_id for student_id, _ in pending])
+        return len(operations)
+
+    def _ensure_thread(self):
+        # Started lazily so that it runs in each forked worker, not in the master.
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name='last-access-flush', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.flush_interval)
+            self.flush()
+
+
+last_access_buffer = LastAccessBuffer(flush_interval=getattr(settings, 'LAST_ACCESS_FLUSH_SECONDS', 5))
+atexit.register(last_access_buffer.flush)
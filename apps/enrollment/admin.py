@@ -1,8 +1,13 @@
 from django.contrib import admin
-from .models import Enrollment
+from .models import Enrollment, QuizAttempt
 
 @admin.register(Enrollment)
 class EnrollmentAdmin(admin.ModelAdmin):
     list_display = ('student', 'enrollable_type', 'enrollable_id', 'status', 'progress', 'enrollment_date')
     list_filter = ('status', 'enrollable_type')
-    search_fields = ('student__username', 'enrollable_id')
\ No newline at end of file
+    search_fields = ('student__username', 'enrollable_id')
+
+@admin.register(QuizAttempt)
+class QuizAttemptAdmin(admin.ModelAdmin):
+    list_display = ('attempt_id', 'student', 'course_id', 'lesson_id', 'score', 'submitted_at')
+    search_fields = ('attempt_id', 'student__username', 'enrollment_id', 'lesson_id')
\ No newline at end of file
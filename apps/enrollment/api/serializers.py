@@ -1,7 +1,32 @@
 from rest_framework import serializers
-from apps.enrollment.models import Enrollment
+from apps.core.api.serializers import SparseFieldsetsMixin
+from apps.enrollment.models import Enrollment, QuizAttempt
 
 class EnrollmentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Enrollment
-        fields = '__all__'
\ No newline at end of file
+        fields = '__all__'
+
+class EnrollmentSummarySerializer(SparseFieldsetsMixin, serializers.Serializer):
+    """
+    The slim list representation, built from raw enrollment documents.
+    completed_lessons is only included with ?expand=completed_lessons.
+    """
+    _id = serializers.CharField()
+    student = serializers.IntegerField(source='student_id')
+    enrollable_id = serializers.CharField()
+    enrollable_type = serializers.CharField()
+    status = serializers.CharField()
+    progress = serializers.FloatField()
+    enrollment_date = serializers.DateTimeField(allow_null=True)
+    last_activity_at = serializers.DateTimeField(allow_null=True)
+    last_accessed_lesson_id = serializers.CharField(allow_null=True)
+    completed_lessons = serializers.ListField(child=serializers.CharField(), required=False)
+
+    class Meta:
+        expandable_fields = ('completed_lessons',)
+
+class QuizAttemptSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = QuizAttempt
+        fields = ['attempt_id', 'enrollment_id', 'student', 'course_id', 'lesson_id', 'score', 'answers', 'question_ids', 'submitted_at']
\ No newline at end of file
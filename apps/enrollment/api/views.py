@@ -1,30 +1,90 @@
 # =================================================================
 # apps/enrollment/api/views.py
 # -----------------------------------------------------------------
-# KEEPS THE SYSTEM INTEGRATED: The submit_quiz action is refined to
-# handle data professionally, calculate scores accurately, and securely
-# redirect the user to a unique results page, completing the quiz
-# lifecycle for the student.
+# KEEPS THE SYSTEM INTEGRATED: mark_lesson_complete now delegates to
+# an atomic enrollment service, so completing a lesson costs a single
+# MongoDB write instead of two full-document reads and saves. The
+# submit_quiz action grades against a cached, precompiled answer key
+# and redirects the student to the results page.
 # =================================================================
 
 from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
 from django.urls import reverse
 from bson import ObjectId
+from django.core import signing
+from django.utils import timezone
 import uuid
-from datetime import datetime
 
-from apps.enrollment.models import Enrollment
-from apps.learning.models import Course
-from .serializers import EnrollmentSerializer
+from apps.enrollment.models import Enrollment, QuizAttempt
+from apps.enrollment.services import (
+    mark_lesson_complete, get_enrollment_attempts, get_lesson_attempts,
+    submit_quiz_batch, QUIZ_BATCH_MAX_ITEMS, bulk_enroll, enroll_contract_students, teaches_course, teaches_lesson,
+)
+from apps.contracts.models import Contract
+from apps.core.api.pagination import MongoListMixin
+from apps.core.api.serializers import sparse_projection
+from apps.learning.models import Course, LearningPath
+from apps.learning.services import get_answer_key, get_lesson_content, grade_quiz, to_object_id
+from apps.users.api.permissions import IsAdminRole
+from apps.learning.question_bank import (
+    get_bank_config, load_quiz_sample, sample_questions, sampled_answer_key, sign_quiz_sample,
+)
+from apps.users.models import CustomUser
+from .serializers import EnrollmentSerializer, EnrollmentSummarySerializer, QuizAttemptSerializer
 
-class EnrollmentViewSet(viewsets.ModelViewSet):
+# Roles allowed to read other students' quiz attempts.
+ATTEMPT_REVIEWER_ROLES = [CustomUser.Roles.ADMIN, CustomUser.Roles.SUPERVISOR, CustomUser.Roles.INSTRUCTOR]
+
+class EnrollmentViewSet(MongoListMixin, viewsets.ModelViewSet):
+    """
+    Enrollments API. The list is cursor-paginated on _id (see
+    MongoCursorPagination), can be filtered with ?student=, ?course= and
+    ?status=, and returns the slim EnrollmentSummarySerializer representation.
+    Students and clients only ever see their own enrollments.
+    """
     queryset = Enrollment.objects.all()
     serializer_class = EnrollmentSerializer
     permission_classes = [permissions.IsAuthenticated]
 
+    # Serializer field -> enrollment document fields it is built from
+    LIST_FIELD_SOURCES = {'_id': [], 'student': ['student_id']}
+    STATUSES = {value for value, _ in Enrollment._meta.get_field('status').choices}
+
+    def get_queryset(self):
+        if self.request.user.role in ATTEMPT_REVIEWER_ROLES:
+            return super().get_queryset()
+        return super().get_queryset().filter(student=self.request.user)
+
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return EnrollmentSummarySerializer
+        return super().get_serializer_class()
+
+    def get_list_query(self):
+        params = self.request.query_params
+        query = {}
+        if self.request.user.role not in ATTEMPT_REVIEWER_ROLES:
+            query['student_id'] = self.request.user.pk
+        elif params.get('student'):
+            try:
+                query['student_id'] = int(params['student'])
+            except ValueError:
+                raise ValidationError({'student': 'Must be a user id.'})
+        if params.get('course'):
+            query['enrollable_id'] = params['course']
+        if params.get('status'):
+            if params['status'] not in self.STATUSES:
+                raise ValidationError({'status': f"Must be one of: {', '.join(sorted(self.STATUSES))}."})
+            query['status'] = params['status']
+        return query
+
+    def get_list_projection(self):
+        return sparse_projection(EnrollmentSummarySerializer, self.request, self.LIST_FIELD_SOURCES)
+
     @action(detail=False, methods=['post'], url_path='mark-lesson-complete')
     def mark_lesson_complete(self, request):
         user = request.user
@@ -32,13 +92,11 @@ class EnrollmentViewSet(viewsets.ModelViewSet):
         lesson_id = request.data.get('lesson_id')
         if not course_id or not lesson_id:
             return Response({'error': 'course_id and lesson_id are required.'}, status=status.HTTP_400_BAD_REQUEST)
-        enrollment = get_object_or_404(Enrollment, student=user, enrollable_id=course_id)
-        if lesson_id not in enrollment.completed_lessons:
-            enrollment.completed_lessons.append(lesson_id)
-        enrollment.last_accessed_lesson_id = lesson_id
-        enrollment.save()
-        enrollment.update_progress()
-        return Response({'status': 'success', 'progress': enrollment.progress}, status=status.HTTP_200_OK)
+        # One atomic write instead of loading and re-saving the enrollment and course.
+        enrollment = mark_lesson_complete(user, course_id, lesson_id)
+        if enrollment is None:
+            return Response({'error': 'Enrollment not found.'}, status=status.HTTP_404_NOT_FOUND)
+        return Response({'status': 'success', 'progress': enrollment['progress']}, status=status.HTTP_200_OK)
 
     @action(detail=False, methods=['post'], url_path='submit-quiz')
     def submit_quiz(self, request):
@@ -52,45 +110,201 @@ class EnrollmentViewSet(viewsets.ModelViewSet):
         # We need to parse this into a more usable dictionary.
         answers = {key.split('[')[1].split(']')[0]: value for key, value in request.data.items() if key.startswith('answers')}
 
-        enrollment = get_object_or_404(Enrollment, student=user, enrollable_id=course_id)
-        course = get_object_or_404(Course, pk=course_id)
-        lesson = next((l for l in course.lessons if str(l._id) == lesson_id), None)
+        # Only the enrollment id is needed, so the document itself is not loaded.
+        enrollment = Enrollment.objects.mongo_find_one({'student_id': user.pk, 'enrollable_id': course_id}, {'_id': 1})
+        if enrollment is None:
+            return Response({'error': 'Enrollment not found.'}, status=status.HTTP_404_NOT_FOUND)
 
-        if not lesson or lesson.content_type != 'quiz':
-            return Response({'error': 'Lesson is not a quiz.'}, status=status.HTTP_400_BAD_REQUEST)
+        question_ids = []
+        if request.data.get('quiz_token'):
+            # A sampled bank quiz: grade against exactly the questions this student was shown.
+            try:
+                question_ids = load_quiz_sample(request.data['quiz_token'], user.pk, course_id, lesson_id)
+            except signing.BadSignature:
+                return Response({'error': 'This quiz has expired. Please start it again.'}, status=status.HTTP_400_BAD_REQUEST)
+            if not question_ids:
+                # An empty sample would be graded as 100% for any submission.
+                return Response({'error': 'This quiz has no questions.'}, status=status.HTTP_400_BAD_REQUEST)
+            answer_key = sampled_answer_key(question_ids)
+        else:
+            # Grade against the cached, precompiled answer key (no Course fetch).
+            answer_key = get_answer_key(course_id, lesson_id)
+            if answer_key is None:
+                return Response({'error': 'Lesson is not a quiz.'}, status=status.HTTP_400_BAD_REQUEST)
+            if answer_key.get('sampled'):
+                return Response({'error': 'quiz_token is required for this quiz.'}, status=status.HTTP_400_BAD_REQUEST)
 
-        total_questions = len(lesson.content_data.get('questions', []))
-        correct_answers_count = 0
-        
-        # Grade the submission
-        for i, question_data in enumerate(lesson.content_data.get('questions', [])):
-            question_key = f'question_{i+1}' # e.g., 'question_1', 'question_2'
-            submitted_answer_id = answers.get(question_key)
-            
-            correct_answer = next((ans for ans in question_data['answers'] if ans.get('is_correct')), None)
-            
-            if correct_answer and submitted_answer_id == str(correct_answer.get('_id')):
-                correct_answers_count += 1
-        
-        score = round((correct_answers_count / total_questions) * 100, 2) if total_questions > 0 else 100
+        score = grade_quiz(answer_key, answers)
 
-        # Save the attempt with a unique ID
+        # Save the attempt with a unique ID in the append-only attempts collection
         attempt_id = str(uuid.uuid4())
-        attempt_data = {
-            'attempt_id': attempt_id,
-            'lesson_id': lesson_id,
-            'score': score,
-            'submitted_at': datetime.utcnow().isoformat(),
-            'answers': answers, # Store the submitted answers for review
-        }
-        
-        if not hasattr(enrollment, 'quiz_attempts') or enrollment.quiz_attempts is None:
-            enrollment.quiz_attempts = []
-            
-        enrollment.quiz_attempts.append(attempt_data)
-        enrollment.save()
+        QuizAttempt.objects.create(
+            attempt_id=attempt_id,
+            enrollment_id=str(enrollment['_id']),
+            student=user,
+            course_id=course_id,
+            lesson_id=lesson_id,
+            score=score,
+            answers=answers, # Store the submitted answers for review
+            question_ids=question_ids,
+            submitted_at=timezone.now(),
+        )
         
         # Construct the URL to the results page for redirection
-        result_url = reverse('learning:quiz_result', kwargs={'enrollment_pk': str(enrollment._id), 'attempt_id': attempt_id})
+        result_url = reverse('learning:quiz_result', kwargs={'enrollment_pk': str(enrollment['_id']), 'attempt_id': attempt_id})
         
-        return Response({'status': 'success', 'result_url': result_url}, status=status.HTTP_200_OK)
\ No newline at end of file
+        return Response({'status': 'success', 'result_url': result_url}, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['post'], url_path='submit-quiz-batch')
+    def submit_quiz_batch(self, request):
+        """
+        Grades and stores many quiz attempts at once, e.g. when proctored exam
+        kiosks sync their results. Expects {'attempts': [{'student_id', 'course_id',
+        'lesson_id', 'answers', 'attempt_id'?, 'submitted_at'?, 'quiz_token'?}, ...]}
+        and returns a result for every attempt, in the same order. Instructors can
+        only submit attempts for courses they teach.
+
+        Attempts at bank quizzes must carry the `quiz_token` returned by quiz-sample
+        for that student, and are graded against the questions it was issued for.
+        """
+        if request.user.role not in ATTEMPT_REVIEWER_ROLES:
+            return Response({'error': 'You do not have permission to submit attempts for students.'}, status=status.HTTP_403_FORBIDDEN)
+
+        attempts = request.data.get('attempts')
+        if not isinstance(attempts, list):
+            return Response({'error': 'attempts must be a list'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(attempts) > QUIZ_BATCH_MAX_ITEMS:
+            return Response({'error': f'A batch can contain at most {QUIZ_BATCH_MAX_ITEMS} attempts.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Instructors may only record attempts for the courses they teach.
+        instructor_id = request.user.pk if request.user.role == CustomUser.Roles.INSTRUCTOR else None
+        results = submit_quiz_batch(attempts, instructor_id=instructor_id)
+        summary = {key: sum(1 for r in results if r['status'] == key) for key in ('created', 'duplicate', 'error')}
+        return Response({'summary': summary, 'results': results}, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['post'], url_path='quiz-sample')
+    def quiz_sample(self, request):
+        """
+        Draws a bank quiz sample for one student, e.g. for an exam kiosk that
+        syncs its attempts later with submit-quiz-batch. Expects {'student_id',
+        'course_id', 'lesson_id'} and returns the questions to show (without the
+        correct answers) and the `quiz_token` to submit the attempt with; answers
+        are keyed question_1, question_2, ... in the order of the questions. The
+        token expires after six hours. Instructors can only draw samples for
+        courses they teach.
+        """
+        if request.user.role not in ATTEMPT_REVIEWER_ROLES:
+            return Response({'error': 'You do not have permission to draw quizzes for students.'}, status=status.HTTP_403_FORBIDDEN)
+        student_id = request.data.get('student_id')
+        course_id = request.data.get('course_id')
+        lesson_id = request.data.get('lesson_id')
+        if isinstance(student_id, bool) or not isinstance(student_id, int) or not course_id or not lesson_id:
+            return Response({'error': 'student_id, course_id and lesson_id are required.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        course = Course.objects.mongo_find_one({'_id': to_object_id(course_id)}, {'instructor_id': 1})
+        if course is None:
+            return Response({'error': 'Course not found.'}, status=status.HTTP_404_NOT_FOUND)
+        if request.user.role == CustomUser.Roles.INSTRUCTOR and course.get('instructor_id') != request.user.pk:
+            return Response({'error': 'You do not teach this course.'}, status=status.HTTP_403_FORBIDDEN)
+        course_id = str(course['_id'])
+        if not Enrollment.objects.mongo_count_documents({'student_id': student_id, 'enrollable_id': course_id}, limit=1):
+            return Response({'error': 'Enrollment not found.'}, status=status.HTTP_404_NOT_FOUND)
+
+        lesson = get_lesson_content(course_id, lesson_id)
+        bank = get_bank_config(lesson.content_data) if lesson and lesson.content_type == 'quiz' else None
+        if bank is None:
+            return Response({'error': 'Lesson is not a bank quiz.'}, status=status.HTTP_400_BAD_REQUEST)
+        questions = sample_questions(course_id, lesson._id, bank)
+        if not questions:
+            return Response({'error': 'This quiz has no questions yet.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            'quiz_token': sign_quiz_sample(student_id, course_id, lesson._id, questions),
+            'questions': [
+                {
+                    '_id': str(question['_id']),
+                    'question_text': question.get('question_text', ''),
+                    'answers': [
+                        {'_id': str(answer['_id']), 'answer_text': answer.get('answer_text', '')}
+                        for answer in question.get('answers', [])
+                    ],
+                }
+                for question in questions
+            ],
+        }, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['post'], url_path='bulk-enroll', permission_classes=[IsAdminRole])
+    def bulk_enroll(self, request):
+        """
+        Enrolls many students at once. Accepts either {'contract_id'} to enroll a
+        contract's students into all of its learning paths, or {'student_ids',
+        'enrollable_ids', 'enrollable_type'}. Existing enrollments are skipped.
+        """
+        contract_id = request.data.get('contract_id')
+        if contract_id:
+            contract = get_object_or_404(Contract, pk=to_object_id(contract_id))
+            totals = enroll_contract_students(contract)
+            return Response({'status': 'success', **totals}, status=status.HTTP_200_OK)
+
+        student_ids = request.data.get('student_ids', [])
+        enrollable_ids = request.data.get('enrollable_ids', [])
+        enrollable_type = request.data.get('enrollable_type', 'Course')
+        if not isinstance(student_ids, list) or not isinstance(enrollable_ids, list):
+            return Response({'error': 'student_ids and enrollable_ids must be lists'}, status=status.HTTP_400_BAD_REQUEST)
+        if any(isinstance(student_id, bool) or not isinstance(student_id, int) for student_id in student_ids):
+            return Response({'error': 'student_ids must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+        if enrollable_type not in ('Course', 'LearningPath'):
+            return Response({'error': "enrollable_type must be 'Course' or 'LearningPath'"}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Validate every target with one $in lookup.
+        model = Course if enrollable_type == 'Course' else LearningPath
+        object_ids = [to_object_id(enrollable_id) for enrollable_id in enrollable_ids]
+        found = {str(doc['_id']) for doc in model.objects.mongo_find({'_id': {'$in': [oid for oid in object_ids if oid]}}, {'_id': 1})}
+        missing = [enrollable_id for enrollable_id in enrollable_ids if str(enrollable_id) not in found]
+        if missing:
+            return Response({'error': 'Some enrollables were not found.', 'missing': missing}, status=status.HTTP_400_BAD_REQUEST)
+
+        valid_student_ids = list(CustomUser.objects.filter(id__in=student_ids, role=CustomUser.Roles.STUDENT).values_list('id', flat=True))
+        totals = bulk_enroll(valid_student_ids, [(enrollable_id, enrollable_type) for enrollable_id in enrollable_ids])
+        totals['ignored_students'] = len(set(student_ids)) - len(valid_student_ids)
+        return Response({'status': 'success', **totals}, status=status.HTTP_200_OK)
+
+    @action(detail=True, methods=['get'], url_path='quiz-attempts')
+    def quiz_attempts(self, request, pk=None):
+        """
+        Returns a page of this enrollment's quiz attempts, newest first.
+        Pass the returned `next` cursor as `?before=` to fetch the next page.
+        """
+        enrollment = self.get_object()
+        if enrollment.student_id != request.user.id and request.user.role not in ATTEMPT_REVIEWER_ROLES:
+            return Response({'error': 'You do not have access to these attempts.'}, status=status.HTTP_403_FORBIDDEN)
+        # Instructors only review attempts in the courses they teach.
+        if (enrollment.student_id != request.user.id and request.user.role == CustomUser.Roles.INSTRUCTOR
+                and not teaches_course(request.user.pk, enrollment.enrollable_id)):
+            return Response({'error': 'You do not have access to these attempts.'}, status=status.HTTP_403_FORBIDDEN)
+
+        attempts, next_cursor = get_enrollment_attempts(enrollment._id, before=request.query_params.get('before'))
+        return Response({
+            'results': QuizAttemptSerializer(attempts, many=True).data,
+            'next': next_cursor,
+        }, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['get'], url_path='lesson-attempts')
+    def lesson_attempts(self, request):
+        """
+        Returns a page of all students' attempts at a quiz lesson, newest first.
+        Instructors can only read the attempts at lessons of courses they teach.
+        """
+        lesson_id = request.query_params.get('lesson_id')
+        if not lesson_id:
+            return Response({'error': 'lesson_id is required.'}, status=status.HTTP_400_BAD_REQUEST)
+        if request.user.role not in ATTEMPT_REVIEWER_ROLES:
+            return Response({'error': 'You do not have access to these attempts.'}, status=status.HTTP_403_FORBIDDEN)
+        if request.user.role == CustomUser.Roles.INSTRUCTOR and not teaches_lesson(request.user.pk, lesson_id):
+            return Response({'error': 'You do not have access to these attempts.'}, status=status.HTTP_403_FORBIDDEN)
+
+        attempts, next_cursor = get_lesson_attempts(lesson_id, before=request.query_params.get('before'))
+        return Response({
+            'results': QuizAttemptSerializer(attempts, many=True).data,
+            'next': next_cursor,
+        }, status=status.HTTP_200_OK)
\ No newline at end of file
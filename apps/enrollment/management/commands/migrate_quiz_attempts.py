@@ -0,0 +1,86 @@
+from datetime import datetime
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from pymongo.errors import BulkWriteError
+from apps.enrollment.models import Enrollment, QuizAttempt
+from apps.enrollment.services import DUPLICATE_KEY_ERROR
+
+class Command(BaseCommand):
+    help = (
+        "Moves quiz attempts embedded in Enrollment documents into the QuizAttempt "
+        "collection. Enrollments are streamed in batches and the command is safe to re-run."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help="Enrollments processed per batch.")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        cursor = Enrollment.objects.mongo_find(
+            {'quiz_attempts.0': {'$exists': True}},
+            {'_id': 1, 'student_id': 1, 'enrollable_id': 1, 'quiz_attempts': 1},
+            batch_size=batch_size,
+        )
+
+        totals = {'enrollments': 0, 'inserted': 0, 'skipped': 0}
+        batch = []
+        for enrollment in cursor:
+            batch.append(enrollment)
+            if len(batch) >= batch_size:
+                self._migrate_batch(batch, totals)
+                batch = []
+        if batch:
+            self._migrate_batch(batch, totals)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Migrated {totals['inserted']} quiz attempts from {totals['enrollments']} enrollments "
+            f"({totals['skipped']} already migrated)."
+        ))
+
+    def _migrate_batch(self, enrollments, totals):
+        attempts = [
+            self._to_attempt_document(enrollment, attempt)
+            for enrollment in enrollments
+            for attempt in enrollment.get('quiz_attempts') or []
+        ]
+
+        if attempts:
+            try:
+                result = QuizAttempt.objects.mongo_insert_many(attempts, ordered=False)
+                totals['inserted'] += len(result.inserted_ids)
+            except BulkWriteError as e:
+                # Attempts copied by an earlier, interrupted run hit the unique attempt_id index.
+                write_errors = e.details.get('writeErrors', [])
+                if any(error.get('code') != DUPLICATE_KEY_ERROR for error in write_errors):
+                    raise
+                totals['inserted'] += e.details.get('nInserted', 0)
+                totals['skipped'] += len(write_errors)
+
+        # Only drop the embedded history once every attempt is safely stored.
+        Enrollment.objects.mongo_update_many(
+            {'_id': {'$in': [enrollment['_id'] for enrollment in enrollments]}},
+            {'$unset': {'quiz_attempts': ''}},
+        )
+        totals['enrollments'] += len(enrollments)
+        self.stdout.write(f"  {totals['enrollments']} enrollments processed...")
+
+    def _to_attempt_document(self, enrollment, attempt):
+        return {
+            'attempt_id': attempt['attempt_id'],
+            'enrollment_id': str(enrollment['_id']),
+            'student_id': enrollment['student_id'],
+            'course_id': enrollment['enrollable_id'],
+            'lesson_id': attempt.get('lesson_id'),
+            'score': attempt.get('score', 0),
+            'answers': attempt.get('answers') or {},
+            'submitted_at': self._parse_timestamp(attempt.get('submitted_at')),
+        }
+
+    def _parse_timestamp(self, value):
+        # Embedded attempts stored naive UTC timestamps as ISO strings.
+        if isinstance(value, datetime):
+            return value
+        try:
+            return datetime.fromisoformat(value)
+        except (TypeError, ValueError):
+            return timezone.now()
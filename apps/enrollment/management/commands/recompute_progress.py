@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+from apps.enrollment.services import recompute_course_progress, PROGRESS_RECOMPUTE_CHUNK_SIZE
+from apps.reports.services.course_stats import rebuild_course_stats
+from apps.reports.services.path_progress import invalidate_path_progress
+
+class Command(BaseCommand):
+    help = "Recalculates progress and status for all enrollments of the given courses."
+
+    def add_arguments(self, parser):
+        parser.add_argument('course_ids', nargs='+', help="IDs of the courses to recompute.")
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=PROGRESS_RECOMPUTE_CHUNK_SIZE,
+            help="Number of enrollments rewritten per bulk update.",
+        )
+
+    def handle(self, *args, **options):
+        for course_id in options['course_ids']:
+            self.stdout.write(f"Recomputing progress for course {course_id}...")
+            stats = recompute_course_progress(
+                course_id,
+                chunk_size=options['chunk_size'],
+                on_chunk=lambda s: self.stdout.write(
+                    f"  chunk {s['chunks']}: {s['enrollments']} enrollments, {s['enrollments_per_second']}/s"
+                ),
+            )
+            self.stdout.write(self.style.SUCCESS(
+                f"Done: {stats['enrollments']} enrollments ({stats['modified']} changed) "
+                f"in {stats['elapsed_seconds']}s, {stats['enrollments_per_second']} enrollments/s."
+            ))
+            rebuild_course_stats([course_id])
+            invalidate_path_progress(course_ids=[course_id])
@@ -1,14 +1,15 @@
 # =================================================================
 # apps/enrollment/models.py
 # -----------------------------------------------------------------
-# KEEPS THE SYSTEM INTEGRATED: The `update_progress` method is now
-# fully implemented, providing the core business logic for tracking
-# [cite_start]student progress as outlined in the system architecture[cite: 288, 382].
+# KEEPS THE SYSTEM INTEGRATED: Quiz attempts now live in their own
+# QuizAttempt collection, so reading an Enrollment no longer drags its
+# whole quiz history along. `update_progress` tracks student progress
+# [cite_start]as outlined in the system architecture[cite: 288, 382].
 # =================================================================
 
 from djongo import models
 from django.conf import settings
-from apps.learning.models import Course
+from apps.learning.services import get_lesson_count
 
 class Enrollment(models.Model):
     _id = models.ObjectIdField()
@@ -24,11 +25,18 @@ class Enrollment(models.Model):
     progress = models.FloatField(default=0.0)
     completed_lessons = models.JSONField(default=list) # Stores list of completed lesson_ids (as strings)
     last_accessed_lesson_id = models.CharField(max_length=24, blank=True, null=True)
-    quiz_attempts = models.JSONField(default=list)
+    last_activity_at = models.DateTimeField(blank=True, null=True) # Set on lesson completion and on lesson page views (see LastAccessBuffer)
     objects = models.DjongoManager()
     
     class Meta:
         unique_together = ('student', 'enrollable_id')
+        # Serve the filtered, _id-ordered pages of the enrollment list API.
+        indexes = [
+            models.Index(fields=['student', '_id']),
+            models.Index(fields=['enrollable_id', '_id']),
+            models.Index(fields=['enrollable_id', 'status', '_id']),
+            models.Index(fields=['status', '_id']),
+        ]
 
     def __str__(self):
         return f"{self.student.username} enrolled in {self.enrollable_type} ({self.enrollable_id})"
@@ -39,27 +47,53 @@ class Enrollment(models.Model):
         This method is now fully functional.
         """
         if self.enrollable_type == 'Course':
-            try:
-                course = Course.objects.get(_id=self.enrollable_id)
-                total_lessons = len(course.lessons)
-                
-                if total_lessons > 0:
-                    # Ensure completed_lessons contains unique lesson IDs
-                    completed_set = set(self.completed_lessons)
-                    completed_count = len(completed_set)
-                    self.progress = round((completed_count / total_lessons) * 100, 2)
-                else:
-                    # If a course has no lessons, completing it means 100% progress.
-                    self.progress = 100 if self.status == 'completed' else 0
-                
-                # Automatically mark the course as completed if progress is 100% or more
-                if self.progress >= 100:
-                    self.status = 'completed'
-                    self.progress = 100 # Cap progress at 100
-                
-                self.save()
+            # The lesson count is cached, so the course document is not loaded here.
+            total_lessons = get_lesson_count(self.enrollable_id)
 
-            except Course.DoesNotExist:
+            if total_lessons is None:
                 # If course is deleted, reset progress.
                 self.progress = 0
-                self.save()
\ No newline at end of file
+                self.save()
+                return
+
+            if total_lessons > 0:
+                # Ensure completed_lessons contains unique lesson IDs
+                completed_set = set(self.completed_lessons)
+                completed_count = len(completed_set)
+                self.progress = round((completed_count / total_lessons) * 100, 2)
+            else:
+                # If a course has no lessons, completing it means 100% progress.
+                self.progress = 100 if self.status == 'completed' else 0
+
+            # Automatically mark the course as completed if progress is 100% or more
+            if self.progress >= 100:
+                self.status = 'completed'
+                self.progress = 100 # Cap progress at 100
+
+            self.save()
+
+class QuizAttempt(models.Model):
+    """
+    A single graded quiz submission. Attempts live in their own collection
+    instead of growing the Enrollment document with every submission.
+    """
+    _id = models.ObjectIdField()
+    attempt_id = models.CharField(max_length=36, unique=True)
+    enrollment_id = models.CharField(max_length=24)
+    student = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='quiz_attempts')
+    course_id = models.CharField(max_length=24)
+    lesson_id = models.CharField(max_length=24)
+    score = models.FloatField()
+    answers = models.JSONField(default=dict) # Submitted answers, e.g. {'question_1': '<answer_id>'}
+    question_ids = models.JSONField(default=list) # Bank questions shown, in order (sampled quizzes only)
+    submitted_at = models.DateTimeField()
+    objects = models.DjongoManager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['enrollment_id', '_id']),
+            models.Index(fields=['lesson_id', '_id']),
+        ]
+
+    def __str__(self):
+        return f"Quiz attempt {self.attempt_id} ({self.score}%)"
\ No newline at end of file
@@ -1,5 +1,470 @@
 # This file will contain business logic for the enrollment app.
 
+import logging
+import time
+import uuid
+
+from bson import ObjectId
+from django.core import signing
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError
+
+from apps.core.cache import invalidate_dashboards
+from apps.core.outbox import enqueue_webhook
+from apps.learning.models import Course
+from apps.learning.question_bank import load_quiz_sample, sampled_answer_key
+from apps.learning.services import get_lesson_count, to_object_id, get_answer_key, grade_quiz
+from apps.reports.services.course_stats import (
+    count_instructor_students, get_course_instructor_id, increment_course_stats, progress_deltas,
+)
+from apps.reports.services.path_progress import apply_course_progress_change, invalidate_path_progress
+from apps.reports.services.platform_stats import increment_platform_stats, move_platform_stats
+from .models import Enrollment, QuizAttempt
+
+logger = logging.getLogger(__name__)
+
+PROGRESS_RECOMPUTE_CHUNK_SIZE = 5000
+QUIZ_ATTEMPTS_PAGE_SIZE = 20
+QUIZ_BATCH_MAX_ITEMS = 5000
+DUPLICATE_KEY_ERROR = 11000
+BULK_ENROLL_CHUNK_SIZE = 1000
+
+
+def progress_update_stages(total_lessons):
+    """
+    Returns aggregation-pipeline update stages that recompute `progress` and
+    `status` on the server, following the same rules as Enrollment.update_progress.
+    """
+    if total_lessons > 0:
+        completed_count = {'$size': {'$setUnion': [{'$ifNull': ['$completed_lessons', []]}, []]}}
+        progress = {'$min': [100, {'$round': [{'$multiply': [{'$divide': [completed_count, total_lessons]}, 100]}, 2]}]}
+    else:
+        # If a course has no lessons, completing it means 100% progress.
+        progress = {'$cond': [{'$eq': ['$status', 'completed']}, 100, 0]}
+
+    return [
+        {'$set': {'progress': progress}},
+        {'$set': {'status': {'$cond': [{'$gte': ['$progress', 100]}, 'completed', '$status']}}},
+    ]
+
+
+def compute_progress(completed_count, total_lessons, status):
+    """
+    The Python twin of progress_update_stages: returns the (progress, status)
+    an enrollment ends up with after the server-side update.
+    """
+    if total_lessons > 0:
+        progress = min(100, round(completed_count / total_lessons * 100, 2))
+    else:
+        progress = 100 if status == 'completed' else 0
+    return progress, 'completed' if progress >= 100 else status
+
+
+def mark_lesson_complete(student, course_id, lesson_id):
+    """
+    Records a completed lesson and refreshes the enrollment's progress in a single
+    atomic update. The lesson id is appended only if it is not already present
+    (the $addToSet semantics, expressed as a pipeline so progress can be derived
+    from the updated list in the same write).
+
+    The document is returned as it was before the update, so the change can be
+    applied to the course's CourseStats as a delta.
+
+    Returns the updated {'progress', 'status'} document, or None when either the
+    enrollment or the course does not exist.
+    """
+    total_lessons = get_lesson_count(course_id)
+    if total_lessons is None:
+        return None
+
+    completed_lessons = {'$ifNull': ['$completed_lessons', []]}
+    pipeline = [
+        {'$set': {
+            'completed_lessons': {'$cond': [
+                {'$in': [lesson_id, completed_lessons]},
+                completed_lessons,
+                {'$concatArrays': [completed_lessons, [lesson_id]]},
+            ]},
+            'last_accessed_lesson_id': lesson_id,
+            'last_activity_at': '$$NOW',
+        }},
+        *progress_update_stages(total_lessons),
+    ]
+
+    before = Enrollment.objects.mongo_find_one_and_update(
+        {'student_id': student.pk, 'enrollable_id': course_id},
+        pipeline,
+        projection={'_id': 1, 'progress': 1, 'status': 1, 'completed_lessons': 1},
+        return_document=ReturnDocument.BEFORE,
+    )
+    if before is None:
+        return None
+
+    completed_count = len(set(before.get('completed_lessons') or []) | {lesson_id})
+    progress, status = compute_progress(completed_count, total_lessons, before.get('status'))
+    after = {'_id': before['_id'], 'progress': progress, 'status': status}
+    increment_course_stats(course_id, **progress_deltas(before, after))
+    move_platform_stats('enrollments', before.get('status'), status)
+    apply_course_progress_change(course_id, student.pk, before, after)
+    invalidate_dashboards('student', [student.pk])
+    return after
+
+
+def recompute_course_progress(course_id, chunk_size=PROGRESS_RECOMPUTE_CHUNK_SIZE, on_chunk=None):
+    """
+    Recalculates progress and status for every enrollment in a course, e.g. after
+    the instructor adds a lesson.
+
+    Enrollment ids are streamed in _id order (keyset pagination, reading only the
+    _id), and each chunk is rewritten on the server by a single update_many
+    pipeline, so no enrollment document is ever loaded into Python.
+
+    `on_chunk`, if given, is called with the running stats after every chunk.
+    Returns a dict of totals and throughput.
+    """
+    total_lessons = get_lesson_count(course_id)
+    if total_lessons is None:
+        # If course is deleted, reset progress.
+        stages = [{'$set': {'progress': 0}}]
+    else:
+        stages = progress_update_stages(total_lessons)
+
+    query = {'enrollable_id': str(course_id), 'enrollable_type': 'Course'}
+    stats = {
+        'course_id': str(course_id),
+        'total_lessons': total_lessons,
+        'enrollments': 0,
+        'modified': 0,
+        'chunks': 0,
+    }
+    started_at = time.monotonic()
+    last_id = None
+
+    while True:
+        chunk_query = dict(query, _id={'$gt': last_id}) if last_id is not None else query
+        cursor = Enrollment.objects.mongo_find(chunk_query, {'_id': 1}).sort('_id', 1).limit(chunk_size)
+        enrollment_ids = [document['_id'] for document in cursor]
+        if not enrollment_ids:
+            break
+
+        result = Enrollment.objects.mongo_update_many({'_id': {'$in': enrollment_ids}}, stages)
+        stats['enrollments'] += len(enrollment_ids)
+        stats['modified'] += result.modified_count
+        stats['chunks'] += 1
+        last_id = enrollment_ids[-1]
+
+        if on_chunk is not None:
+            on_chunk(_with_throughput(stats, started_at))
+        if len(enrollment_ids) < chunk_size:
+            break
+
+    stats = _with_throughput(stats, started_at)
+    logger.info(
+        f"Recomputed progress for {stats['enrollments']} enrollments of course {course_id} "
+        f"in {stats['elapsed_seconds']}s ({stats['enrollments_per_second']}/s)"
+    )
+    return stats
+
+
+def _with_throughput(stats, started_at):
+    elapsed = time.monotonic() - started_at
+    return dict(
+        stats,
+        elapsed_seconds=round(elapsed, 3),
+        enrollments_per_second=round(stats['enrollments'] / elapsed) if elapsed > 0 else stats['enrollments'],
+    )
+
+
+def _paginate_attempts(queryset, before=None, limit=QUIZ_ATTEMPTS_PAGE_SIZE):
+    """
+    Returns (attempts, next_cursor) for the newest attempts in a queryset.
+    Pages are keyed on _id, so each page is an indexed range read whatever
+    its depth; pass `next_cursor` back as `before` to get the following page.
+    """
+    before_oid = to_object_id(before) if before else None
+    if before_oid is not None:
+        queryset = queryset.filter(_id__lt=before_oid)
+    attempts = list(queryset.order_by('-_id')[:limit + 1])
+    next_cursor = str(attempts[limit - 1]._id) if len(attempts) > limit else None
+    return attempts[:limit], next_cursor
+
+
+def get_enrollment_attempts(enrollment_id, before=None, limit=QUIZ_ATTEMPTS_PAGE_SIZE):
+    """ Returns one page of an enrollment's quiz attempts, newest first. """
+    queryset = QuizAttempt.objects.filter(enrollment_id=str(enrollment_id))
+    return _paginate_attempts(queryset, before, limit)
+
+
+def get_lesson_attempts(lesson_id, before=None, limit=QUIZ_ATTEMPTS_PAGE_SIZE):
+    """ Returns one page of all students' attempts at a quiz lesson, newest first. """
+    queryset = QuizAttempt.objects.filter(lesson_id=str(lesson_id))
+    return _paginate_attempts(queryset, before, limit)
+
+
+def submit_quiz_batch(items, instructor_id=None):
+    """
+    Grades and stores many quiz attempts in one pass, e.g. results synced from
+    offline exam kiosks. Each item is a dict with `student_id`, `course_id`,
+    `lesson_id` and `answers` (same keys as the take-quiz form), plus optional
+    `attempt_id`, `submitted_at` and, for sampled bank quizzes, `quiz_token`.
+
+    Enrollments are resolved with a single query, each distinct quiz is graded
+    against its shared cached answer key, and all attempts are written with one
+    unordered insert_many. A client-supplied attempt_id makes re-syncing safe:
+    attempts that were already stored are reported as duplicates.
+
+    With `instructor_id`, only attempts for courses taught by that instructor
+    are accepted; the others are reported as errors.
+
+    Returns one result dict per item, in input order.
+    """
+    results = [None] * len(items)
+    valid = []
+    for index, item in enumerate(items):
+        error = _validate_batch_item(item)
+        if error:
+            results[index] = {'index': index, 'status': 'error', 'error': error}
+        else:
+            valid.append((index, item))
+
+    if instructor_id is not None:
+        taught = _find_taught_course_ids(instructor_id, {str(item['course_id']) for _, item in valid})
+        for index, item in valid:
+            if str(item['course_id']) not in taught:
+                results[index] = {'index': index, 'status': 'error', 'error': 'You do not teach this course.'}
+        valid = [(index, item) for index, item in valid if str(item['course_id']) in taught]
+
+    enrollment_ids = _find_enrollment_ids(
+        {item['student_id'] for _, item in valid},
+        {str(item['course_id']) for _, item in valid},
+    )
+
+    answer_keys = {}
+    documents = []
+    document_indexes = []
+    for index, item in valid:
+        course_id, lesson_id = str(item['course_id']), str(item['lesson_id'])
+        enrollment_id = enrollment_ids.get((item['student_id'], course_id))
+        if enrollment_id is None:
+            results[index] = {'index': index, 'status': 'error', 'error': 'Enrollment not found.'}
+            continue
+
+        question_ids = []
+        if item.get('quiz_token'):
+            # A sampled bank quiz, graded against the questions the token was issued for.
+            try:
+                question_ids = load_quiz_sample(item['quiz_token'], item['student_id'], course_id, lesson_id)
+            except signing.BadSignature:
+                results[index] = {'index': index, 'status': 'error', 'error': 'Invalid or expired quiz_token.'}
+                continue
+            if not question_ids:
+                results[index] = {'index': index, 'status': 'error', 'error': 'The quiz_token has no questions.'}
+                continue
+            answer_key = sampled_answer_key(question_ids)
+        else:
+            if (course_id, lesson_id) not in answer_keys:
+                answer_keys[(course_id, lesson_id)] = get_answer_key(course_id, lesson_id)
+            answer_key = answer_keys[(course_id, lesson_id)]
+            if answer_key is None:
+                results[index] = {'index': index, 'status': 'error', 'error': 'Lesson is not a quiz.'}
+                continue
+            if answer_key.get('sampled'):
+                results[index] = {'index': index, 'status': 'error', 'error': 'quiz_token is required for this quiz.'}
+                continue
+
+        attempt_id = str(item.get('attempt_id') or uuid.uuid4())
+        score = grade_quiz(answer_key, item['answers'])
+        documents.append({
+            'attempt_id': attempt_id,
+            'enrollment_id': str(enrollment_id),
+            'student_id': item['student_id'],
+            'course_id': course_id,
+            'lesson_id': lesson_id,
+            'score': score,
+            'answers': item['answers'],
+            'question_ids': question_ids,
+            'submitted_at': _parse_submitted_at(item.get('submitted_at')),
+        })
+        document_indexes.append(index)
+        results[index] = {'index': index, 'status': 'created', 'attempt_id': attempt_id, 'score': score}
+
+    if documents:
+        try:
+            QuizAttempt.objects.mongo_insert_many(documents, ordered=False)
+        except BulkWriteError as e:
+            # With ordered=False every other document is still written; map failures back to their items.
+            write_errors = e.details.get('writeErrors', [])
+            collisions = [documents[error['index']] for error in write_errors if error.get('code') == DUPLICATE_KEY_ERROR]
+            stored = {
+                doc['attempt_id']: (doc.get('student_id'), doc.get('lesson_id'))
+                for doc in QuizAttempt.objects.mongo_find(
+                    {'attempt_id': {'$in': [document['attempt_id'] for document in collisions]}},
+                    {'attempt_id': 1, 'student_id': 1, 'lesson_id': 1},
+                )
+            } if collisions else {}
+            for write_error in write_errors:
+                index = document_indexes[write_error['index']]
+                document = documents[write_error['index']]
+                if write_error.get('code') != DUPLICATE_KEY_ERROR:
+                    results[index] = {'index': index, 'status': 'error', 'error': write_error.get('errmsg', 'Write failed.')}
+                elif stored.get(document['attempt_id']) == (document['student_id'], document['lesson_id']):
+                    # The same attempt was synced before.
+                    results[index]['status'] = 'duplicate'
+                else:
+                    results[index] = {'index': index, 'status': 'error', 'error': 'attempt_id is already used by another attempt.'}
+
+    return results
+
+
+def _validate_batch_item(item):
+    if not isinstance(item, dict):
+        return 'Each attempt must be an object.'
+    if isinstance(item.get('student_id'), bool) or not isinstance(item.get('student_id'), int):
+        return 'student_id must be an integer.'
+    if not item.get('course_id') or not item.get('lesson_id'):
+        return 'course_id and lesson_id are required.'
+    if not isinstance(item.get('answers'), dict):
+        return 'answers must be an object.'
+    if item.get('attempt_id') is not None and len(str(item['attempt_id'])) > 36:
+        return 'attempt_id must be at most 36 characters.'
+    return None
+
+
+def _find_enrollment_ids(student_ids, course_ids):
+    """ Returns {(student_id, course_id): enrollment _id} using one query. """
+    if not student_ids or not course_ids:
+        return {}
+    cursor = Enrollment.objects.mongo_find(
+        {'student_id': {'$in': list(student_ids)}, 'enrollable_id': {'$in': list(course_ids)}},
+        {'_id': 1, 'student_id': 1, 'enrollable_id': 1},
+    )
+    return {(doc['student_id'], doc['enrollable_id']): doc['_id'] for doc in cursor}
+
+
+def _find_taught_course_ids(instructor_id, course_ids):
+    """ Returns the subset of course_ids taught by the instructor, using one $in query. """
+    object_ids = [oid for oid in map(to_object_id, course_ids) if oid]
+    if not object_ids:
+        return set()
+    cursor = Course.objects.mongo_find({'_id': {'$in': object_ids}, 'instructor_id': instructor_id}, {'_id': 1})
+    return {str(doc['_id']) for doc in cursor}
+
+
+def teaches_course(instructor_id, course_id):
+    """ Whether the instructor teaches the course. """
+    return str(course_id) in _find_taught_course_ids(instructor_id, [course_id])
+
+
+def teaches_lesson(instructor_id, lesson_id):
+    """ Whether the lesson belongs to one of the instructor's courses. """
+    lesson_oid = to_object_id(lesson_id)
+    return lesson_oid is not None and bool(
+        Course.objects.mongo_count_documents({'instructor_id': instructor_id, 'lessons._id': lesson_oid}, limit=1)
+    )
+
+
+def _parse_submitted_at(value):
+    submitted_at = parse_datetime(value) if isinstance(value, str) else None
+    return submitted_at or timezone.now()
+
+
+def bulk_enroll(student_ids, enrollables, chunk_size=BULK_ENROLL_CHUNK_SIZE):
+    """
+    Enrolls many students into many courses or learning paths, e.g. when a B2B
+    contract is signed. `enrollables` is a list of (enrollable_id, enrollable_type).
+
+    Students are processed in chunks: existing (student, enrollable_id) pairs are
+    skipped using one lookup per chunk, the rest are written with one unordered
+    insert_many, and a single batched webhook is queued per chunk instead of one
+    per student (insert_many does not fire post_save).
+
+    Returns {'created': n, 'skipped': n}.
+    """
+    student_ids = list(dict.fromkeys(student_ids)) # De-duplicate, keep order
+    totals = {'created': 0, 'skipped': 0}
+
+    for enrollable_id, enrollable_type in enrollables:
+        enrollable_id = str(enrollable_id)
+        for start in range(0, len(student_ids), chunk_size):
+            chunk = student_ids[start:start + chunk_size]
+            created = _enroll_chunk(chunk, enrollable_id, enrollable_type)
+            totals['created'] += len(created)
+            totals['skipped'] += len(chunk) - len(created)
+
+    logger.info(f"Bulk enrollment finished: {totals['created']} created, {totals['skipped']} skipped")
+    return totals
+
+
+def _enroll_chunk(student_ids, enrollable_id, enrollable_type):
+    """ Inserts the missing enrollments for one chunk of students and queues their webhook. """
+    existing = {
+        document['student_id'] for document in Enrollment.objects.mongo_find(
+            {'enrollable_id': enrollable_id, 'student_id': {'$in': student_ids}},
+            {'student_id': 1},
+        )
+    }
+    now = timezone.now()
+    documents = [
+        {
+            '_id': ObjectId(),
+            'student_id': student_id,
+            'enrollable_id': enrollable_id,
+            'enrollable_type': enrollable_type,
+            'enrollment_date': now,
+            'status': 'in_progress',
+            'progress': 0.0,
+            'completed_lessons': [],
+            'last_accessed_lesson_id': None,
+        }
+        for student_id in student_ids if student_id not in existing
+    ]
+    if not documents:
+        return []
+
+    try:
+        Enrollment.objects.mongo_insert_many(documents, ordered=False)
+    except BulkWriteError as e:
+        # A concurrent request enrolled some of these students first.
+        write_errors = e.details.get('writeErrors', [])
+        if any(error.get('code') != DUPLICATE_KEY_ERROR for error in write_errors):
+            raise
+        failed = {error['index'] for error in write_errors}
+        documents = [document for index, document in enumerate(documents) if index not in failed]
+
+    # insert_many bypasses the post_save signals that keep CourseStats and PlatformStats current.
+    if enrollable_type == 'Course':
+        increment_course_stats(enrollable_id, enrolled_count=len(documents))
+        instructor_id = get_course_instructor_id(enrollable_id)
+        if instructor_id is not None:
+            count_instructor_students([instructor_id])
+    increment_platform_stats('enrollments', 'in_progress', len(documents))
+    invalidate_dashboards('student', [document['student_id'] for document in documents])
+    if enrollable_type == 'Course':
+        invalidate_path_progress(course_ids=[enrollable_id])
+    else:
+        invalidate_path_progress(path_ids=[enrollable_id])
+
+    enqueue_webhook('enrollment.batch_created', 'N8N_BULK_ENROLLMENT_WEBHOOK_URL', {
+        'enrollable_id': enrollable_id,
+        'enrollable_type': enrollable_type,
+        'enrollment_date': now.isoformat(),
+        'enrollments': [
+            {'enrollment_id': str(document['_id']), 'student_id': str(document['student_id'])}
+            for document in documents
+        ],
+    })
+    return documents
+
+
+def enroll_contract_students(contract, chunk_size=BULK_ENROLL_CHUNK_SIZE):
+    """ Enrolls every student covered by a contract into each of its learning paths. """
+    student_ids = list(contract.enrolled_students.values_list('id', flat=True))
+    enrollables = [(str(path_id), 'LearningPath') for path_id in contract.learning_paths.values_list('_id', flat=True)]
+    return bulk_enroll(student_ids, enrollables, chunk_size=chunk_size)
+
+
 def calculate_progress(student, course):
     """
     Placeholder function to calculate a student's progress in a course.
@@ -13,4 +478,4 @@ def generate_certificate(enrollment):
     This might call a reporting service.
     """
     # Logic to verify completion and then call a PDF generation service.
-    pass
\ No newline at end of file
+    pass
@@ -1,25 +1,16 @@
-import requests
-import os
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
+from apps.core.cache import invalidate_dashboards
+from apps.core.outbox import enqueue_webhook
 from .models import Enrollment
-import logging
-
-# Set up a logger for this module
-logger = logging.getLogger(__name__)
 
 @receiver(post_save, sender=Enrollment)
 def trigger_new_enrollment_webhook(sender, instance, created, **kwargs):
     """
-    Sends a webhook to a predefined URL (e.g., n8n) when a new enrollment is created.
+    Queues a webhook to a predefined URL (e.g., n8n) when a new enrollment is created.
+    Delivery happens in the background outbox dispatcher, so saving never waits on n8n.
     """
     if created:
-        webhook_url = os.getenv('N8N_NEW_ENROLLMENT_WEBHOOK_URL')
-        
-        if not webhook_url:
-            logger.warning("N8N_NEW_ENROLLMENT_WEBHOOK_URL is not set. Skipping webhook.")
-            return
-
         payload = {
             'enrollment_id': str(instance._id),
             'student_id': str(instance.student.id),
@@ -27,10 +18,10 @@ def trigger_new_enrollment_webhook(sender, instance, created, **kwargs):
             'enrollable_type': instance.enrollable_type,
             'enrollment_date': instance.enrollment_date.isoformat(),
         }
+        enqueue_webhook('enrollment.created', 'N8N_NEW_ENROLLMENT_WEBHOOK_URL', payload)
 
-        try:
-            response = requests.post(webhook_url, json=payload, timeout=5)
-            response.raise_for_status() # Raises an HTTPError for bad responses (4xx or 5xx)
-            logger.info(f"Successfully sent webhook for enrollment ID {instance._id}")
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Failed to send webhook for enrollment ID {instance._id}: {e}")
\ No newline at end of file
+@receiver(post_save, sender=Enrollment)
+@receiver(post_delete, sender=Enrollment)
+def invalidate_student_dashboard(sender, instance, **kwargs):
+    """ The student's dashboard panel lists their enrollments. """
+    invalidate_dashboards('student', [instance.student_id])
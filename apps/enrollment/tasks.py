@@ -0,0 +1,29 @@
+import logging
+from celery import shared_task
+from apps.reports.services.course_stats import rebuild_course_stats
+from apps.reports.services.path_progress import invalidate_path_progress
+from .services import recompute_course_progress
+
+logger = logging.getLogger(__name__)
+
+@shared_task
+def recompute_course_progress_task(course_id):
+    """
+    Background job that recalculates progress for all enrollments of a course.
+    The course's stats and path summaries are rebuilt afterwards, since every
+    progress value may have moved.
+    """
+    stats = recompute_course_progress(course_id)
+    rebuild_course_stats([course_id])
+    invalidate_path_progress(course_ids=[course_id])
+    return stats
+
+def schedule_course_progress_recompute(course_id):
+    """
+    Queues a progress recomputation for a course. A broker outage must not
+    break the request that changed the course, so failures are only logged.
+    """
+    try:
+        recompute_course_progress_task.delay(str(course_id))
+    except Exception as e:
+        logger.error(f"Failed to schedule progress recomputation for course {course_id}: {e}")
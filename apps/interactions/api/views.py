@@ -14,6 +14,7 @@ from django.shortcuts import get_object_or_404
 from .serializers import AIQuestionSerializer
 from apps.interactions.services import AIAssistantService
 from apps.learning.models import Course, Lesson
+from apps.learning.services import find_lesson
 
 class AIAssistantApiView(APIView):
     """
@@ -38,7 +39,7 @@ class AIAssistantApiView(APIView):
             # 2. Build the context for the AI model
             # This is a critical step to get relevant answers.
             course = get_object_or_404(Course, pk=course_id)
-            lesson = next((l for l in course.lessons if str(l._id) == lesson_id), None)
+            lesson = find_lesson(course, lesson_id)
             
             if not lesson:
                 return Response({'error': 'Lesson not found in this course.'}, status=status.HTTP_404_NOT_FOUND)
@@ -11,10 +11,15 @@ class DiscussionThread(models.Model):
     student = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     title = models.CharField(max_length=255)
     question = models.TextField()
+    is_answered = models.BooleanField(default=False) # Set once the course's instructor replies
     created_at = models.DateTimeField(auto_now_add=True)
 
     objects = models.DjongoManager()
 
+    class Meta:
+        # Serves the newest-first keyset pages of a lesson's discussion.
+        indexes = [models.Index(fields=['lesson_id', '_id'])]
+
     def __str__(self):
         return self.title
 
@@ -30,5 +35,8 @@ class DiscussionPost(models.Model):
 
     objects = models.DjongoManager()
 
+    class Meta:
+        indexes = [models.Index(fields=['thread', '_id'])]
+
     def __str__(self):
         return f"Reply by {self.user.username} on {self.thread.title}"
\ No newline at end of file
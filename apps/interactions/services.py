@@ -2,8 +2,100 @@ import os
 import requests
 import logging
 
+from django.contrib.auth import get_user_model
+
+from apps.core.cache import bump_version
+from apps.learning.services import to_object_id
+from .models import DiscussionThread, DiscussionPost
+
 logger = logging.getLogger(__name__)
 
+DISCUSSION_PAGE_SIZE = 20
+
+
+def discussion_scope(lesson_id):
+    """ The cache-version scope of a lesson's discussion (threads and replies). """
+    return f'discussion:{lesson_id}'
+
+
+def invalidate_discussion(lesson_id):
+    bump_version(discussion_scope(lesson_id))
+
+
+def _from_document(model, document):
+    """ Builds a model instance from a raw document without another query. """
+    return model(**{field.attname: document.get(field.attname) for field in model._meta.concrete_fields})
+
+
+def attach_discussion(threads):
+    """
+    Sets `replies` (oldest first) on every thread and the author of every thread
+    and reply, using one query for the replies and one for the users, however
+    many threads there are. Replies also get `by_instructor`. An author who no
+    longer exists is left unset (the template falls back) and keeps its id.
+    """
+    if not threads:
+        return threads
+    replies = {thread.pk: [] for thread in threads}
+    for document in DiscussionPost.objects.mongo_find({'thread_id': {'$in': list(replies)}}).sort('_id', 1):
+        replies[document['thread_id']].append(_from_document(DiscussionPost, document))
+
+    user_ids = {thread.student_id for thread in threads}
+    user_ids.update(post.user_id for posts in replies.values() for post in posts)
+    users = get_user_model().objects.in_bulk(user_ids)
+    for thread in threads:
+        _attach_author(thread, 'student', users)
+        thread.replies = replies[thread.pk]
+        for post in thread.replies:
+            author = _attach_author(post, 'user', users)
+            post.by_instructor = getattr(author, 'role', None) == 'instructor'
+    return threads
+
+
+def _attach_author(instance, field_name, users):
+    """
+    Sets an author loaded by attach_discussion. A missing author is cached as
+    absent rather than assigned, which would clear the id, and so that the
+    template does not query for it again.
+    """
+    field = instance._meta.get_field(field_name)
+    author = users.get(getattr(instance, field.attname))
+    if author is not None:
+        setattr(instance, field_name, author)
+    else:
+        field.set_cached_value(instance, None)
+    return author
+
+
+def get_discussion_page(lesson_id, before=None, limit=DISCUSSION_PAGE_SIZE):
+    """
+    Returns one page of a lesson's threads, newest first, with their replies and
+    authors attached: {'threads': [...], 'next_cursor': id or None}. `before` is
+    the `next_cursor` of the previous page. A page costs three queries no matter
+    how many threads the lesson has; the (lesson_id, _id) index serves the keyset.
+    """
+    query = {'lesson_id': str(lesson_id)}
+    before_id = to_object_id(before) if before else None
+    if before_id is not None:
+        query['_id'] = {'$lt': before_id}
+    documents = list(DiscussionThread.objects.mongo_find(query).sort('_id', -1).limit(limit + 1))
+
+    threads = [_from_document(DiscussionThread, document) for document in documents[:limit]]
+    has_more = len(documents) > limit
+    return {
+        'threads': attach_discussion(threads),
+        'next_cursor': str(threads[-1].pk) if has_more else None,
+    }
+
+
+def get_thread(thread_id):
+    """ Returns one thread with its replies and authors attached, or None. """
+    thread_oid = to_object_id(thread_id)
+    document = DiscussionThread.objects.mongo_find_one({'_id': thread_oid}) if thread_oid else None
+    if document is None:
+        return None
+    return attach_discussion([_from_document(DiscussionThread, document)])[0]
+
 class AIAssistantService:
     """
     A service to interact with a Large Language Model via OpenRouter API.
@@ -1,53 +1,45 @@
 # =================================================================
 # apps/interactions/signals.py (NEW FILE)
 # -----------------------------------------------------------------
-# KEEPS THE SYSTEM INTEGRATED: This new file defines the logic for
-# sending a webhook whenever a new discussion thread is created.
-# This is a core component of the project's automation strategy.
+# KEEPS THE SYSTEM INTEGRATED: New discussion threads now queue their
+# webhook in the outbox instead of calling n8n inside post_save, so
+# posting a question never waits on (or fails with) the network.
 # =================================================================
 
-import requests
-import os
-import logging
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
-from .models import DiscussionThread
-
-# Set up a logger for this module
-logger = logging.getLogger(__name__)
+from apps.core.outbox import enqueue_webhook
+from .models import DiscussionThread, DiscussionPost
+from .services import invalidate_discussion
 
 @receiver(post_save, sender=DiscussionThread)
 def trigger_new_question_webhook(sender, instance, created, **kwargs):
     """
-    Sends a webhook to a predefined URL (e.g., n8n) when a new
-    discussion thread (question) is created by a student.
+    Queues a webhook to a predefined URL (e.g., n8n) when a new
+    discussion thread (question) is created by a student. The outbox
+    dispatcher delivers it in the background with retries.
     """
     if created:
-        webhook_url = os.getenv('N8N_QUESTION_POSTED_WEBHOOK_URL')
-        
-        if not webhook_url:
-            logger.warning("N8N_QUESTION_POSTED_WEBHOOK_URL is not set. Skipping webhook.")
-            return
-
         # We gather all relevant data to send a rich payload to the automation platform.
-        try:
-            payload = {
-                'thread_id': str(instance._id),
-                'student_id': str(instance.student.id),
-                'student_name': instance.student.full_name or instance.student.username,
-                'course_id': str(instance.course_id),
-                'lesson_id': str(instance.lesson_id),
-                'question_title': instance.title,
-                'question_text': instance.question,
-                'timestamp': instance.created_at.isoformat(),
-            }
+        payload = {
+            'thread_id': str(instance._id),
+            'student_id': str(instance.student.id),
+            'student_name': instance.student.full_name or instance.student.username,
+            'course_id': str(instance.course_id),
+            'lesson_id': str(instance.lesson_id),
+            'question_title': instance.title,
+            'question_text': instance.question,
+            'timestamp': instance.created_at.isoformat(),
+        }
+        enqueue_webhook('discussion.question_posted', 'N8N_QUESTION_POSTED_WEBHOOK_URL', payload)
 
-            response = requests.post(webhook_url, json=payload, timeout=10)
-            # Raises an HTTPError for bad responses (4xx or 5xx)
-            response.raise_for_status() 
-            logger.info(f"Successfully sent 'new question' webhook for thread ID {instance._id}")
+@receiver(post_save, sender=DiscussionThread)
+@receiver(post_delete, sender=DiscussionThread)
+def invalidate_thread_discussion(sender, instance, **kwargs):
+    """ Lesson pages embed the discussion, so their ETags follow its version. """
+    invalidate_discussion(instance.lesson_id)
 
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Failed to send 'new question' webhook for thread ID {instance._id}: {e}")
-        except Exception as e:
-            logger.error(f"An unexpected error occurred while sending 'new question' webhook for thread ID {instance._id}: {e}")
\ No newline at end of file
+@receiver(post_save, sender=DiscussionPost)
+@receiver(post_delete, sender=DiscussionPost)
+def invalidate_post_discussion(sender, instance, **kwargs):
+    invalidate_discussion(instance.thread.lesson_id)
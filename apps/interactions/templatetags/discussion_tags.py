@@ -3,19 +3,21 @@
 # -----------------------------------------------------------------
 # KEEPS THE SYSTEM INTEGRATED: A new template tag `get_post_form`
 # is added to provide the reply form instance to the templates,
-# ensuring a clean separation of concerns.
+# ensuring a clean separation of concerns. Lesson pages now load the
+# first page of their discussion, already joined with replies and
+# authors, so rendering the threads runs no further queries.
 # =================================================================
 
 from django import template
-from ..models import DiscussionThread
 from ..forms import DiscussionThreadForm, DiscussionPostForm
+from ..services import get_discussion_page
 
 register = template.Library()
 
 @register.simple_tag
-def get_discussions_for_lesson(lesson_id):
-    """ Template tag to fetch all discussion threads for a given lesson_id. """
-    return DiscussionThread.objects.filter(lesson_id=str(lesson_id)).order_by('-created_at')
+def get_discussion_first_page(lesson_id):
+    """ Template tag to fetch the newest page of discussion threads for a given lesson_id. """
+    return get_discussion_page(lesson_id)
 
 @register.simple_tag
 def get_discussion_form():
@@ -0,0 +1,61 @@
+from unittest import mock
+from django.test import SimpleTestCase
+from bson import ObjectId
+from apps.interactions.models import DiscussionPost, DiscussionThread
+from apps.interactions.services import _from_document, attach_discussion
+from apps.users.models import CustomUser
+
+class FromDocumentTest(SimpleTestCase):
+    """
+    Test suite for building discussion instances from raw documents.
+    """
+
+    def test_fields_are_read_by_attname(self):
+        thread_id = ObjectId()
+        post = _from_document(DiscussionPost, {'_id': ObjectId(), 'thread_id': thread_id, 'user_id': 7, 'reply_text': 'Hi'})
+        self.assertEqual(post.thread_id, thread_id)
+        self.assertEqual(post.user_id, 7)
+        self.assertEqual(post.reply_text, 'Hi')
+        self.assertIsNone(post.created_at)
+
+@mock.patch('apps.interactions.services.get_user_model')
+@mock.patch.object(DiscussionPost, 'objects')
+class AttachDiscussionTest(SimpleTestCase):
+    """
+    Test suite for joining replies and authors onto a page of threads.
+    """
+
+    def setUp(self):
+        self.student = CustomUser(id=1, username='student', role=CustomUser.Roles.STUDENT)
+        self.instructor = CustomUser(id=2, username='teacher', role=CustomUser.Roles.INSTRUCTOR)
+        self.thread = _from_document(DiscussionThread, {'_id': ObjectId(), 'student_id': 1, 'title': 'Q'})
+
+    def reply(self, user_id):
+        return {'_id': ObjectId(), 'thread_id': self.thread.pk, 'user_id': user_id, 'reply_text': '...'}
+
+    def test_replies_and_authors_are_joined(self, post_objects, get_user_model):
+        post_objects.mongo_find.return_value.sort.return_value = [self.reply(2), self.reply(1)]
+        get_user_model.return_value.objects.in_bulk.return_value = {1: self.student, 2: self.instructor}
+
+        attach_discussion([self.thread])
+        self.assertIs(self.thread.student, self.student)
+        self.assertEqual([post.user for post in self.thread.replies], [self.instructor, self.student])
+        self.assertEqual([post.by_instructor for post in self.thread.replies], [True, False])
+        # One query for the replies and one for all the authors.
+        post_objects.mongo_find.assert_called_once_with({'thread_id': {'$in': [self.thread.pk]}})
+        get_user_model.return_value.objects.in_bulk.assert_called_once_with({1, 2})
+
+    def test_missing_authors_keep_their_ids(self, post_objects, get_user_model):
+        post_objects.mongo_find.return_value.sort.return_value = [self.reply(3)]
+        get_user_model.return_value.objects.in_bulk.return_value = {}
+
+        attach_discussion([self.thread])
+        post = self.thread.replies[0]
+        self.assertEqual((self.thread.student_id, post.user_id), (1, 3))
+        self.assertFalse(post.by_instructor)
+        with self.assertRaises(CustomUser.DoesNotExist):
+            post.user # Cached as absent, so no query is made
+
+    def test_no_threads(self, post_objects, get_user_model):
+        self.assertEqual(attach_discussion([]), [])
+        post_objects.mongo_find.assert_not_called()
@@ -4,16 +4,21 @@
 # KEEPS THE SYSTEM INTEGRATED: This file is updated with a new view,
 # AddDiscussionPostView, which handles the logic for posting replies.
 # This makes the discussion forum a fully interactive, two-way
-# communication tool as intended.
+# communication tool as intended. Threads are rendered one page at a
+# time, and DiscussionThreadPageView serves the "load more" pages.
 # =================================================================
 
+from django.http import Http404
+from django.views import View
 from django.views.generic import CreateView, TemplateView
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.shortcuts import get_object_or_404, render
 
 from .models import DiscussionThread, DiscussionPost
 from .forms import DiscussionThreadForm, DiscussionPostForm
+from .services import get_discussion_page, get_thread
 from apps.learning.models import Course
+from apps.learning.services import to_object_id
 
 class AddDiscussionThreadView(LoginRequiredMixin, CreateView):
     model = DiscussionThread
@@ -30,10 +35,8 @@ class AddDiscussionThreadView(LoginRequiredMixin, CreateView):
         thread.lesson_id = lesson_id
         thread.save()
 
-        # After saving, re-render the list of discussions to show the new one
-        threads = DiscussionThread.objects.filter(lesson_id=lesson_id).order_by('-created_at')
+        # After saving, re-render the first page of discussions to show the new one
         context = {
-            'threads': threads,
             'course': course,
             'current_lesson_id': lesson_id
         }
@@ -67,12 +70,27 @@ class AddDiscussionPostView(LoginRequiredMixin, UserPassesTestMixin, CreateView)
         
         # After saving, re-render the thread detail partial to update the UI
         # This will replace the thread content with the newly added reply.
-        context = {'thread': thread}
+        context = {'thread': get_thread(thread.pk)}
         response = render(self.request, self.template_name, context)
         response['HX-Trigger-Detail'] = '{"message": "Your reply has been posted."}'
         response['HX-Trigger'] = 'showToast'
         return response
 
+class DiscussionThreadPageView(LoginRequiredMixin, View):
+    """
+    Returns the next page of a lesson's threads for the "load more" button,
+    starting after the `before` thread id.
+    """
+    template_name = 'interactions/partials/_discussion_threads.html'
+
+    def get(self, request, lesson_id):
+        before = request.GET.get('before')
+        if to_object_id(before) is None:
+            raise Http404
+        page = get_discussion_page(lesson_id, before=before)
+        context = {'threads': page['threads'], 'next_cursor': page['next_cursor'], 'lesson_id': lesson_id}
+        return render(request, self.template_name, context)
+
 class AIChatFormView(LoginRequiredMixin, TemplateView):
     template_name = 'interactions/partials/_ai_chat_form.html'
     def get_context_data(self, **kwargs):
@@ -1,15 +1,50 @@
-from django.contrib import admin
-from .models import Course, LearningPath
+from django import forms
+from django.contrib import admin, messages
+from django.http import HttpResponseRedirect
+from .models import BankQuestion, ContentVersionConflict, Course, LearningPath
+
+CONTENT_VERSION_CONFLICT_MESSAGE = "This item was changed by someone else since you opened it. Reload the page and try again."
+
+class ContentVersionAdminForm(forms.ModelForm):
+    """ Refuses to save a change form opened before someone else changed the document. """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if 'content_version' in self.fields:
+            # Carries the version the form was opened at; it is not for editing.
+            self.fields['content_version'].widget = forms.HiddenInput()
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if not self.instance._state.adding and cleaned_data.get('content_version') != self.instance.content_version:
+            raise forms.ValidationError(CONTENT_VERSION_CONFLICT_MESSAGE)
+        return cleaned_data
+
+class ContentVersionAdmin(admin.ModelAdmin):
+    """ Admin for versioned documents; a change that lands after validation is reported, not a 500. """
+    form = ContentVersionAdminForm
+
+    def changeform_view(self, request, object_id=None, form_url='', extra_context=None):
+        try:
+            return super().changeform_view(request, object_id, form_url, extra_context)
+        except ContentVersionConflict:
+            messages.error(request, CONTENT_VERSION_CONFLICT_MESSAGE)
+            return HttpResponseRedirect(request.get_full_path())
 
 @admin.register(Course)
-class CourseAdmin(admin.ModelAdmin):
+class CourseAdmin(ContentVersionAdmin):
     list_display = ('title', 'instructor', 'category', 'status', 'created_at')
     list_filter = ('status', 'category', 'instructor')
     search_fields = ('title', 'description')
     prepopulated_fields = {'slug': ('title',)}
 
 @admin.register(LearningPath)
-class LearningPathAdmin(admin.ModelAdmin):
+class LearningPathAdmin(ContentVersionAdmin):
     list_display = ('title', 'supervisor', 'created_at')
     list_filter = ('supervisor',)
-    search_fields = ('title', 'description')
\ No newline at end of file
+    search_fields = ('title', 'description')
+
+@admin.register(BankQuestion)
+class BankQuestionAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'course_id', 'lesson_id', 'difficulty', 'created_at')
+    list_filter = ('difficulty',)
+    search_fields = ('question_text',)
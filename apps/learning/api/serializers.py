@@ -1,12 +1,65 @@
 from rest_framework import serializers
+from apps.core.api.serializers import SparseFieldsetsMixin
 from apps.learning.models import Course, LearningPath
 
-class CourseSerializer(serializers.ModelSerializer):
+class CourseSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
+    """ The full course, lessons and their content included (detail and write endpoints). """
     class Meta:
         model = Course
         fields = '__all__'
 
-class LearningPathSerializer(serializers.ModelSerializer):
+class LessonSummarySerializer(serializers.Serializer):
+    _id = serializers.CharField()
+    title = serializers.CharField()
+    order = serializers.IntegerField()
+    content_type = serializers.CharField()
+    is_previewable = serializers.BooleanField()
+
+class CourseSummarySerializer(SparseFieldsetsMixin, serializers.Serializer):
+    """
+    Serializes a CourseSummary for the course list. Lesson outlines (never their
+    content_data) are only included with ?expand=lessons.
+    """
+    _id = serializers.CharField()
+    title = serializers.CharField()
+    slug = serializers.CharField()
+    description = serializers.CharField()
+    category = serializers.CharField()
+    status = serializers.CharField()
+    cover_image_url = serializers.CharField()
+    instructor = serializers.IntegerField(source='instructor_id')
+    created_at = serializers.DateTimeField()
+    updated_at = serializers.DateTimeField()
+    content_version = serializers.IntegerField()
+    lesson_count = serializers.IntegerField(source='manifest.lesson_count')
+    lessons = LessonSummarySerializer(many=True)
+
+    class Meta:
+        expandable_fields = ('lessons',)
+
+class LearningPathSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     class Meta:
         model = LearningPath
-        fields = '__all__'
\ No newline at end of file
+        fields = '__all__'
+
+class ModuleSerializer(serializers.Serializer):
+    course_id = serializers.CharField()
+    order = serializers.IntegerField()
+
+class LearningPathSummarySerializer(SparseFieldsetsMixin, serializers.Serializer):
+    """ Serializes raw learning path documents for the list; modules are only included with ?expand=modules. """
+    _id = serializers.CharField()
+    title = serializers.CharField()
+    description = serializers.CharField(allow_null=True)
+    supervisor = serializers.IntegerField(source='supervisor_id', allow_null=True)
+    created_at = serializers.DateTimeField(allow_null=True)
+    updated_at = serializers.DateTimeField(allow_null=True)
+    content_version = serializers.IntegerField(default=0)
+    module_count = serializers.SerializerMethodField()
+    modules = ModuleSerializer(many=True, required=False)
+
+    class Meta:
+        expandable_fields = ('modules',)
+
+    def get_module_count(self, document):
+        return len(document.get('modules') or [])
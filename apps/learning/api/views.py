@@ -12,53 +12,207 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from bson import ObjectId
 
-from apps.learning.models import Course, LearningPath
-from .serializers import CourseSerializer, LearningPathSerializer
+from apps.core.api.pagination import MongoListMixin
+from apps.core.api.serializers import sparse_projection
+from apps.core.http import ConditionalGetMixin
+from apps.learning.models import BankQuestion, ContentVersionConflict, Course, LearningPath
+from apps.learning.services import (
+    COURSES_SCOPE, LEARNING_PATHS_SCOPE, MANIFEST_PROJECTION, CourseConflict, CourseSummary, existing_course_ids,
+    parse_content_version, reorder_lessons, to_object_id,
+)
+from apps.learning.question_bank import BANK_SAMPLE_MAX_SIZE, configure_lesson_bank, import_bank_questions
+from apps.learning.quiz_import import QUIZ_IMPORT_MODES, QuizImportError, import_quiz, parse_quiz_import
+from .serializers import CourseSerializer, CourseSummarySerializer, LearningPathSerializer, LearningPathSummarySerializer
 
-class CourseViewSet(viewsets.ModelViewSet):
+class ContentVersionConflictMixin:
+    """
+    Full updates (PUT/PATCH) are saved against the `content_version` sent with
+    them, or the one just loaded; a concurrent change is reported with 409.
+    """
+
+    def update(self, request, *args, **kwargs):
+        try:
+            return super().update(request, *args, **kwargs)
+        except ContentVersionConflict:
+            return Response(
+                {'error': 'This item was changed by someone else. Reload it and try again.'},
+                status=status.HTTP_409_CONFLICT,
+            )
+
+class CourseViewSet(ContentVersionConflictMixin, ConditionalGetMixin, MongoListMixin, viewsets.ModelViewSet):
     """
     API endpoint for managing Courses.
     Includes custom actions for interactive content management.
+    GET responses carry ETags and are answered with 304 when unchanged.
+    The list is cursor-paginated and omits lessons unless ?expand=lessons;
+    the detail endpoint returns the full course. Both accept ?fields=.
     """
     queryset = Course.objects.all()
     serializer_class = CourseSerializer
     permission_classes = [permissions.IsAuthenticated] # Basic protection, can be refined
+    list_version_scope = COURSES_SCOPE
+
+    # Serializer field -> course document fields it is built from
+    LIST_FIELD_SOURCES = {
+        '_id': [],
+        'instructor': ['instructor_id'],
+        'lesson_count': ['lessons._id'],
+        'lessons': [field for field in MANIFEST_PROJECTION if field.startswith('lessons.')],
+    }
+
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return CourseSummarySerializer
+        return super().get_serializer_class()
+
+    def get_list_projection(self):
+        return sparse_projection(CourseSummarySerializer, self.request, self.LIST_FIELD_SOURCES)
+
+    def to_list_item(self, document):
+        return CourseSummary(document)
 
     @action(detail=True, methods=['post'], url_path='update-lesson-order')
     def update_lesson_order(self, request, pk=None):
         """
         Receives an ordered list of lesson IDs via an HTMX request
         and updates the 'order' attribute for each lesson in the course.
+        Only the listed orders are written; when the request carries the
+        course's `content_version`, a concurrent edit is reported with 409.
         """
-        course = self.get_object()
         lesson_ids_order = request.data.get('lesson_order', [])
         
         if not isinstance(lesson_ids_order, list):
             return Response({'error': 'lesson_order must be a list'}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Create a mapping of lesson_id to its new order index
-        order_map = {lesson_id: index for index, lesson_id in enumerate(lesson_ids_order)}
-
-        # Update the order for each lesson present in the map
-        for lesson in course.lessons:
-            lesson_id_str = str(lesson._id)
-            if lesson_id_str in order_map:
-                lesson.order = order_map[lesson_id_str]
+        try:
+            content_version = reorder_lessons(
+                pk, lesson_ids_order, parse_content_version(request.data.get('content_version')),
+            )
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except Course.DoesNotExist:
+            return Response({'error': 'Course not found.'}, status=status.HTTP_404_NOT_FOUND)
+        except CourseConflict:
+            return Response(
+                {'error': 'The course was changed by someone else. Reload it and try again.'},
+                status=status.HTTP_409_CONFLICT,
+            )
         
-        # Sort the lessons array in the document based on the new order
-        course.lessons.sort(key=lambda l: l.order)
-        course.save()
-        
-        return Response({'status': 'Lesson order updated successfully'}, status=status.HTTP_200_OK)
+        return Response(
+            {'status': 'Lesson order updated successfully', 'content_version': content_version},
+            status=status.HTTP_200_OK,
+        )
 
-class LearningPathViewSet(viewsets.ModelViewSet):
+    @action(detail=True, methods=['post'], url_path=r'lessons/(?P<lesson_id>[0-9a-fA-F]{24})/import-quiz')
+    def import_quiz(self, request, pk=None, lesson_id=None):
+        """
+        Imports a question set into a quiz lesson. The body is either a multipart
+        upload (`file`, .json or .ndjson) or the raw file with Content-Type
+        application/x-ndjson or application/json. NDJSON is read line by line.
+        ?mode=replace (default) replaces the quiz, ?mode=append adds to it, and
+        ?content_version= guards against concurrent edits. Nothing is written
+        unless every question is valid.
+
+        With ?target=bank the questions go to the lesson's question bank instead
+        (tagged with ?tags=a,b and ?difficulty=), and ?sample_size=N makes the quiz
+        draw N random bank questions per attempt.
+        """
+        course = Course.objects.mongo_find_one({'_id': to_object_id(pk)}, {'instructor_id': 1})
+        if course is None:
+            return Response({'error': 'Course not found.'}, status=status.HTTP_404_NOT_FOUND)
+        if request.user.role != 'admin' and course.get('instructor_id') != request.user.pk:
+            return Response({'error': 'Only the course instructor can import quizzes.'}, status=status.HTTP_403_FORBIDDEN)
+        params = request.query_params
+        mode = params.get('mode', 'replace')
+        if mode not in QUIZ_IMPORT_MODES:
+            return Response({'error': f"mode must be one of: {', '.join(QUIZ_IMPORT_MODES)}"}, status=status.HTTP_400_BAD_REQUEST)
+        target = params.get('target', 'quiz')
+        difficulties = {value for value, _ in BankQuestion._meta.get_field('difficulty').choices}
+        if target not in ('quiz', 'bank'):
+            return Response({'error': "target must be 'quiz' or 'bank'"}, status=status.HTTP_400_BAD_REQUEST)
+        if params.get('difficulty') and params['difficulty'] not in difficulties:
+            return Response({'error': f"difficulty must be one of: {', '.join(sorted(difficulties))}"}, status=status.HTTP_400_BAD_REQUEST)
+        sample_size = params.get('sample_size')
+        if sample_size is not None and (not sample_size.isdigit() or not 0 < int(sample_size) <= BANK_SAMPLE_MAX_SIZE):
+            return Response({'error': f'sample_size must be between 1 and {BANK_SAMPLE_MAX_SIZE}.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        if target == 'bank':
+            quiz_lesson = {'_id': to_object_id(pk), 'lessons': {'$elemMatch': {'_id': to_object_id(lesson_id), 'content_type': 'quiz'}}}
+            if not Course.objects.mongo_count_documents(quiz_lesson, limit=1):
+                return Response({'error': 'Quiz lesson not found.'}, status=status.HTTP_404_NOT_FOUND)
+
+        # Checked before touching request.FILES, which would make DRF parse (and reject) an NDJSON body.
+        if request.content_type.startswith('multipart/'):
+            stream = request.FILES.get('file')
+            fmt = 'ndjson' if stream is not None and stream.name.endswith(('.ndjson', '.jsonl')) else 'json'
+        else:
+            stream = request.stream
+            fmt = 'ndjson' if 'ndjson' in request.content_type or 'jsonl' in request.content_type else 'json'
+        if stream is None:
+            return Response({'error': 'No file was sent.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            questions = parse_quiz_import(stream, fmt)
+        except QuizImportError as e:
+            return Response({'error': str(e), 'errors': e.errors}, status=status.HTTP_400_BAD_REQUEST)
+        expected_version = parse_content_version(params.get('content_version'))
+        if target == 'bank':
+            tags = [tag.strip() for tag in params.get('tags', '').split(',') if tag.strip()]
+            imported = import_bank_questions(pk, lesson_id, questions, tags, params.get('difficulty', ''))
+            response = {'status': 'success', 'imported': imported, 'target': 'bank'}
+            if sample_size is not None:
+                config = {'size': int(sample_size), 'tags': tags, 'difficulty': params.get('difficulty', ''), 'scope': 'lesson'}
+                try:
+                    response['content_version'] = configure_lesson_bank(pk, lesson_id, config, expected_version)
+                except Course.DoesNotExist:
+                    return Response({'error': 'Course not found.'}, status=status.HTTP_404_NOT_FOUND)
+                except CourseConflict:
+                    return Response(
+                        {'error': 'The questions were added to the bank, but the course was changed by someone else, '
+                                  'so the quiz sampling was not configured.', 'imported': imported},
+                        status=status.HTTP_409_CONFLICT,
+                    )
+            return Response(response, status=status.HTTP_200_OK)
+
+        try:
+            content_version = import_quiz(pk, lesson_id, questions, mode, expected_version)
+        except Course.DoesNotExist:
+            return Response({'error': 'Course not found.'}, status=status.HTTP_404_NOT_FOUND)
+        except CourseConflict:
+            return Response(
+                {'error': 'The lesson is not a quiz of this course, or the course was changed by someone else.'},
+                status=status.HTTP_409_CONFLICT,
+            )
+        return Response(
+            {'status': 'success', 'imported': len(questions), 'mode': mode, 'content_version': content_version},
+            status=status.HTTP_200_OK,
+        )
+
+class LearningPathViewSet(ContentVersionConflictMixin, ConditionalGetMixin, MongoListMixin, viewsets.ModelViewSet):
     """
     API endpoint for managing Learning Paths.
     Includes custom actions for the visual path builder.
+    GET responses carry ETags and are answered with 304 when unchanged.
+    The list is cursor-paginated and omits modules unless ?expand=modules.
     """
     queryset = LearningPath.objects.all()
     serializer_class = LearningPathSerializer
     permission_classes = [permissions.IsAuthenticated]
+    list_version_scope = LEARNING_PATHS_SCOPE
+
+    LIST_FIELD_SOURCES = {
+        '_id': [],
+        'supervisor': ['supervisor_id'],
+        'module_count': ['modules'],
+    }
+
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return LearningPathSummarySerializer
+        return super().get_serializer_class()
+
+    def get_list_projection(self):
+        return sparse_projection(LearningPathSummarySerializer, self.request, self.LIST_FIELD_SOURCES)
 
     @action(detail=True, methods=['post'], url_path='update-structure')
     def update_structure(self, request, pk=None):
@@ -72,15 +226,19 @@ class LearningPathViewSet(viewsets.ModelViewSet):
         if not isinstance(course_ids, list):
             return Response({'error': 'course_ids must be a list'}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Rebuild the modules array with the correct structure and order
-        new_modules = []
-        for index, course_id in enumerate(course_ids):
-            # Ensure the course actually exists before adding it
-            if Course.objects.filter(pk=course_id).exists():
-                module_instance = {'course_id': course_id, 'order': index}
-                new_modules.append(module_instance)
+        # Rebuild the modules array with the correct structure and order, keeping only
+        # courses that exist (validated with one query) and listing each course once.
+        existing = existing_course_ids(map(str, course_ids))
+        valid_ids = list(dict.fromkeys(str(course_id) for course_id in course_ids if str(course_id) in existing))
+        new_modules = [{'course_id': course_id, 'order': index} for index, course_id in enumerate(valid_ids)]
         
         learning_path.modules = new_modules
-        learning_path.save()
+        try:
+            learning_path.save()
+        except ContentVersionConflict:
+            return Response(
+                {'error': 'The learning path was changed by someone else. Reload it and try again.'},
+                status=status.HTTP_409_CONFLICT,
+            )
 
         return Response({'status': 'Learning path structure updated successfully'}, status=status.HTTP_200_OK)
\ No newline at end of file
@@ -1,6 +1,7 @@
 from djongo import models
 from django.conf import settings
 from bson import ObjectId
+from pymongo import ReturnDocument
 
 # --- Embedded Models for Quizzes ---
 
@@ -28,6 +29,45 @@ class Question(models.Model):
 
 # --- Main Learning Models ---
 
+class ContentVersionConflict(Exception):
+    """ The document was changed by someone else since the copy being saved was loaded. """
+
+
+def content_version_match(version):
+    """ The query value matching a stored content_version (documents saved before it existed have none). """
+    return {'$in': [version, None]} if version == 0 else version
+
+
+class ContentVersionMixin:
+    """
+    Bumps content_version on every save. Saving a document that already exists
+    first claims the next version with a conditional $inc on the version the copy
+    was loaded (or submitted) with, the same guard targeted updates use. A stale
+    copy raises ContentVersionConflict instead of overwriting newer content under
+    a version number that is already taken. The full save that follows never
+    writes content_version, so a targeted update landing in between can only
+    move the version forward.
+    """
+
+    def save(self, *args, **kwargs):
+        if self._state.adding:
+            self.content_version = (self.content_version or 0) + 1
+        else:
+            claimed = type(self).objects.mongo_find_one_and_update(
+                {'_id': self.pk, 'content_version': content_version_match(self.content_version or 0)},
+                {'$inc': {'content_version': 1}},
+                projection={'content_version': 1},
+                return_document=ReturnDocument.AFTER,
+            )
+            if claimed is None:
+                raise ContentVersionConflict()
+            self.content_version = claimed['content_version']
+            update_fields = kwargs.pop('update_fields', None)
+            if update_fields is None:
+                update_fields = [field.name for field in self._meta.concrete_fields if not field.primary_key]
+            kwargs['update_fields'] = [name for name in update_fields if name != 'content_version']
+        super().save(*args, **kwargs)
+
 class Lesson(models.Model):
     """ Represents a single lesson within a course (Embedded). """
     _id = models.ObjectIdField(default=ObjectId)
@@ -50,7 +90,26 @@ class Lesson(models.Model):
     class Meta:
         abstract = True
 
-class Course(models.Model):
+class CourseManager(models.DjongoManager):
+    """ The default djongo manager plus lightweight summary reads. """
+
+    def summaries(self, query=None, with_instructors=False):
+        """
+        Returns CourseSummary objects (course metadata plus a lesson manifest)
+        for the courses matching a raw MongoDB filter, sorted by title. Lesson
+        content_data never leaves the database; load a single lesson with
+        apps.learning.services.get_lesson_content when it is rendered.
+        """
+        from .services import COURSE_SUMMARY_PROJECTION, CourseSummary, attach_instructors
+        summaries = [
+            CourseSummary(document)
+            for document in self.mongo_find(query or {}, COURSE_SUMMARY_PROJECTION).sort('title', 1)
+        ]
+        if with_instructors:
+            attach_instructors(summaries)
+        return summaries
+
+class Course(ContentVersionMixin, models.Model):
     """ Represents a single, self-contained course. """
     _id = models.ObjectIdField()
     title = models.CharField(max_length=255)
@@ -70,17 +129,54 @@ class Course(models.Model):
     )
     cover_image_url = models.URLField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, null=True)
+    # Incremented on every write; clients revalidate cached copies against it (ETag).
+    content_version = models.PositiveIntegerField(default=0)
     
     lessons = models.ArrayField(
         model_container=Lesson,
         default=list
     )
 
-    objects = models.DjongoManager()
+    objects = CourseManager()
 
     def __str__(self):
         return self.title
 
+class BankQuestion(models.Model):
+    """
+    A question in a course's question bank. Banks live in their own collection,
+    so they can grow to any size without touching the Course document; a quiz
+    lesson whose content_data has a 'bank' entry samples its questions from here.
+    """
+    _id = models.ObjectIdField()
+    course_id = models.CharField(max_length=24)
+    lesson_id = models.CharField(max_length=24, blank=True) # Empty for questions shared by the whole course
+    tags = models.JSONField(default=list)
+    difficulty = models.CharField(
+        max_length=10,
+        choices=[('easy', 'Easy'), ('medium', 'Medium'), ('hard', 'Hard')],
+        blank=True
+    )
+    question_text = models.TextField()
+    answers = models.ArrayField(
+        model_container=Answer,
+        default=list
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = models.DjongoManager()
+
+    class Meta:
+        # Every sampling $match starts with the course; tags is a multikey index.
+        indexes = [
+            models.Index(fields=['course_id', 'lesson_id', 'difficulty']),
+            models.Index(fields=['course_id', 'tags']),
+        ]
+
+    def __str__(self):
+        return self.question_text[:80]
+
 class Module(models.Model):
     """ Represents a module within a Learning Path (Embedded). """
     course_id = models.CharField(max_length=24) # Storing ObjectId as string
@@ -89,7 +185,7 @@ class Module(models.Model):
     class Meta:
         abstract = True
 
-class LearningPath(models.Model):
+class LearningPath(ContentVersionMixin, models.Model):
     """ Represents a high-level learning path or diploma. """
     _id = models.ObjectIdField()
     title = models.CharField(max_length=255)
@@ -101,6 +197,8 @@ class LearningPath(models.Model):
         related_name='paths_supervised'
     )
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, null=True)
+    content_version = models.PositiveIntegerField(default=0)
 
     modules = models.ArrayField(
         model_container=Module,
@@ -0,0 +1,127 @@
+# =================================================================
+# apps/learning/question_bank.py
+# -----------------------------------------------------------------
+# KEEPS THE SYSTEM INTEGRATED: This new file serves quizzes from the
+# BankQuestion collection. Each attempt gets its own random sample,
+# drawn with an indexed $match followed by $sample. The sampled
+# question ids travel with the quiz form in a signed token, so the
+# submission is graded against exactly the questions the student saw.
+# =================================================================
+
+from django.core import signing
+from django.utils import timezone
+
+from .models import BankQuestion
+from .services import CourseConflict, compile_answer_key, to_object_id, update_course
+
+QUIZ_SAMPLE_SALT = 'learning.quiz-sample'
+QUIZ_SAMPLE_MAX_AGE = 60 * 60 * 6 # A sampled quiz must be submitted within six hours
+BANK_SAMPLE_MAX_SIZE = 200
+
+# What the quiz page shows: never whether an answer is correct.
+BANK_QUESTION_DISPLAY_PROJECTION = {'question_text': 1, 'answers._id': 1, 'answers.answer_text': 1}
+
+
+def get_bank_config(content_data):
+    """
+    Returns the bank settings of a quiz lesson's content_data, or None if the
+    quiz uses its embedded questions. Settings look like {'size': 20, 'tags':
+    ['loops'], 'difficulty': 'medium', 'scope': 'lesson' | 'course'}.
+    """
+    bank = (content_data or {}).get('bank')
+    return bank if bank and bank.get('size') else None
+
+
+def bank_query(course_id, lesson_id, config):
+    query = {'course_id': str(course_id)}
+    if config.get('scope') != 'course':
+        query['lesson_id'] = str(lesson_id)
+    if config.get('tags'):
+        query['tags'] = {'$all': list(config['tags'])}
+    if config.get('difficulty'):
+        query['difficulty'] = config['difficulty']
+    return query
+
+
+def sample_questions(course_id, lesson_id, config):
+    """
+    Draws a random set of `config['size']` questions for one attempt. The
+    indexed $match narrows the bank before $sample, and the answers' is_correct
+    flags are projected away.
+    """
+    size = min(int(config['size']), BANK_SAMPLE_MAX_SIZE)
+    pipeline = [
+        {'$match': bank_query(course_id, lesson_id, config)},
+        {'$sample': {'size': size}},
+        {'$project': BANK_QUESTION_DISPLAY_PROJECTION},
+    ]
+    return list(BankQuestion.objects.mongo_aggregate(pipeline))
+
+
+def sign_quiz_sample(student_id, course_id, lesson_id, questions):
+    """ Returns the token that binds a sampled question set to one student and quiz. """
+    return signing.dumps(
+        {'s': student_id, 'c': str(course_id), 'l': str(lesson_id), 'q': [str(q['_id']) for q in questions]},
+        salt=QUIZ_SAMPLE_SALT,
+        compress=True,
+    )
+
+
+def load_quiz_sample(token, student_id, course_id, lesson_id):
+    """
+    Returns the question ids a quiz token was issued for. Raises
+    signing.BadSignature if the token is forged, expired or issued for another
+    student or quiz.
+    """
+    data = signing.loads(token, salt=QUIZ_SAMPLE_SALT, max_age=QUIZ_SAMPLE_MAX_AGE)
+    if (data.get('s'), data.get('c'), data.get('l')) != (student_id, str(course_id), str(lesson_id)):
+        raise signing.BadSignature("The quiz token belongs to another quiz.")
+    return data['q']
+
+
+def sampled_answer_key(question_ids):
+    """
+    Compiles the answer key of a sampled question set with one $in query. Keys
+    follow the order the questions were shown in, like the take-quiz form.
+    """
+    object_ids = [oid for oid in map(to_object_id, question_ids) if oid]
+    documents = {
+        str(document['_id']): document
+        for document in BankQuestion.objects.mongo_find(
+            {'_id': {'$in': object_ids}}, {'answers._id': 1, 'answers.is_correct': 1},
+        )
+    }
+    # A question deleted since the sample was drawn still counts, with no correct answer.
+    questions = [documents.get(str(question_id), {'answers': []}) for question_id in question_ids]
+    return compile_answer_key({'questions': questions})
+
+
+def import_bank_questions(course_id, lesson_id, questions, tags=(), difficulty=''):
+    """ Adds imported question documents (see quiz_import) to the bank with one unordered insert. """
+    now = timezone.now()
+    documents = [
+        {
+            **question,
+            'course_id': str(course_id),
+            'lesson_id': str(lesson_id or ''),
+            'tags': list(tags),
+            'difficulty': difficulty or '',
+            'created_at': now,
+        }
+        for question in questions
+    ]
+    BankQuestion.objects.mongo_insert_many(documents, ordered=False)
+    return len(documents)
+
+
+def configure_lesson_bank(course_id, lesson_id, config, expected_version=None):
+    """ Makes a quiz lesson sample its questions from the bank. Returns the new content_version. """
+    lesson_oid = to_object_id(lesson_id)
+    if lesson_oid is None:
+        raise CourseConflict()
+    return update_course(
+        course_id,
+        {'$set': {'lessons.$.content_data.bank': config}},
+        expected_version,
+        query={'lessons': {'$elemMatch': {'_id': lesson_oid, 'content_type': 'quiz'}}},
+    )
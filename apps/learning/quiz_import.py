@@ -0,0 +1,142 @@
+# =================================================================
+# apps/learning/quiz_import.py
+# -----------------------------------------------------------------
+# KEEPS THE SYSTEM INTEGRATED: This new file imports whole question
+# sets into a quiz lesson, e.g. exams migrated from another LMS.
+# NDJSON uploads are read line by line, every question is validated
+# in the same pass, and the quiz is written with one targeted update
+# only if the whole file is valid.
+# =================================================================
+
+import codecs
+import json
+
+from bson import ObjectId
+
+from .services import CourseConflict, to_object_id, update_course
+
+QUIZ_IMPORT_MAX_QUESTIONS = 5000 # Keeps the course document far below MongoDB's 16 MB limit
+QUIZ_IMPORT_MAX_ERRORS = 50 # Reported errors; validation still covers the whole file
+QUIZ_IMPORT_MODES = ('replace', 'append')
+
+
+class QuizImportError(Exception):
+    """ The import file is invalid. `errors` lists what is wrong, by question. """
+
+    def __init__(self, errors, total_errors=None):
+        super().__init__(f"{total_errors or len(errors)} invalid question(s).")
+        self.errors = errors
+        self.total_errors = total_errors or len(errors)
+
+
+def iter_records(stream, fmt):
+    """
+    Yields (location, record) pairs from an import file. NDJSON is decoded one line
+    at a time (blank lines are skipped); JSON must hold a list of questions or
+    {'questions': [...]} and is parsed as a whole. Undecodable lines are yielded
+    as a ValueError record so that they are reported like invalid questions. A file
+    that is not valid UTF-8 raises QuizImportError.
+    """
+    if fmt == 'ndjson':
+        try:
+            for number, line in enumerate(codecs.iterdecode(stream, 'utf-8'), start=1):
+                if not line.strip():
+                    continue
+                try:
+                    yield f'line {number}', json.loads(line)
+                except ValueError as e:
+                    yield f'line {number}', ValueError(f"Invalid JSON: {e}")
+        except UnicodeDecodeError:
+            raise QuizImportError([{'at': 'file', 'error': 'File is not valid UTF-8.'}])
+        return
+
+    try:
+        data = json.load(codecs.getreader('utf-8')(stream))
+    except UnicodeDecodeError:
+        raise QuizImportError([{'at': 'file', 'error': 'File is not valid UTF-8.'}])
+    except ValueError as e:
+        raise QuizImportError([{'at': 'file', 'error': f"Invalid JSON: {e}"}])
+    questions = data.get('questions') if isinstance(data, dict) else data
+    if not isinstance(questions, list):
+        raise QuizImportError([{'at': 'file', 'error': "Expected a list of questions or {'questions': [...]}."}])
+    for number, record in enumerate(questions, start=1):
+        yield f'question {number}', record
+
+
+def build_question(record):
+    """
+    Validates one imported question and returns it as a quiz question document.
+    Answers are either [{'answer_text', 'is_correct'}, ...] or a list of strings
+    with a `correct` index; exactly one answer must be correct.
+    """
+    if isinstance(record, ValueError):
+        raise record
+    if not isinstance(record, dict):
+        raise ValueError("A question must be a JSON object.")
+    text = record.get('question_text') or record.get('question')
+    if not isinstance(text, str) or not text.strip():
+        raise ValueError("question_text is required.")
+    answers = record.get('answers')
+    if not isinstance(answers, list) or len(answers) < 2:
+        raise ValueError("At least two answers are required.")
+
+    correct_index = record.get('correct')
+    # bool is an int subclass, and `True == 1` would mark the second answer correct.
+    if correct_index is not None and (isinstance(correct_index, bool) or not isinstance(correct_index, int)):
+        raise ValueError("correct must be the index of the correct answer.")
+    documents = []
+    for index, answer in enumerate(answers):
+        if isinstance(answer, str):
+            answer = {'answer_text': answer, 'is_correct': index == correct_index}
+        if not isinstance(answer, dict) or not str(answer.get('answer_text') or '').strip():
+            raise ValueError(f"Answer {index + 1} needs an answer_text.")
+        documents.append({
+            '_id': ObjectId(),
+            'answer_text': str(answer['answer_text']).strip(),
+            'is_correct': answer.get('is_correct') is True,
+        })
+    if sum(answer['is_correct'] for answer in documents) != 1:
+        raise ValueError("Exactly one answer must be correct.")
+    return {'_id': ObjectId(), 'question_text': text.strip(), 'answers': documents}
+
+
+def parse_quiz_import(stream, fmt='ndjson'):
+    """
+    Reads and validates a whole import file in one pass. Returns the question
+    documents, or raises QuizImportError listing the invalid questions.
+    """
+    questions, errors, total_errors = [], [], 0
+    for location, record in iter_records(stream, fmt):
+        try:
+            questions.append(build_question(record))
+        except ValueError as e:
+            total_errors += 1
+            if len(errors) < QUIZ_IMPORT_MAX_ERRORS:
+                errors.append({'at': location, 'error': str(e)})
+        if len(questions) > QUIZ_IMPORT_MAX_QUESTIONS:
+            raise QuizImportError([{'at': location, 'error': f"At most {QUIZ_IMPORT_MAX_QUESTIONS} questions can be imported."}])
+    if total_errors:
+        raise QuizImportError(errors, total_errors)
+    if not questions:
+        raise QuizImportError([{'at': 'file', 'error': "The file contains no questions."}])
+    return questions
+
+
+def import_quiz(course_id, lesson_id, questions, mode='replace', expected_version=None):
+    """
+    Writes imported questions into a quiz lesson with one positional update:
+    `replace` sets the quiz's questions, `append` pushes them after the existing
+    ones. Raises CourseConflict if the lesson is not a quiz of the course (or the
+    course is no longer at `expected_version`). Returns the new content_version.
+    """
+    lesson_oid = to_object_id(lesson_id)
+    if lesson_oid is None:
+        raise CourseConflict()
+    if mode == 'append':
+        update = {'$push': {'lessons.$.content_data.questions': {'$each': questions}}}
+    else:
+        update = {'$set': {'lessons.$.content_data': {'questions': questions}}}
+    return update_course(
+        course_id, update, expected_version,
+        query={'lessons': {'$elemMatch': {'_id': lesson_oid, 'content_type': 'quiz'}}},
+    )
@@ -0,0 +1,471 @@
+# =================================================================
+# apps/learning/services.py
+# -----------------------------------------------------------------
+# KEEPS THE SYSTEM INTEGRATED: Course structure is now served from a
+# cached "course manifest" (lesson ids, orders, types and titles, no
+# content_data). It is built once per course version and shared by
+# every hot path that needs to count, order or look up lessons.
+# =================================================================
+
+import re
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils import timezone
+from pymongo import ReturnDocument
+
+from apps.core.cache import bump_versions, invalidate_dashboards, versioned_key
+from .models import ContentVersionConflict, Course, content_version_match
+
+MANIFEST_CACHE_TIMEOUT = 60 * 60 * 24  # One day; versioning handles freshness
+
+# Bumped whenever any course / learning path changes (validates API list responses).
+COURSES_SCOPE = 'courses'
+LEARNING_PATHS_SCOPE = 'learning_paths'
+
+# Only the lightweight lesson fields are read from MongoDB.
+MANIFEST_PROJECTION = {
+    'slug': 1,
+    'lessons._id': 1,
+    'lessons.title': 1,
+    'lessons.order': 1,
+    'lessons.content_type': 1,
+    'lessons.is_previewable': 1,
+}
+
+
+def to_object_id(value):
+    """ Converts a string to an ObjectId, returning None if it is not a valid id. """
+    try:
+        return ObjectId(str(value))
+    except (InvalidId, TypeError):
+        return None
+
+
+def course_scope(course_id):
+    """ The cache-version scope shared by everything derived from a course. """
+    return f'course:{course_id}'
+
+
+class LessonSummary:
+    """ A lesson without its content_data, as stored in a CourseManifest. """
+
+    def __init__(self, _id, title, order, content_type, is_previewable, position):
+        self._id = _id
+        self.title = title
+        self.order = order
+        self.content_type = content_type
+        self.is_previewable = is_previewable
+        # Index of the lesson inside the Course.lessons array in MongoDB.
+        self.position = position
+
+
+class CourseManifest:
+    """
+    A compact description of a course's lessons with O(1) lookups by lesson id
+    and by lesson order. Lessons are kept sorted by their `order` field.
+    """
+
+    def __init__(self, course_id, slug, lessons):
+        self.course_id = str(course_id)
+        self.slug = slug
+        self.lessons = sorted(lessons, key=lambda l: (l.order, l.position))
+        self._by_id = {lesson._id: lesson for lesson in self.lessons}
+        self._by_order = {}
+        for lesson in self.lessons:
+            self._by_order.setdefault(lesson.order, lesson)
+        self._index = {lesson._id: index for index, lesson in enumerate(self.lessons)}
+
+    @classmethod
+    def from_document(cls, document):
+        """ Builds a manifest from a raw (projected) course document. """
+        lessons = [
+            LessonSummary(
+                _id=str(lesson.get('_id')),
+                title=lesson.get('title', ''),
+                order=lesson.get('order', 0),
+                content_type=lesson.get('content_type'),
+                is_previewable=lesson.get('is_previewable', False),
+                position=position,
+            )
+            for position, lesson in enumerate(document.get('lessons') or [])
+        ]
+        return cls(document['_id'], document.get('slug'), lessons)
+
+    @classmethod
+    def from_course(cls, course):
+        """ Builds a manifest from a Course instance that is already loaded. """
+        lessons = [
+            LessonSummary(
+                _id=str(lesson._id),
+                title=lesson.title,
+                order=lesson.order,
+                content_type=lesson.content_type,
+                is_previewable=lesson.is_previewable,
+                position=position,
+            )
+            for position, lesson in enumerate(course.lessons)
+        ]
+        return cls(course.pk, course.slug, lessons)
+
+    @property
+    def lesson_count(self):
+        return len(self.lessons)
+
+    def get(self, lesson_id):
+        return self._by_id.get(str(lesson_id))
+
+    def get_by_order(self, order):
+        return self._by_order.get(order)
+
+    def first(self):
+        return self.lessons[0] if self.lessons else None
+
+    def previous(self, lesson):
+        index = self._index[lesson._id]
+        return self.lessons[index - 1] if index > 0 else None
+
+    def next(self, lesson):
+        index = self._index[lesson._id]
+        return self.lessons[index + 1] if index < len(self.lessons) - 1 else None
+
+
+# Course metadata plus the manifest fields: everything except lesson content_data.
+COURSE_SUMMARY_PROJECTION = {
+    'title': 1,
+    'description': 1,
+    'category': 1,
+    'status': 1,
+    'cover_image_url': 1,
+    'instructor_id': 1,
+    'created_at': 1,
+    'updated_at': 1,
+    'content_version': 1,
+    **MANIFEST_PROJECTION,
+}
+
+
+class CourseSummary:
+    """
+    Course metadata and its lesson manifest, loaded without any lesson
+    content_data. Exposes the attributes templates use on a Course.
+    """
+
+    def __init__(self, document):
+        self._id = document['_id']
+        self.pk = self._id
+        self.title = document.get('title', '')
+        self.slug = document.get('slug')
+        self.description = document.get('description', '')
+        self.category = document.get('category', '')
+        self.status = document.get('status')
+        self.cover_image_url = document.get('cover_image_url', '')
+        self.instructor_id = document.get('instructor_id')
+        self.instructor = None # Filled in by get_course_summaries
+        self.created_at = document.get('created_at')
+        self.updated_at = document.get('updated_at')
+        self.content_version = document.get('content_version', 0)
+        self.manifest = CourseManifest.from_document(document)
+
+    @property
+    def lessons(self):
+        return self.manifest.lessons
+
+    def __str__(self):
+        return self.title
+
+
+def attach_instructors(summaries):
+    """ Sets `instructor` on every CourseSummary using a single user query. """
+    instructor_ids = {summary.instructor_id for summary in summaries if summary.instructor_id}
+    instructors = get_user_model().objects.in_bulk(instructor_ids)
+    for summary in summaries:
+        summary.instructor = instructors.get(summary.instructor_id)
+
+
+def get_course_summaries(course_ids, with_instructors=True):
+    """
+    Returns {course_id: CourseSummary} for many courses using one query (plus one
+    for their instructors), regardless of how many courses are requested.
+    """
+    object_ids = [oid for oid in (to_object_id(course_id) for course_id in set(course_ids)) if oid]
+    if not object_ids:
+        return {}
+    summaries = Course.objects.summaries({'_id': {'$in': object_ids}}, with_instructors=with_instructors)
+    return {str(summary.pk): summary for summary in summaries}
+
+
+# The course picker only shows titles and categories.
+COURSE_PICKER_PROJECTION = {'title': 1, 'category': 1}
+COURSE_PICKER_PAGE_SIZE = 20
+
+
+def search_courses(search='', exclude_ids=(), offset=0, limit=COURSE_PICKER_PAGE_SIZE):
+    """
+    Returns one page of courses whose title contains `search` (case-insensitive),
+    sorted by title, as (summaries, has_more). Only titles and categories are read.
+    """
+    query = {}
+    if search:
+        query['title'] = {'$regex': re.escape(search), '$options': 'i'}
+    exclude_oids = [oid for oid in map(to_object_id, exclude_ids) if oid]
+    if exclude_oids:
+        query['_id'] = {'$nin': exclude_oids}
+    cursor = Course.objects.mongo_find(query, COURSE_PICKER_PROJECTION).sort([('title', 1), ('_id', 1)])
+    documents = list(cursor.skip(offset).limit(limit + 1)) # One extra tells whether there is a next page
+    return [CourseSummary(document) for document in documents[:limit]], len(documents) > limit
+
+
+def existing_course_ids(course_ids):
+    """ Returns the subset of `course_ids` (as strings) that exist, using a single $in query. """
+    object_ids = [oid for oid in map(to_object_id, set(course_ids)) if oid]
+    if not object_ids:
+        return set()
+    return {str(document['_id']) for document in Course.objects.mongo_find({'_id': {'$in': object_ids}}, {'_id': 1})}
+
+
+def get_course_summary(query, with_instructors=True):
+    """ Returns the CourseSummary of the first course matching a raw filter, or None. """
+    document = Course.objects.mongo_find_one(query, COURSE_SUMMARY_PROJECTION)
+    if document is None:
+        return None
+    summary = CourseSummary(document)
+    if with_instructors:
+        attach_instructors([summary])
+    return summary
+
+
+def get_course_manifest(course_id, course=None):
+    """
+    Returns the CourseManifest for a course, or None if the course does not exist.
+    When the caller already holds the Course instance it is used to build the
+    manifest on a cache miss instead of querying MongoDB again. Such a manifest
+    is not cached: the instance may predate the cache version just read, and
+    would then be stored under a newer version than it reflects.
+    """
+    cache_key = versioned_key(course_scope(course_id), 'manifest')
+    manifest = cache.get(cache_key)
+    if manifest is not None:
+        return manifest
+
+    if course is not None:
+        return CourseManifest.from_course(course)
+    course_oid = to_object_id(course_id)
+    if course_oid is None:
+        return None
+    document = Course.objects.mongo_find_one({'_id': course_oid}, MANIFEST_PROJECTION)
+    if document is None:
+        return None
+    manifest = CourseManifest.from_document(document)
+
+    cache.set(cache_key, manifest, MANIFEST_CACHE_TIMEOUT)
+    return manifest
+
+
+def get_lesson_count(course_id):
+    """ Returns the number of lessons in a course, or None if the course does not exist. """
+    manifest = get_course_manifest(course_id)
+    return manifest.lesson_count if manifest is not None else None
+
+
+def find_lesson_position(course, lesson_id):
+    """
+    Returns the index of a lesson inside `course.lessons`, or None if the course
+    has no such lesson. The manifest gives the position directly; the linear scan
+    only runs if the manifest disagrees with the loaded document.
+    """
+    lesson_id = str(lesson_id)
+    manifest = get_course_manifest(course.pk, course=course)
+    entry = manifest.get(lesson_id)
+    if entry is not None and entry.position < len(course.lessons):
+        if str(course.lessons[entry.position]._id) == lesson_id:
+            return entry.position
+    return next((i for i, l in enumerate(course.lessons) if str(l._id) == lesson_id), None)
+
+
+def find_lesson(course, lesson_id):
+    """ Returns the embedded Lesson with the given id from a loaded course, or None. """
+    position = find_lesson_position(course, lesson_id)
+    return course.lessons[position] if position is not None else None
+
+
+def load_lesson_document(course_id, lesson_id):
+    """
+    Fetches a single embedded lesson (including its content_data) as a raw
+    document, using an $elemMatch projection so the other lessons stay in the
+    database. Returns None if the course or lesson does not exist.
+    """
+    course_oid = to_object_id(course_id)
+    lesson_oid = to_object_id(lesson_id)
+    if course_oid is None or lesson_oid is None:
+        return None
+    document = Course.objects.mongo_find_one(
+        {'_id': course_oid, 'lessons._id': lesson_oid},
+        {'lessons': {'$elemMatch': {'_id': lesson_oid}}},
+    )
+    if not document or not document.get('lessons'):
+        return None
+    return document['lessons'][0]
+
+
+class LessonContent:
+    """ A single lesson loaded on its own, content_data included. Reads like an embedded Lesson. """
+
+    def __init__(self, document):
+        self._id = document.get('_id')
+        self.title = document.get('title', '')
+        self.order = document.get('order', 0)
+        self.content_type = document.get('content_type')
+        self.content_data = document.get('content_data') or {}
+        self.is_previewable = document.get('is_previewable', False)
+
+
+def get_lesson_content(course_id, lesson_id):
+    """ Loads one lesson's full content lazily, leaving the course's other lessons in the database. """
+    document = load_lesson_document(course_id, lesson_id)
+    return LessonContent(document) if document is not None else None
+
+
+def compile_answer_key(content_data):
+    """
+    Compiles a quiz's content_data into a compact answer key:
+    {'total_questions': n, 'answers': {'question_1': '<correct answer id>', ...}}.
+    Question keys match the names used by the take-quiz form.
+    """
+    questions = content_data.get('questions', [])
+    answers = {}
+    for i, question_data in enumerate(questions):
+        correct_answer = next((ans for ans in question_data.get('answers', []) if ans.get('is_correct')), None)
+        if correct_answer:
+            answers[f'question_{i+1}'] = str(correct_answer.get('_id'))
+    return {'total_questions': len(questions), 'answers': answers}
+
+
+def grade_quiz(answer_key, submitted_answers):
+    """ Returns the percentage score of a submission against a compiled answer key. """
+    total_questions = answer_key['total_questions']
+    if total_questions == 0:
+        return 100
+    correct_answers_count = sum(
+        1 for question_key, answer_id in answer_key['answers'].items()
+        if submitted_answers.get(question_key) == answer_id
+    )
+    return round((correct_answers_count / total_questions) * 100, 2)
+
+
+def get_answer_key(course_id, lesson_id):
+    """
+    Returns the compiled answer key for a quiz lesson, or None if the lesson does
+    not exist or is not a quiz. Keys are cached per course version, which moves
+    whenever QuizBuilderView saves the quiz, so grading needs no Course fetch.
+    """
+    cache_key = versioned_key(course_scope(course_id), f'answer_key:{lesson_id}')
+    answer_key = cache.get(cache_key)
+    if answer_key is not None:
+        return answer_key
+
+    lesson = load_lesson_document(course_id, lesson_id)
+    if lesson is None or lesson.get('content_type') != 'quiz':
+        return None
+
+    answer_key = compile_answer_key(lesson.get('content_data') or {})
+    # Bank quizzes are graded against each attempt's sample (see question_bank), not this key.
+    answer_key['sampled'] = bool((lesson.get('content_data') or {}).get('bank'))
+    cache.set(cache_key, answer_key, MANIFEST_CACHE_TIMEOUT)
+    return answer_key
+
+
+def invalidate_course(course_id):
+    """ Invalidates the manifest and every other cache entry derived from a course. """
+    bump_versions([course_scope(course_id), COURSES_SCOPE])
+
+
+# --- Targeted course updates ---
+
+class CourseConflict(ContentVersionConflict):
+    """ The course changed since the editor loaded the version it expected. """
+
+
+def parse_content_version(value):
+    """ Reads a submitted content_version, returning None if it is missing or invalid. """
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def update_course(course_id, update, expected_version=None, query=None, array_filters=None):
+    """
+    Applies a targeted update to one course document instead of rewriting it with
+    Course.save(). Every update increments content_version and sets updated_at.
+    With `expected_version`, the update only applies if the course is still at that
+    version (optimistic concurrency); otherwise CourseConflict is raised. A course
+    that does not exist raises Course.DoesNotExist instead. Returns the new
+    content_version.
+    """
+    course_oid = to_object_id(course_id)
+    if course_oid is None:
+        raise Course.DoesNotExist("Course not found.")
+    query = {**(query or {}), '_id': course_oid}
+    if expected_version is not None:
+        query['content_version'] = content_version_match(expected_version)
+
+    update = {**update}
+    update['$inc'] = {**update.get('$inc', {}), 'content_version': 1}
+    update['$set'] = {**update.get('$set', {}), 'updated_at': timezone.now()}
+    document = Course.objects.mongo_find_one_and_update(
+        query, update,
+        projection={'content_version': 1, 'instructor_id': 1},
+        return_document=ReturnDocument.AFTER,
+        array_filters=array_filters,
+    )
+    if document is None:
+        # Only on failure: tell a missing course apart from a version (or lesson) mismatch.
+        if not Course.objects.mongo_count_documents({'_id': course_oid}, limit=1):
+            raise Course.DoesNotExist("Course not found.")
+        raise CourseConflict()
+
+    # Raw updates bypass the post_save signal, so invalidate what it would have.
+    invalidate_course(course_oid)
+    invalidate_dashboards('instructor', [document.get('instructor_id')])
+    return document['content_version']
+
+
+def append_lesson(course_id, lesson, expected_version=None):
+    """ Adds one lesson document to the end of a course with $push. """
+    return update_course(course_id, {'$push': {'lessons': lesson}}, expected_version)
+
+
+def reorder_lessons(course_id, lesson_ids, expected_version=None):
+    """
+    Sets each listed lesson's `order` to its index in `lesson_ids`, in one update
+    with one array filter per lesson. Lessons that are not listed keep their order,
+    and a lesson listed twice keeps its first position. Raises ValueError if any
+    id is invalid.
+    """
+    # Two array filters on the same element would make MongoDB reject the update.
+    lesson_ids = list(dict.fromkeys(str(lesson_id) for lesson_id in lesson_ids))
+    lesson_oids = [to_object_id(lesson_id) for lesson_id in lesson_ids]
+    if not lesson_oids or None in lesson_oids:
+        raise ValueError("lesson_order must be a list of valid lesson ids.")
+    return update_course(
+        course_id,
+        {'$set': {f'lessons.$[l{index}].order': index for index in range(len(lesson_oids))}},
+        expected_version,
+        array_filters=[{f'l{index}._id': oid} for index, oid in enumerate(lesson_oids)],
+    )
+
+
+def set_lesson_content(course_id, lesson_id, content_data, expected_version=None):
+    """ Replaces one lesson's content_data with a positional $set. """
+    lesson_oid = to_object_id(lesson_id)
+    if lesson_oid is None:
+        raise CourseConflict()
+    return update_course(
+        course_id,
+        {'$set': {'lessons.$.content_data': content_data}},
+        expected_version,
+        query={'lessons._id': lesson_oid},
+    )
@@ -0,0 +1,20 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from apps.core.cache import invalidate_dashboards
+from .models import Course, LearningPath
+from .services import invalidate_course
+
+@receiver(post_save, sender=Course)
+@receiver(post_delete, sender=Course)
+def invalidate_course_caches(sender, instance, **kwargs):
+    """
+    Every save rewrites the course document (lessons, order, quizzes), so all
+    cached data derived from the course, like its manifest, is invalidated.
+    """
+    invalidate_course(instance.pk)
+    invalidate_dashboards('instructor', [instance.instructor_id])
+
+@receiver(post_save, sender=LearningPath)
+@receiver(post_delete, sender=LearningPath)
+def invalidate_supervisor_dashboard(sender, instance, **kwargs):
+    invalidate_dashboards('supervisor', [instance.supervisor_id])
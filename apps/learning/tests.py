@@ -0,0 +1,225 @@
+import io
+import json
+from unittest import mock
+from django.core import signing
+from django.test import SimpleTestCase
+from bson import ObjectId
+from apps.learning.question_bank import bank_query, load_quiz_sample, sign_quiz_sample
+from apps.learning.quiz_import import QuizImportError, parse_quiz_import
+from apps.learning.models import Course
+from apps.learning.services import (
+    CourseConflict, CourseManifest, CourseSummary, LessonContent, compile_answer_key, grade_quiz,
+    reorder_lessons, update_course,
+)
+
+class CourseManifestTest(SimpleTestCase):
+    """
+    Test suite for the cached course manifest.
+    """
+
+    def setUp(self):
+        self.lesson_ids = [ObjectId() for _ in range(3)]
+        # Lessons are deliberately stored out of order in the document.
+        self.document = {
+            '_id': ObjectId(),
+            'slug': 'intro-to-python',
+            'lessons': [
+                {'_id': self.lesson_ids[0], 'title': 'Loops', 'order': 2, 'content_type': 'video'},
+                {'_id': self.lesson_ids[1], 'title': 'Welcome', 'order': 1, 'content_type': 'text_editor'},
+                {'_id': self.lesson_ids[2], 'title': 'Final Quiz', 'order': 3, 'content_type': 'quiz'},
+            ],
+        }
+
+    def test_lessons_are_sorted_by_order(self):
+        manifest = CourseManifest.from_document(self.document)
+        self.assertEqual([l.title for l in manifest.lessons], ['Welcome', 'Loops', 'Final Quiz'])
+        self.assertEqual(manifest.lesson_count, 3)
+        self.assertEqual(manifest.first().title, 'Welcome')
+
+    def test_lookups_by_id_and_order(self):
+        manifest = CourseManifest.from_document(self.document)
+        quiz = manifest.get(str(self.lesson_ids[2]))
+        self.assertEqual(quiz.content_type, 'quiz')
+        self.assertEqual(quiz.position, 2)
+        self.assertEqual(manifest.get_by_order(2).title, 'Loops')
+        self.assertIsNone(manifest.get('missing'))
+        self.assertIsNone(manifest.get_by_order(99))
+
+    def test_previous_and_next(self):
+        manifest = CourseManifest.from_document(self.document)
+        loops = manifest.get_by_order(2)
+        self.assertEqual(manifest.previous(loops).title, 'Welcome')
+        self.assertEqual(manifest.next(loops).title, 'Final Quiz')
+        self.assertIsNone(manifest.previous(manifest.first()))
+        self.assertIsNone(manifest.next(manifest.get_by_order(3)))
+
+class CourseSummaryTest(SimpleTestCase):
+    """
+    Test suite for the lightweight course and lesson read models.
+    """
+
+    def test_summary_exposes_course_fields_and_outline(self):
+        document = {
+            '_id': ObjectId(), 'title': 'Python', 'slug': 'python', 'status': 'published', 'instructor_id': 3,
+            'lessons': [{'_id': ObjectId(), 'title': 'Intro', 'order': 1, 'content_type': 'video'}],
+        }
+        summary = CourseSummary(document)
+        self.assertEqual(summary.pk, document['_id'])
+        self.assertEqual(summary.instructor_id, 3)
+        self.assertEqual([l.title for l in summary.lessons], ['Intro'])
+        self.assertEqual(summary.manifest.lesson_count, 1)
+
+    def test_lesson_content_defaults(self):
+        lesson = LessonContent({'_id': ObjectId(), 'title': 'Quiz', 'order': 2, 'content_type': 'quiz'})
+        self.assertEqual(lesson.content_data, {})
+        self.assertFalse(lesson.is_previewable)
+
+class AnswerKeyTest(SimpleTestCase):
+    """
+    Test suite for compiled quiz answer keys and grading.
+    """
+
+    def setUp(self):
+        self.correct_ids = [ObjectId(), ObjectId()]
+        self.content_data = {'questions': [
+            {'question_text': 'Q1', 'answers': [
+                {'_id': ObjectId(), 'is_correct': False},
+                {'_id': self.correct_ids[0], 'is_correct': True},
+            ]},
+            {'question_text': 'Q2', 'answers': [
+                {'_id': self.correct_ids[1], 'is_correct': True},
+            ]},
+        ]}
+
+    def test_compile_answer_key(self):
+        answer_key = compile_answer_key(self.content_data)
+        self.assertEqual(answer_key['total_questions'], 2)
+        self.assertEqual(answer_key['answers'], {
+            'question_1': str(self.correct_ids[0]),
+            'question_2': str(self.correct_ids[1]),
+        })
+
+    def test_grade_quiz(self):
+        answer_key = compile_answer_key(self.content_data)
+        self.assertEqual(grade_quiz(answer_key, {'question_1': str(self.correct_ids[0])}), 50)
+        self.assertEqual(grade_quiz(answer_key, {
+            'question_1': str(self.correct_ids[0]),
+            'question_2': str(self.correct_ids[1]),
+        }), 100)
+        self.assertEqual(grade_quiz(answer_key, {}), 0)
+
+    def test_empty_quiz_scores_full_marks(self):
+        self.assertEqual(grade_quiz(compile_answer_key({}), {}), 100)
+
+class QuizImportTest(SimpleTestCase):
+    """
+    Test suite for parsing and validating quiz import files.
+    """
+
+    def ndjson(self, *records):
+        return io.BytesIO('\n'.join(json.dumps(record) for record in records).encode())
+
+    def test_ndjson_questions_are_built(self):
+        questions = parse_quiz_import(self.ndjson(
+            {'question_text': 'Is Python typed?', 'answers': ['Dynamically', 'Not at all'], 'correct': 0},
+            {'question_text': '2 + 2?', 'answers': [{'answer_text': '4', 'is_correct': True}, {'answer_text': '5'}]},
+        ))
+        self.assertEqual(len(questions), 2)
+        self.assertEqual([a['is_correct'] for a in questions[0]['answers']], [True, False])
+        self.assertEqual(compile_answer_key({'questions': questions})['total_questions'], 2)
+
+    def test_every_invalid_question_is_reported(self):
+        stream = io.BytesIO(b'{"question_text": "No answers"}\nnot json\n')
+        with self.assertRaises(QuizImportError) as raised:
+            parse_quiz_import(stream)
+        self.assertEqual([error['at'] for error in raised.exception.errors], ['line 1', 'line 2'])
+
+    def test_invalid_utf8_is_reported(self):
+        with self.assertRaises(QuizImportError) as raised:
+            parse_quiz_import(io.BytesIO(b'{"a":1}\n\xff\xfe\n'))
+        self.assertEqual(raised.exception.errors, [{'at': 'file', 'error': 'File is not valid UTF-8.'}])
+
+    def test_correct_must_be_an_integer_index(self):
+        with self.assertRaises(QuizImportError) as raised:
+            parse_quiz_import(self.ndjson({'question_text': 'Q?', 'answers': ['a', 'b'], 'correct': True}))
+        self.assertEqual(raised.exception.errors[0]['error'], "correct must be the index of the correct answer.")
+
+    def test_json_document(self):
+        stream = io.BytesIO(json.dumps({'questions': [{'question': 'Q?', 'answers': ['a', 'b'], 'correct': 1}]}).encode())
+        self.assertEqual(len(parse_quiz_import(stream, fmt='json')), 1)
+
+class QuestionBankTest(SimpleTestCase):
+    """
+    Test suite for bank sampling filters and quiz sample tokens.
+    """
+
+    def setUp(self):
+        self.course_id, self.lesson_id = str(ObjectId()), str(ObjectId())
+        self.questions = [{'_id': ObjectId()} for _ in range(3)]
+
+    def test_token_round_trip_keeps_question_order(self):
+        token = sign_quiz_sample(7, self.course_id, self.lesson_id, self.questions)
+        self.assertEqual(
+            load_quiz_sample(token, 7, self.course_id, self.lesson_id),
+            [str(question['_id']) for question in self.questions],
+        )
+
+    def test_token_is_bound_to_the_student(self):
+        token = sign_quiz_sample(7, self.course_id, self.lesson_id, self.questions)
+        with self.assertRaises(signing.BadSignature):
+            load_quiz_sample(token, 8, self.course_id, self.lesson_id)
+
+    def test_bank_query(self):
+        query = bank_query(self.course_id, self.lesson_id, {'size': 5, 'tags': ['loops'], 'scope': 'course'})
+        self.assertEqual(query, {'course_id': self.course_id, 'tags': {'$all': ['loops']}})
+
+@mock.patch('apps.learning.services.invalidate_dashboards')
+@mock.patch('apps.learning.services.invalidate_course')
+@mock.patch.object(Course, 'objects')
+class TargetedCourseUpdateTest(SimpleTestCase):
+    """
+    Test suite for the targeted course updates and the filters they build.
+    """
+
+    course_id = ObjectId()
+
+    def sent_update(self, objects):
+        (query, update), kwargs = objects.mongo_find_one_and_update.call_args
+        return query, update, kwargs
+
+    def test_update_bumps_the_version_under_the_expected_one(self, objects, *_):
+        objects.mongo_find_one_and_update.return_value = {'content_version': 4, 'instructor_id': 1}
+        self.assertEqual(update_course(str(self.course_id), {'$set': {'title': 'T'}}, expected_version=3), 4)
+        query, update, _ = self.sent_update(objects)
+        self.assertEqual(query, {'_id': self.course_id, 'content_version': 3})
+        self.assertEqual(update['$inc'], {'content_version': 1})
+        self.assertEqual(update['$set']['title'], 'T')
+        self.assertIn('updated_at', update['$set'])
+
+    def test_version_zero_matches_courses_without_a_version(self, objects, *_):
+        objects.mongo_find_one_and_update.return_value = {'content_version': 1}
+        update_course(str(self.course_id), {}, expected_version=0)
+        query, _, _ = self.sent_update(objects)
+        self.assertEqual(query['content_version'], {'$in': [0, None]})
+
+    def test_missing_course_and_version_mismatch_are_told_apart(self, objects, *_):
+        objects.mongo_find_one_and_update.return_value = None
+        objects.mongo_count_documents.return_value = 0
+        with self.assertRaises(Course.DoesNotExist):
+            update_course(str(self.course_id), {}, expected_version=2)
+        objects.mongo_count_documents.return_value = 1
+        with self.assertRaises(CourseConflict):
+            update_course(str(self.course_id), {}, expected_version=2)
+
+    def test_reorder_builds_one_filter_per_distinct_lesson(self, objects, *_):
+        objects.mongo_find_one_and_update.return_value = {'content_version': 2}
+        first, second = ObjectId(), ObjectId()
+        reorder_lessons(str(self.course_id), [str(first), str(second), str(first)])
+        _, update, kwargs = self.sent_update(objects)
+        self.assertEqual(update['$set'], {'lessons.$[l0].order': 0, 'lessons.$[l1].order': 1})
+        self.assertEqual(kwargs['array_filters'], [{'l0._id': first}, {'l1._id': second}])
+
+    def test_reorder_rejects_invalid_ids(self, objects, *_):
+        with self.assertRaises(ValueError):
+            reorder_lessons(str(self.course_id), [str(ObjectId()), 'not-an-id'])
+        objects.mongo_find_one_and_update.assert_not_called()
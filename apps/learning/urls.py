@@ -2,6 +2,7 @@ from django.urls import path
 from .views import (
     LessonDetailView, 
     PathBuilderView, 
+    PathCoursePickerView,
     LearningPathCreateView,
     CourseManageView,
     LessonCreateView,
@@ -29,6 +30,11 @@ urlpatterns = [
         PathBuilderView.as_view(), 
         name='path_builder'
     ),
+    path(
+        'paths/<str:pk>/course-picker/',
+        PathCoursePickerView.as_view(),
+        name='path_course_picker'
+    ),
     path(
         'courses/<str:pk>/manage/',
         CourseManageView.as_view(),
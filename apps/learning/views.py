@@ -11,13 +11,52 @@ from django.views.generic import DetailView, CreateView, UpdateView, TemplateVie
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.urls import reverse, reverse_lazy
 from django.shortcuts import get_object_or_404, render, redirect
-from django.http import HttpResponseRedirect
+from django.http import Http404, HttpResponse, HttpResponseRedirect
+from django.conf import settings
 from django.contrib import messages
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.translation import get_language
 from bson import ObjectId
 
 from .models import Course, LearningPath, Lesson, Question, Answer
 from .forms import LearningPathForm, LessonForm
-from apps.enrollment.models import Enrollment
+from .services import (
+    CourseConflict, append_lesson, find_lesson, get_course_summaries, get_course_summary, get_lesson_content,
+    parse_content_version, search_courses, set_lesson_content, to_object_id,
+)
+from apps.core.cache import get_version, record_cache_access
+from apps.core.http import conditional_response, make_etag, set_validators
+from apps.enrollment.access_buffer import last_access_buffer
+from apps.enrollment.models import Enrollment, QuizAttempt
+from apps.enrollment.tasks import schedule_course_progress_recompute
+from apps.interactions.services import discussion_scope
+from .question_bank import get_bank_config, sample_questions, sign_quiz_sample
+
+LESSON_FRAGMENTS_CACHE_TIMEOUT = 60 * 60 * 24 # Keys embed the course version, so edits never serve stale HTML
+
+def render_lesson_fragments(course, lesson_entry):
+    """
+    Returns the parts of a lesson page that are the same for every viewer (the
+    sidebar lesson list, the lesson content and its overview) as HTML. They are
+    rendered once per (course version, lesson, language) and cached; progress,
+    discussions and the forms stay per-request.
+    """
+    cache_key = f'lesson_fragments:{course.pk}:v{course.content_version}:{lesson_entry._id}:{get_language()}'
+    fragments = cache.get(cache_key)
+    record_cache_access('lesson_fragments', fragments is not None)
+    if fragments is None:
+        context = {
+            'course': course,
+            'lessons': course.manifest.lessons,
+            'current_lesson': get_lesson_content(course.pk, lesson_entry._id) or lesson_entry,
+        }
+        fragments = {
+            name: render_to_string(f'learning/partials/_lesson_{name}.html', context)
+            for name in ('sidebar', 'content', 'overview')
+        }
+        cache.set(cache_key, fragments, LESSON_FRAGMENTS_CACHE_TIMEOUT)
+    return fragments
 
 # ... (LessonDetailView, LearningPathCreateView, PathBuilderView, CourseManageView, LessonCreateView remain unchanged from previous update) ...
 class LessonDetailView(LoginRequiredMixin, DetailView):
@@ -25,32 +64,62 @@ class LessonDetailView(LoginRequiredMixin, DetailView):
     template_name = 'learning/lesson_detail.html'
     slug_url_kwarg = 'course_slug'
     context_object_name = 'course'
+    def get_object(self, queryset=None):
+        # Metadata and the lesson manifest only; the current lesson's content is loaded on its own.
+        course = get_course_summary({'slug': self.kwargs.get(self.slug_url_kwarg)})
+        if course is None:
+            raise Http404("Course not found.")
+        return course
+    def get(self, request, *args, **kwargs):
+        self.object = self.get_object()
+        self.enrollment = Enrollment.objects.mongo_find_one(
+            {'student_id': request.user.pk, 'enrollable_id': str(self.object._id)}, {'progress': 1},
+        )
+        progress = self.enrollment.get('progress', 0) if self.enrollment else 0
+        lesson_entry = self.object.manifest.get_by_order(self.kwargs.get('lesson_order'))
+        # The page depends on the course version, the lesson and its discussion, the
+        # viewer's progress, language and CSRF token (embedded in the page's forms).
+        etag = make_etag(
+            'lesson', self.object.pk, self.object.content_version, self.kwargs.get('lesson_order'),
+            get_version(discussion_scope(lesson_entry._id)) if lesson_entry else None,
+            request.user.pk, progress, get_language(), request.COOKIES.get(settings.CSRF_COOKIE_NAME, ''),
+        )
+        not_modified = conditional_response(request, etag)
+        if not_modified is not None:
+            if lesson_entry:
+                self.record_access(lesson_entry._id)
+            return not_modified
+        context = self.get_context_data(object=self.object)
+        if isinstance(context, HttpResponse): # The lesson does not exist; redirected
+            return context
+        return set_validators(self.render_to_response(context), etag)
+    def record_access(self, lesson_id):
+        if self.enrollment:
+            # Buffered and flushed in bulk instead of saving the enrollment on every view.
+            last_access_buffer.record(self.request.user.pk, self.object._id, lesson_id)
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        course = self.get_object()
+        course = self.object # Already loaded by get
         lesson_order = self.kwargs.get('lesson_order')
-        sorted_lessons = sorted(course.lessons, key=lambda l: l.order)
-        current_lesson = next((l for l in sorted_lessons if l.order == lesson_order), None)
-        if not current_lesson:
-            if sorted_lessons:
-                return redirect('learning:lesson_detail', course_slug=course.slug, lesson_order=sorted_lessons[0].order)
+        manifest = course.manifest
+        lesson_entry = manifest.get_by_order(lesson_order)
+        if not lesson_entry:
+            if manifest.lessons:
+                return redirect('learning:lesson_detail', course_slug=course.slug, lesson_order=manifest.first().order)
             return redirect('dashboard')
-        current_lesson_index = sorted_lessons.index(current_lesson)
-        prev_lesson_order = sorted_lessons[current_lesson_index - 1].order if current_lesson_index > 0 else None
-        next_lesson_order = sorted_lessons[current_lesson_index + 1].order if current_lesson_index < len(sorted_lessons) - 1 else None
-        try:
-            enrollment = Enrollment.objects.get(student=self.request.user, enrollable_id=str(course._id))
-            progress = enrollment.progress
-            enrollment.last_accessed_lesson_id = str(current_lesson._id)
-            enrollment.save()
-        except Enrollment.DoesNotExist:
-            progress = 0
+        prev_lesson = manifest.previous(lesson_entry)
+        next_lesson = manifest.next(lesson_entry)
+        prev_lesson_order = prev_lesson.order if prev_lesson else None
+        next_lesson_order = next_lesson.order if next_lesson else None
+        self.record_access(lesson_entry._id)
         context.update({
-            'sorted_lessons': sorted_lessons,
-            'current_lesson': current_lesson,
+            # The manifest entry is enough for the per-user parts; the lesson content is only
+            # loaded when its shared fragments are not cached.
+            'current_lesson': lesson_entry,
+            'lesson_fragments': render_lesson_fragments(course, lesson_entry),
             'prev_lesson_order': prev_lesson_order,
             'next_lesson_order': next_lesson_order,
-            'progress': progress,
+            'progress': self.enrollment.get('progress', 0) if self.enrollment else 0,
         })
         return context
 
@@ -75,9 +144,38 @@ class PathBuilderView(LoginRequiredMixin, UserPassesTestMixin, DetailView):
         return self.request.user.role in ['admin', 'supervisor']
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        learning_path = self.get_object()
-        path_course_ids = [module['course_id'] for module in learning_path.modules]
-        context['available_courses'] = Course.objects.exclude(_id__in=path_course_ids)
+        # The course library is loaded page by page from PathCoursePickerView.
+        modules = sorted(self.object.modules, key=lambda module: module['order'])
+        courses = get_course_summaries([module['course_id'] for module in modules], with_instructors=False)
+        context['path_courses'] = [courses[module['course_id']] for module in modules if module['course_id'] in courses]
+        return context
+
+class PathCoursePickerView(LoginRequiredMixin, UserPassesTestMixin, DetailView):
+    """
+    Serves the path builder's course library one page at a time (HTMX), optionally
+    filtered by a title search. Courses already in the path are left out.
+    """
+    model = LearningPath
+    template_name = 'learning/partials/_course_picker.html'
+    context_object_name = 'learning_path'
+    def test_func(self):
+        return self.request.user.role in ['admin', 'supervisor']
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        search = self.request.GET.get('q', '').strip()
+        try:
+            offset = max(int(self.request.GET.get('offset', 0)), 0)
+        except ValueError:
+            offset = 0
+        courses, has_more = search_courses(
+            search, [module['course_id'] for module in self.object.modules], offset=offset,
+        )
+        context.update({
+            'courses': courses,
+            'search': search,
+            'offset': offset,
+            'next_offset': offset + len(courses) if has_more else None,
+        })
         return context
 
 class CourseManageView(LoginRequiredMixin, UserPassesTestMixin, DetailView):
@@ -95,17 +193,35 @@ class LessonCreateView(LoginRequiredMixin, CreateView):
     model = Lesson
     form_class = LessonForm
     def form_valid(self, form):
-        course = get_object_or_404(Course, pk=self.kwargs['pk'])
-        lesson = form.save(commit=False)
-        max_order = max([l.order for l in course.lessons], default=0)
-        lesson.order = max_order + 1
-        lesson._id = ObjectId()
+        course = get_course_summary({'_id': to_object_id(self.kwargs['pk'])}, with_instructors=False)
+        if course is None:
+            raise Http404("Course not found.")
+        lesson = {
+            '_id': ObjectId(),
+            'title': form.cleaned_data['title'],
+            'order': max([l.order for l in course.lessons], default=0) + 1,
+            'content_type': form.cleaned_data['content_type'],
+            'content_data': {},
+            'is_previewable': False,
+        }
         video_url = form.cleaned_data.get('video_url')
-        if lesson.content_type == 'video' and video_url:
-            lesson.content_data = {'video_url': video_url}
-        course.lessons.append(lesson)
-        course.save()
-        return render(self.request, 'partials/_lesson_list.html', {'course': course})
+        if lesson['content_type'] == 'video' and video_url:
+            lesson['content_data'] = {'video_url': video_url}
+        # Guarded by the version the editor last saw (or, failing that, the one just read),
+        # so two co-instructors adding lessons at once cannot both take the same order.
+        expected_version = parse_content_version(self.request.POST.get('content_version'))
+        conflict = False
+        try:
+            append_lesson(course.pk, lesson, course.content_version if expected_version is None else expected_version)
+        except Course.DoesNotExist:
+            raise Http404("Course not found.")
+        except CourseConflict:
+            conflict = True
+        else:
+            # Existing enrollments now have one more lesson to complete.
+            schedule_course_progress_recompute(course.pk)
+        course = get_course_summary({'_id': course.pk}, with_instructors=False)
+        return render(self.request, 'partials/_lesson_list.html', {'course': course, 'conflict': conflict})
 
 class QuizBuilderView(LoginRequiredMixin, UserPassesTestMixin, DetailView):
     """
@@ -124,16 +240,15 @@ class QuizBuilderView(LoginRequiredMixin, UserPassesTestMixin, DetailView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         lesson_id = self.kwargs['lesson_id']
-        lesson = next((l for l in self.object.lessons if str(l._id) == lesson_id), None)
-        context['lesson'] = lesson
+        context['lesson'] = find_lesson(self.object, lesson_id)
         return context
 
     def post(self, request, *args, **kwargs):
         course = self.get_object()
         lesson_id = self.kwargs['lesson_id']
-        lesson_index = next((i for i, l in enumerate(course.lessons) if str(l._id) == lesson_id), None)
+        lesson = find_lesson(course, lesson_id)
 
-        if lesson_index is None:
+        if lesson is None:
             messages.error(request, "Lesson not found.")
             return redirect('dashboard')
 
@@ -169,11 +284,21 @@ class QuizBuilderView(LoginRequiredMixin, UserPassesTestMixin, DetailView):
             quiz_data['questions'].append(question_obj)
             i += 1
         
-        # Update the specific lesson's content_data in the course
-        course.lessons[lesson_index].content_data = quiz_data
-        course.save()
+        # Update only this lesson's content_data, and only if nobody changed the course
+        # since the builder was opened.
+        expected_version = parse_content_version(post_data.get('content_version'))
+        try:
+            set_lesson_content(
+                course.pk, lesson._id, quiz_data,
+                course.content_version if expected_version is None else expected_version,
+            )
+        except Course.DoesNotExist:
+            raise Http404("Course not found.")
+        except CourseConflict:
+            messages.error(request, "This course was changed by someone else while you were editing. Please review the quiz and save it again.")
+            return redirect('learning:quiz_builder', course_pk=course.pk, lesson_id=lesson_id)
 
-        messages.success(request, f"Quiz for '{course.lessons[lesson_index].title}' has been saved successfully.")
+        messages.success(request, f"Quiz for '{lesson.title}' has been saved successfully.")
         return redirect('learning:course_manage', pk=course.pk)
 
 
@@ -182,13 +307,32 @@ class TakeQuizView(LoginRequiredMixin, DetailView):
     template_name = 'learning/take_quiz.html'
     pk_url_kwarg = 'course_pk'
     context_object_name = 'course'
+    def get(self, request, *args, **kwargs):
+        response = super().get(request, *args, **kwargs)
+        if response.context_data.get('quiz_unavailable'):
+            messages.error(request, "This quiz has no questions yet. Please try again later.")
+            lesson = response.context_data['lesson']
+            return redirect('learning:lesson_detail', course_slug=self.object.slug, lesson_order=lesson.order)
+        return response
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         lesson_id = self.kwargs['lesson_id']
-        lesson = next((l for l in self.object.lessons if str(l._id) == lesson_id), None)
+        lesson = find_lesson(self.object, lesson_id)
         if not lesson or lesson.content_type != 'quiz':
             return redirect('dashboard')
         context['lesson'] = lesson
+        bank = get_bank_config(lesson.content_data)
+        if bank:
+            # A fresh sample per attempt; the signed token lets the submission be graded against it.
+            questions = sample_questions(self.object.pk, lesson._id, bank)
+            if not questions:
+                # Nothing matched the bank settings; an empty quiz would grade any submission as 100%.
+                context['quiz_unavailable'] = True
+                return context
+            context['quiz_token'] = sign_quiz_sample(self.request.user.pk, self.object.pk, lesson._id, questions)
+        else:
+            questions = lesson.content_data.get('questions', [])
+        context['questions'] = questions
         return context
 
 class QuizResultView(LoginRequiredMixin, DetailView):
@@ -198,9 +342,10 @@ class QuizResultView(LoginRequiredMixin, DetailView):
     context_object_name = 'enrollment'
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        attempt_id = self.kwargs['attempt_id']
-        attempt = next((att for att in self.object.quiz_attempts if att['attempt_id'] == attempt_id), None)
-        if not attempt:
-            return redirect('dashboard')
-        context['attempt'] = attempt
+        # A single indexed lookup instead of scanning the enrollment's attempt history.
+        context['attempt'] = get_object_or_404(
+            QuizAttempt,
+            attempt_id=self.kwargs['attempt_id'],
+            enrollment_id=str(self.object._id),
+        )
         return context
\ No newline at end of file
@@ -2,4 +2,8 @@ from django.apps import AppConfig
 
 class ReportsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'apps.reports'
\ No newline at end of file
+    name = 'apps.reports'
+
+    def ready(self):
+        # This imports the signals file when the app is ready
+        import apps.reports.signals
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from apps.reports.services.course_stats import rebuild_course_stats
+
+class Command(BaseCommand):
+    help = "Recomputes CourseStats from enrollments and discussion threads, repairing any drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument('course_ids', nargs='*', help="IDs of the courses to rebuild (default: all courses).")
+
+    def handle(self, *args, **options):
+        course_ids = options['course_ids'] or None
+        rebuilt = rebuild_course_stats(course_ids)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt stats for {rebuilt} course(s)."))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from apps.reports.services.platform_stats import refresh_platform_stats, ESTIMATE_THRESHOLD
+
+class Command(BaseCommand):
+    help = "Rebuilds the platform-wide stats snapshot shown on the admin dashboard."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--estimate',
+            action='store_true',
+            help=f"Use estimated document counts for collections above {ESTIMATE_THRESHOLD} documents.",
+        )
+
+    def handle(self, *args, **options):
+        stats = refresh_platform_stats(estimate=options['estimate'])
+        totals = ', '.join(f"{section}: {count}" for section, count in stats['totals'].items())
+        suffix = " (estimated)" if stats['estimated'] else ""
+        self.stdout.write(self.style.SUCCESS(f"Platform stats refreshed{suffix}: {totals}."))
@@ -0,0 +1,95 @@
+from djongo import models
+from django.conf import settings
+
+class CourseStats(models.Model):
+    """
+    Pre-aggregated counters for one course, kept up to date by the enrollment,
+    progress and discussion write paths so dashboards never scan enrollments.
+    `rebuild_course_stats` recomputes them from scratch if they ever drift.
+    """
+    _id = models.ObjectIdField()
+    course_id = models.CharField(max_length=24, unique=True) # Refers to the course document
+    instructor = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='+'
+    )
+    enrolled_count = models.IntegerField(default=0)
+    completed_count = models.IntegerField(default=0)
+    progress_sum = models.FloatField(default=0.0) # Sum of enrollment progress; see average_progress
+    open_questions_count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = models.DjongoManager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['instructor']),
+        ]
+
+    def __str__(self):
+        return f"Stats for course {self.course_id}"
+
+    @property
+    def average_progress(self):
+        return self.progress_sum / self.enrolled_count if self.enrolled_count else 0
+
+class InstructorStats(models.Model):
+    """
+    Instructor-wide counters that cannot be summed from per-course stats, such
+    as the number of distinct students across all of the instructor's courses.
+    """
+    _id = models.ObjectIdField()
+    instructor = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    student_count = models.IntegerField(default=0) # Distinct students enrolled in any of the courses
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = models.DjongoManager()
+
+    def __str__(self):
+        return f"Stats for instructor {self.instructor_id}"
+
+class InstructorStudent(models.Model):
+    """
+    One student's membership in an instructor's audience: how many of the
+    instructor's courses they are enrolled in. Creating or removing a membership
+    is what moves InstructorStats.student_count, so the count stays exact under
+    concurrent enrollments.
+    """
+    _id = models.ObjectIdField()
+    instructor = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='+')
+    student = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='+')
+    enrollment_count = models.IntegerField(default=0)
+
+    objects = models.DjongoManager()
+
+    class Meta:
+        unique_together = ('instructor', 'student')
+
+    def __str__(self):
+        return f"Student {self.student_id} of instructor {self.instructor_id}"
+
+class PlatformStats(models.Model):
+    """
+    A single snapshot document of platform-wide counts for the admin dashboard.
+    Counters are adjusted on writes and fully refreshed on a schedule.
+    """
+    _id = models.ObjectIdField()
+    key = models.CharField(max_length=50, unique=True, default='platform')
+    users = models.JSONField(default=dict) # {role: count}
+    courses = models.JSONField(default=dict) # {status: count}
+    enrollments = models.JSONField(default=dict) # {status: count}
+    totals = models.JSONField(default=dict) # {'users': n, 'courses': n, 'enrollments': n}
+    active_contracts = models.IntegerField(default=0)
+    estimated = models.BooleanField(default=False) # Some totals came from collection metadata
+    refreshed_at = models.DateTimeField(null=True, blank=True)
+
+    objects = models.DjongoManager()
+
+    def __str__(self):
+        return f"Platform stats ({self.key})"
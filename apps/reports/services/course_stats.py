@@ -0,0 +1,228 @@
+# =================================================================
+# apps/reports/services/course_stats.py
+# -----------------------------------------------------------------
+# KEEPS THE SYSTEM INTEGRATED: This new service maintains one
+# CourseStats document per course. Write paths apply small $inc
+# deltas as they happen; `rebuild_course_stats` recomputes every
+# counter from the source collections to repair any drift. Each
+# instructor's distinct-student count lives in InstructorStats.
+# =================================================================
+
+from django.utils import timezone
+from pymongo import UpdateOne
+
+from apps.enrollment.models import Enrollment
+from apps.interactions.models import DiscussionPost, DiscussionThread
+from apps.learning.models import Course
+from apps.learning.services import to_object_id
+from ..models import CourseStats, InstructorStats, InstructorStudent
+
+COUNTER_FIELDS = ('enrolled_count', 'completed_count', 'progress_sum', 'open_questions_count')
+
+
+def enrollment_deltas(progress=0.0, status=None, sign=1):
+    """ The counter changes caused by adding (sign=1) or removing (sign=-1) one enrollment. """
+    return {
+        'enrolled_count': sign,
+        'completed_count': sign if status == 'completed' else 0,
+        'progress_sum': sign * (progress or 0.0),
+    }
+
+
+def progress_deltas(before, after):
+    """ The counter changes caused by one enrollment moving from `before` to `after`. """
+    completed_before = before.get('status') == 'completed'
+    completed_after = after.get('status') == 'completed'
+    return {
+        'completed_count': int(completed_after) - int(completed_before),
+        'progress_sum': (after.get('progress') or 0.0) - (before.get('progress') or 0.0),
+    }
+
+
+def _increment_operation(course_id, deltas):
+    deltas = {field: value for field, value in deltas.items() if value}
+    if not deltas:
+        return None
+    # Upserting means a course that has no stats document yet still gets counted;
+    # its instructor is filled in on the next course save or rebuild.
+    return UpdateOne(
+        {'course_id': str(course_id)},
+        {
+            '$inc': deltas,
+            '$set': {'updated_at': timezone.now()},
+            '$setOnInsert': {field: 0 for field in COUNTER_FIELDS if field not in deltas},
+        },
+        upsert=True,
+    )
+
+
+def increment_course_stats(course_id, **deltas):
+    """ Atomically applies counter deltas to one course's stats. """
+    operation = _increment_operation(course_id, deltas)
+    if operation is not None:
+        CourseStats.objects.mongo_bulk_write([operation])
+
+
+def sync_course_instructor(course_id, instructor_id):
+    """
+    Records (or updates) the instructor the stats are listed under. When the
+    course changes hands, both instructors' student counts are recomputed.
+    """
+    previous = CourseStats.objects.mongo_find_one_and_update(
+        {'course_id': str(course_id)},
+        {
+            '$set': {'instructor_id': instructor_id, 'updated_at': timezone.now()},
+            '$setOnInsert': {field: 0 for field in COUNTER_FIELDS},
+        },
+        projection={'instructor_id': 1},
+        upsert=True,
+    )
+    previous_instructor_id = previous.get('instructor_id') if previous else None
+    if previous_instructor_id != instructor_id:
+        count_instructor_students({previous_instructor_id, instructor_id} - {None})
+
+
+def _instructor_course_ids(instructor_id):
+    return [str(c['_id']) for c in Course.objects.mongo_find({'instructor_id': instructor_id}, {'_id': 1})]
+
+
+def _increment_instructor_students(instructor_id, delta):
+    InstructorStats.objects.mongo_update_one(
+        {'instructor_id': instructor_id},
+        {'$inc': {'student_count': delta}, '$set': {'updated_at': timezone.now()}},
+        upsert=True,
+    )
+
+
+def count_instructor_students(instructor_ids):
+    """
+    Rebuilds each instructor's student memberships and distinct-student count
+    with one grouped query over the enrollments of their courses.
+    """
+    for instructor_id in instructor_ids:
+        course_ids = _instructor_course_ids(instructor_id)
+        rows = list(Enrollment.objects.mongo_aggregate([
+            {'$match': {'enrollable_type': 'Course', 'enrollable_id': {'$in': course_ids}}},
+            {'$group': {'_id': '$student_id', 'enrollment_count': {'$sum': 1}}},
+        ])) if course_ids else []
+        InstructorStudent.objects.mongo_delete_many({'instructor_id': instructor_id})
+        if rows:
+            InstructorStudent.objects.mongo_insert_many([
+                {'instructor_id': instructor_id, 'student_id': row['_id'], 'enrollment_count': row['enrollment_count']}
+                for row in rows
+            ], ordered=False)
+        InstructorStats.objects.mongo_update_one(
+            {'instructor_id': instructor_id},
+            {'$set': {'student_count': len(rows), 'updated_at': timezone.now()}},
+            upsert=True,
+        )
+
+
+def update_instructor_students(course_id, student_id, sign=1):
+    """
+    Adjusts the instructor's distinct-student count after one enrollment in
+    `course_id` was added (sign=1) or removed (sign=-1). The student's
+    membership document counts their enrollments with the instructor; only
+    the upsert that creates it, or the delete that removes it at zero, moves
+    the count, so concurrent enrollments cannot be missed or counted twice.
+    """
+    instructor_id = get_course_instructor_id(course_id)
+    if instructor_id is None:
+        return
+    membership = {'instructor_id': instructor_id, 'student_id': student_id}
+    if sign > 0:
+        result = InstructorStudent.objects.mongo_update_one(membership, {'$inc': {'enrollment_count': 1}}, upsert=True)
+        if result.upserted_id is not None:
+            _increment_instructor_students(instructor_id, 1)
+        return
+    InstructorStudent.objects.mongo_update_one(membership, {'$inc': {'enrollment_count': -1}})
+    # Only one remover can delete the emptied membership; a concurrent enrollment keeps it.
+    result = InstructorStudent.objects.mongo_delete_one({**membership, 'enrollment_count': {'$lte': 0}})
+    if result.deleted_count:
+        _increment_instructor_students(instructor_id, -1)
+
+
+def get_course_instructor_id(course_id):
+    """ Returns the id of the course's instructor, preferring the small stats document. """
+    stats = CourseStats.objects.mongo_find_one({'course_id': str(course_id)}, {'instructor_id': 1})
+    if stats and stats.get('instructor_id'):
+        return stats['instructor_id']
+    course = Course.objects.mongo_find_one({'_id': to_object_id(course_id)}, {'instructor_id': 1})
+    return course.get('instructor_id') if course else None
+
+
+def mark_thread_answered(thread_id):
+    """
+    Flags a thread as answered and closes its open question. The conditional
+    update makes sure a question is only ever closed once.
+    """
+    thread = DiscussionThread.objects.mongo_find_one_and_update(
+        {'_id': thread_id, 'is_answered': {'$ne': True}},
+        {'$set': {'is_answered': True}},
+        projection={'course_id': 1},
+    )
+    if thread is not None:
+        increment_course_stats(thread['course_id'], open_questions_count=-1)
+
+
+def rebuild_course_stats(course_ids=None):
+    """
+    Recomputes the stats of the given courses (all courses by default) from the
+    enrollments and discussion threads. Returns the number of courses rebuilt.
+    """
+    course_filter = {}
+    if course_ids is not None:
+        course_filter = {'_id': {'$in': [oid for oid in (to_object_id(i) for i in course_ids) if oid]}}
+    courses = {str(c['_id']): c.get('instructor_id') for c in Course.objects.mongo_find(course_filter, {'instructor_id': 1})}
+    if not courses:
+        return 0
+
+    enrollment_stats = {
+        row['_id']: row for row in Enrollment.objects.mongo_aggregate([
+            {'$match': {'enrollable_type': 'Course', 'enrollable_id': {'$in': list(courses)}}},
+            {'$group': {
+                '_id': '$enrollable_id',
+                'enrolled_count': {'$sum': 1},
+                'completed_count': {'$sum': {'$cond': [{'$eq': ['$status', 'completed']}, 1, 0]}},
+                'progress_sum': {'$sum': '$progress'},
+            }},
+        ])
+    }
+
+    operations = []
+    for course_id, instructor_id in courses.items():
+        open_questions = _sync_answered_threads(course_id, instructor_id)
+        row = enrollment_stats.get(course_id, {})
+        operations.append(UpdateOne(
+            {'course_id': course_id},
+            {'$set': {
+                'instructor_id': instructor_id,
+                'enrolled_count': row.get('enrolled_count', 0),
+                'completed_count': row.get('completed_count', 0),
+                'progress_sum': row.get('progress_sum', 0.0),
+                'open_questions_count': open_questions,
+                'updated_at': timezone.now(),
+            }},
+            upsert=True,
+        ))
+    CourseStats.objects.mongo_bulk_write(operations, ordered=False)
+    count_instructor_students({instructor_id for instructor_id in courses.values() if instructor_id})
+    return len(operations)
+
+
+def _sync_answered_threads(course_id, instructor_id):
+    """
+    Sets `is_answered` on the course's threads from the instructor's replies
+    and returns the number of threads that are still open.
+    """
+    thread_ids = [t['_id'] for t in DiscussionThread.objects.mongo_find({'course_id': course_id}, {'_id': 1})]
+    if not thread_ids:
+        return 0
+    answered_ids = DiscussionPost.objects.mongo_distinct(
+        'thread_id', {'thread_id': {'$in': thread_ids}, 'user_id': instructor_id},
+    ) if instructor_id else []
+    DiscussionThread.objects.mongo_update_many({'_id': {'$in': answered_ids}}, {'$set': {'is_answered': True}})
+    DiscussionThread.objects.mongo_update_many(
+        {'_id': {'$in': thread_ids, '$nin': answered_ids}}, {'$set': {'is_answered': False}},
+    )
+    return len(thread_ids) - len(answered_ids)
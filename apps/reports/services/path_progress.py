@@ -0,0 +1,145 @@
+# =================================================================
+# apps/reports/services/path_progress.py
+# -----------------------------------------------------------------
+# KEEPS THE SYSTEM INTEGRATED: This new service computes learning
+# path progress for supervisors. One grouped aggregation over the
+# path's module-course enrollments yields every learner's progress;
+# the summary is cached per path and patched in place whenever a
+# learner's course progress changes.
+# =================================================================
+
+from django.core.cache import cache
+
+from apps.core.cache import bump_versions, get_versions, versioned_key
+from apps.enrollment.models import Enrollment
+from apps.learning.models import LearningPath
+from apps.learning.services import LEARNING_PATHS_SCOPE
+
+PATH_PROGRESS_CACHE_TIMEOUT = 60 * 15 # Patched summaries are fully recomputed this often
+ALL_PATHS_SCOPE = LEARNING_PATHS_SCOPE # Also validates the learning path API list
+
+
+def path_scope(path_id):
+    """ The cache-version scope for everything derived from a learning path. """
+    return f'path:{path_id}'
+
+
+def module_course_ids(path):
+    """ Returns the course ids of a path's modules (LearningPath or raw document), in module order. """
+    modules = path.modules if isinstance(path, LearningPath) else path.get('modules') or []
+    modules = [m if isinstance(m, dict) else {'course_id': m.course_id, 'order': m.order} for m in modules]
+    return [str(m['course_id']) for m in sorted(modules, key=lambda m: m.get('order', 0)) if m.get('course_id')]
+
+
+def _refresh_cohort(summary):
+    """ Recomputes the cohort figures of a summary from its per-student rows. """
+    course_count = len(summary['course_ids'])
+    students = summary['students'].values()
+    summary['learners'] = len(summary['students'])
+    summary['completed_learners'] = sum(
+        1 for student in students if course_count and student['completed_courses'] >= course_count
+    )
+    summary['average_progress'] = (
+        sum(student['progress_sum'] for student in students) / (course_count * summary['learners'])
+        if course_count and summary['learners'] else 0
+    )
+    return summary
+
+
+def aggregate_path_progress(path_id, course_ids):
+    """
+    Computes a path's progress summary with a single grouped query. Every student
+    enrolled in the path or in any of its courses is a learner; a learner's path
+    progress is the mean of their progress over all of the path's courses.
+    """
+    pipeline = [
+        {'$match': {'$or': [
+            {'enrollable_type': 'Course', 'enrollable_id': {'$in': list(course_ids)}},
+            {'enrollable_type': 'LearningPath', 'enrollable_id': str(path_id)},
+        ]}},
+        {'$group': {
+            '_id': '$student_id',
+            'progress_sum': {'$sum': {'$cond': [{'$eq': ['$enrollable_type', 'Course']}, '$progress', 0]}},
+            'completed_courses': {'$sum': {'$cond': [
+                {'$and': [{'$eq': ['$enrollable_type', 'Course']}, {'$eq': ['$status', 'completed']}]}, 1, 0,
+            ]}},
+        }},
+    ]
+    students = {
+        row['_id']: {'progress_sum': row['progress_sum'], 'completed_courses': row['completed_courses']}
+        for row in Enrollment.objects.mongo_aggregate(pipeline)
+    }
+    return _refresh_cohort({'path_id': str(path_id), 'course_ids': list(course_ids), 'students': students})
+
+
+def get_paths_progress(paths):
+    """
+    Returns {path_id: summary} for several paths, reading every cached summary in
+    one round trip and aggregating only the paths that are not cached.
+    """
+    course_ids = {str(path.pk): module_course_ids(path) for path in paths}
+    versions = get_versions([path_scope(path_id) for path_id in course_ids])
+    keys = {versioned_key(path_scope(path_id), 'progress', versions[path_scope(path_id)]): path_id for path_id in course_ids}
+
+    summaries = {keys[key]: summary for key, summary in cache.get_many(list(keys)).items()}
+    missing = {}
+    for key, path_id in keys.items():
+        if path_id not in summaries:
+            summaries[path_id] = aggregate_path_progress(path_id, course_ids[path_id])
+            missing[key] = summaries[path_id]
+    if missing:
+        cache.set_many(missing, PATH_PROGRESS_CACHE_TIMEOUT)
+    return summaries
+
+
+def get_course_path_ids(course_id):
+    """ Returns the ids of the learning paths that include a course (cached). """
+    cache_key = versioned_key(ALL_PATHS_SCOPE, f'course_paths:{course_id}')
+    path_ids = cache.get(cache_key)
+    if path_ids is None:
+        path_ids = [
+            str(document['_id'])
+            for document in LearningPath.objects.mongo_find({'modules.course_id': str(course_id)}, {'_id': 1})
+        ]
+        cache.set(cache_key, path_ids, PATH_PROGRESS_CACHE_TIMEOUT)
+    return path_ids
+
+
+def apply_course_progress_change(course_id, student_id, before, after):
+    """
+    Patches the cached summaries of every path containing the course with one
+    learner's progress change, instead of recomputing the aggregation. Paths that
+    are not cached are left alone; they are aggregated on their next read.
+    Concurrent patches can race, which the summary timeout bounds.
+    """
+    progress_delta = (after.get('progress') or 0) - (before.get('progress') or 0)
+    completed_delta = int(after.get('status') == 'completed') - int(before.get('status') == 'completed')
+    if not progress_delta and not completed_delta:
+        return
+    path_ids = get_course_path_ids(course_id)
+    if not path_ids:
+        return
+    versions = get_versions([path_scope(path_id) for path_id in path_ids])
+    keys = [versioned_key(path_scope(path_id), 'progress', versions[path_scope(path_id)]) for path_id in path_ids]
+
+    patched = cache.get_many(keys)
+    for summary in patched.values():
+        student = summary['students'].setdefault(student_id, {'progress_sum': 0, 'completed_courses': 0})
+        student['progress_sum'] += progress_delta
+        student['completed_courses'] += completed_delta
+        _refresh_cohort(summary)
+    if patched:
+        cache.set_many(patched, PATH_PROGRESS_CACHE_TIMEOUT)
+
+
+def invalidate_path_progress(path_ids=(), course_ids=()):
+    """ Drops the cached summaries of the given paths and of every path containing the given courses. """
+    path_ids = set(map(str, path_ids))
+    for course_id in set(course_ids):
+        path_ids.update(get_course_path_ids(course_id))
+    bump_versions([path_scope(path_id) for path_id in path_ids])
+
+
+def invalidate_learning_path(path_id):
+    """ A path's modules changed: drop its summary and the course -> paths index. """
+    bump_versions([path_scope(path_id), ALL_PATHS_SCOPE])
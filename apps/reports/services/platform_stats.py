@@ -0,0 +1,99 @@
+# =================================================================
+# apps/reports/services/platform_stats.py
+# -----------------------------------------------------------------
+# KEEPS THE SYSTEM INTEGRATED: This new service maintains the
+# platform-wide PlatformStats snapshot shown on the admin dashboard.
+# Writes adjust its counters with $inc; a scheduled refresh rebuilds
+# it with one $group per collection (or, for very large collections,
+# from MongoDB's collection metadata).
+# =================================================================
+
+from django.utils import timezone
+
+from apps.contracts.models import Contract
+from apps.core.mongo import get_collection
+from apps.enrollment.models import Enrollment
+from apps.learning.models import Course
+from apps.users.models import CustomUser
+from ..models import PlatformStats
+
+PLATFORM_STATS_KEY = 'platform'
+
+# Collections above this size keep their incrementally maintained breakdown
+# on an estimated refresh; only their total is re-read from metadata.
+ESTIMATE_THRESHOLD = 1_000_000
+
+# snapshot field -> (model, field the breakdown is grouped by)
+BREAKDOWNS = {
+    'users': (CustomUser, 'role'),
+    'courses': (Course, 'status'),
+    'enrollments': (Enrollment, 'status'),
+}
+
+
+def increment_platform_stats(section, key, amount=1):
+    """
+    Adjusts one breakdown counter and its total, e.g.
+    increment_platform_stats('enrollments', 'completed'). A no-op until the
+    snapshot has been built once, so it never creates a partial snapshot.
+    """
+    if not key or not amount:
+        return
+    PlatformStats.objects.mongo_update_one(
+        {'key': PLATFORM_STATS_KEY},
+        {'$inc': {f'{section}.{key}': amount, f'totals.{section}': amount}},
+    )
+
+
+def move_platform_stats(section, old_key, new_key):
+    """ Moves one item between breakdown buckets, e.g. a course going from draft to published. """
+    if old_key == new_key:
+        return
+    PlatformStats.objects.mongo_update_one(
+        {'key': PLATFORM_STATS_KEY},
+        {'$inc': {f'{section}.{old_key}': -1, f'{section}.{new_key}': 1}},
+    )
+
+
+def increment_active_contracts(amount):
+    if amount:
+        PlatformStats.objects.mongo_update_one({'key': PLATFORM_STATS_KEY}, {'$inc': {'active_contracts': amount}})
+
+
+def _group_counts(model, field):
+    pipeline = [{'$group': {'_id': f'${field}', 'count': {'$sum': 1}}}]
+    return {str(row['_id']): row['count'] for row in get_collection(model).aggregate(pipeline)}
+
+
+def refresh_platform_stats(estimate=False):
+    """
+    Rebuilds the snapshot. With `estimate`, collections larger than
+    ESTIMATE_THRESHOLD are not grouped: their total comes from
+    estimated_document_count() (collection metadata, O(1)) and their existing
+    breakdown is kept. Returns the refreshed snapshot document.
+    """
+    current = PlatformStats.objects.mongo_find_one({'key': PLATFORM_STATS_KEY}) or {}
+    update = {'refreshed_at': timezone.now(), 'estimated': False}
+    totals = {}
+
+    for section, (model, field) in BREAKDOWNS.items():
+        if estimate and section in current:
+            estimated_total = get_collection(model).estimated_document_count()
+            if estimated_total > ESTIMATE_THRESHOLD:
+                totals[section] = estimated_total
+                update['estimated'] = True
+                continue
+        update[section] = _group_counts(model, field)
+        totals[section] = sum(update[section].values())
+
+    update['totals'] = totals
+    update['active_contracts'] = Contract.objects.mongo_count_documents({'is_active': True})
+
+    PlatformStats.objects.mongo_update_one({'key': PLATFORM_STATS_KEY}, {'$set': update}, upsert=True)
+    return PlatformStats.objects.mongo_find_one({'key': PLATFORM_STATS_KEY})
+
+
+def get_platform_stats():
+    """ Returns the snapshot document, building it on first use. """
+    stats = PlatformStats.objects.mongo_find_one({'key': PLATFORM_STATS_KEY})
+    return stats if stats is not None else refresh_platform_stats()
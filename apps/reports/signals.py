@@ -0,0 +1,134 @@
+# =================================================================
+# apps/reports/signals.py
+# -----------------------------------------------------------------
+# KEEPS THE SYSTEM INTEGRATED: Keeps CourseStats in step with the
+# ORM write paths (single enrollments, course saves and discussion
+# activity), and keeps the PlatformStats snapshot in step with user,
+# course, enrollment and contract writes. Raw bulk writes update the
+# stats themselves.
+# =================================================================
+
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from apps.contracts.models import Contract
+from apps.enrollment.models import Enrollment
+from apps.interactions.models import DiscussionThread, DiscussionPost
+from apps.learning.models import Course, LearningPath
+from apps.users.models import CustomUser
+from .models import CourseStats
+from .services.course_stats import (
+    count_instructor_students, enrollment_deltas, get_course_instructor_id, increment_course_stats,
+    mark_thread_answered, sync_course_instructor, update_instructor_students,
+)
+from .services.path_progress import invalidate_learning_path, invalidate_path_progress
+from .services.platform_stats import increment_active_contracts, increment_platform_stats, move_platform_stats
+
+# model -> (PlatformStats section, field whose value picks the bucket)
+PLATFORM_BREAKDOWNS = {
+    CustomUser: ('users', 'role'),
+    Course: ('courses', 'status'),
+    Enrollment: ('enrollments', 'status'),
+}
+
+@receiver(post_save, sender=Enrollment)
+def count_new_enrollment(sender, instance, created, **kwargs):
+    if created and instance.enrollable_type == 'Course':
+        increment_course_stats(instance.enrollable_id, **enrollment_deltas(instance.progress, instance.status))
+        update_instructor_students(instance.enrollable_id, instance.student_id)
+
+@receiver(post_delete, sender=Enrollment)
+def uncount_deleted_enrollment(sender, instance, **kwargs):
+    if instance.enrollable_type == 'Course':
+        increment_course_stats(instance.enrollable_id, **enrollment_deltas(instance.progress, instance.status, sign=-1))
+        update_instructor_students(instance.enrollable_id, instance.student_id, sign=-1)
+
+@receiver(post_save, sender=Course)
+def sync_stats_instructor(sender, instance, **kwargs):
+    sync_course_instructor(instance.pk, instance.instructor_id)
+
+@receiver(post_delete, sender=Course)
+def delete_course_stats(sender, instance, **kwargs):
+    CourseStats.objects.filter(course_id=str(instance.pk)).delete()
+    if instance.instructor_id:
+        count_instructor_students([instance.instructor_id])
+
+@receiver(post_save, sender=DiscussionThread)
+def count_new_question(sender, instance, created, **kwargs):
+    if created and not instance.is_answered:
+        increment_course_stats(instance.course_id, open_questions_count=1)
+
+@receiver(post_delete, sender=DiscussionThread)
+def uncount_deleted_question(sender, instance, **kwargs):
+    if not instance.is_answered:
+        increment_course_stats(instance.course_id, open_questions_count=-1)
+
+@receiver(post_save, sender=DiscussionPost)
+def close_answered_question(sender, instance, created, **kwargs):
+    """ A reply from the course's instructor answers the thread's question. """
+    if created and instance.user_id == get_course_instructor_id(instance.thread.course_id):
+        mark_thread_answered(instance.thread_id)
+
+# --- Learning path progress ---
+
+@receiver(post_save, sender=Enrollment)
+@receiver(post_delete, sender=Enrollment)
+def invalidate_path_learners(sender, instance, created=True, **kwargs):
+    """ A new or removed enrollment changes the learners of the affected paths. """
+    if not created: # post_delete sends no `created`, so deletions always get here
+        return
+    if instance.enrollable_type == 'Course':
+        invalidate_path_progress(course_ids=[instance.enrollable_id])
+    else:
+        invalidate_path_progress(path_ids=[instance.enrollable_id])
+
+@receiver(post_save, sender=LearningPath)
+@receiver(post_delete, sender=LearningPath)
+def invalidate_path_summary(sender, instance, **kwargs):
+    invalidate_learning_path(instance.pk)
+
+# --- Platform stats ---
+
+@receiver(pre_save, sender=CustomUser)
+@receiver(pre_save, sender=Course)
+@receiver(pre_save, sender=Enrollment)
+@receiver(pre_save, sender=Contract)
+def remember_stats_bucket(sender, instance, update_fields=None, **kwargs):
+    """
+    Reads the stored bucket value of an existing row just before it is saved,
+    so the post_save receivers can move its count. Only that one field is read,
+    and nothing is read for a save that leaves the field alone (such as the
+    last_login update on every login).
+    """
+    field = 'is_active' if sender is Contract else PLATFORM_BREAKDOWNS[sender][1]
+    if instance._state.adding or (update_fields is not None and field not in update_fields):
+        instance._stats_bucket = getattr(instance, field)
+        return
+    instance._stats_bucket = sender._default_manager.filter(pk=instance.pk).values_list(field, flat=True).first()
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_save, sender=Course)
+@receiver(post_save, sender=Enrollment)
+def count_platform_item(sender, instance, created, **kwargs):
+    section, field = PLATFORM_BREAKDOWNS[sender]
+    value = getattr(instance, field)
+    if created:
+        increment_platform_stats(section, value)
+    else:
+        move_platform_stats(section, instance._stats_bucket, value)
+
+@receiver(post_delete, sender=CustomUser)
+@receiver(post_delete, sender=Course)
+@receiver(post_delete, sender=Enrollment)
+def uncount_platform_item(sender, instance, **kwargs):
+    section, field = PLATFORM_BREAKDOWNS[sender]
+    increment_platform_stats(section, getattr(instance, field), -1)
+
+@receiver(post_save, sender=Contract)
+def count_active_contract(sender, instance, created, **kwargs):
+    was_active = False if created else bool(instance._stats_bucket)
+    increment_active_contracts(int(instance.is_active) - int(was_active))
+
+@receiver(post_delete, sender=Contract)
+def uncount_active_contract(sender, instance, **kwargs):
+    if instance.is_active:
+        increment_active_contracts(-1)
@@ -0,0 +1,10 @@
+from celery import shared_task
+from .services.platform_stats import refresh_platform_stats
+
+@shared_task
+def refresh_platform_stats_task(estimate=False):
+    """
+    Scheduled job that rebuilds the admin dashboard's PlatformStats snapshot,
+    correcting any drift in the counters maintained on writes.
+    """
+    refresh_platform_stats(estimate=estimate)
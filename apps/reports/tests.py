@@ -0,0 +1,50 @@
+from django.test import SimpleTestCase
+from apps.enrollment.services import compute_progress
+from apps.reports.services.course_stats import enrollment_deltas, progress_deltas
+from apps.reports.services.path_progress import _refresh_cohort
+
+class CourseStatsDeltaTest(SimpleTestCase):
+    """
+    Test suite for the incremental CourseStats counter deltas.
+    """
+
+    def test_enrollment_deltas(self):
+        self.assertEqual(enrollment_deltas(), {'enrolled_count': 1, 'completed_count': 0, 'progress_sum': 0.0})
+        self.assertEqual(
+            enrollment_deltas(100.0, 'completed', sign=-1),
+            {'enrolled_count': -1, 'completed_count': -1, 'progress_sum': -100.0},
+        )
+
+    def test_progress_deltas_on_completion(self):
+        before = {'progress': 75.0, 'status': 'in_progress'}
+        after = {'progress': 100, 'status': 'completed'}
+        self.assertEqual(progress_deltas(before, after), {'completed_count': 1, 'progress_sum': 25.0})
+
+    def test_repeated_completion_changes_nothing(self):
+        state = {'progress': 50.0, 'status': 'in_progress'}
+        self.assertEqual(progress_deltas(state, dict(state)), {'completed_count': 0, 'progress_sum': 0.0})
+
+    def test_compute_progress_matches_server_rules(self):
+        self.assertEqual(compute_progress(1, 3, 'in_progress'), (33.33, 'in_progress'))
+        self.assertEqual(compute_progress(4, 4, 'in_progress'), (100, 'completed'))
+        self.assertEqual(compute_progress(0, 0, 'in_progress'), (0, 'in_progress'))
+
+class PathProgressCohortTest(SimpleTestCase):
+    """
+    Test suite for the cohort figures of a learning path summary.
+    """
+
+    def test_cohort_figures(self):
+        summary = _refresh_cohort({'path_id': 'p', 'course_ids': ['a', 'b'], 'students': {
+            1: {'progress_sum': 200, 'completed_courses': 2},
+            2: {'progress_sum': 50, 'completed_courses': 0},
+            3: {'progress_sum': 0, 'completed_courses': 0}, # Enrolled in the path only
+        }})
+        self.assertEqual(summary['learners'], 3)
+        self.assertEqual(summary['completed_learners'], 1)
+        self.assertAlmostEqual(summary['average_progress'], 250 / 6)
+
+    def test_empty_path(self):
+        summary = _refresh_cohort({'path_id': 'p', 'course_ids': [], 'students': {1: {'progress_sum': 0, 'completed_courses': 0}}})
+        self.assertEqual(summary['completed_learners'], 0)
+        self.assertEqual(summary['average_progress'], 0)
@@ -36,7 +36,7 @@ class ReportDashboardView(LoginRequiredMixin, UserPassesTestMixin, TemplateView)
         context["title"] = "Reporting Dashboard"
         # Provide real data to the template for filter dropdowns
         context["students"] = CustomUser.objects.filter(role=CustomUser.Roles.STUDENT)
-        context["courses"] = Course.objects.all()
+        context["courses"] = Course.objects.summaries() # Titles only; no lesson content
         return context
 
     def post(self, request: HttpRequest, *args, **kwargs) -> HttpResponse:
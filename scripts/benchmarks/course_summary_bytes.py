@@ -0,0 +1,113 @@
+"""
+Benchmark: bytes read from MongoDB per course fetch.
+
+Compares the BSON size of a full course document (every lesson's content_data,
+including whole quizzes) with the course summary projection used by
+Course.objects.summaries(), and with the single-lesson $elemMatch fetch that
+LessonDetailView now uses to load the lesson being rendered.
+No database is needed; the course is synthetic.
+
+Usage (from the project root):
+    python scripts/benchmarks/course_summary_bytes.py --lessons 200 --quiz-every 5 --questions 20
+"""
+
+import argparse
+import datetime
+import os
+import sys
+
+import bson
+from bson import ObjectId
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'academy_suite.settings')
+
+import django  # noqa: E402
+django.setup()
+
+from apps.learning.services import COURSE_SUMMARY_PROJECTION  # noqa: E402
+
+
+def build_lesson(order, is_quiz, question_count):
+    if is_quiz:
+        content_data = {'questions': [
+            {
+                '_id': ObjectId(),
+                'question_text': f'Question {q + 1} of lesson {order}: which statement is correct?',
+                'answers': [
+                    {'_id': ObjectId(), 'answer_text': f'Answer option {a + 1}', 'is_correct': a == 0}
+                    for a in range(4)
+                ],
+            }
+            for q in range(question_count)
+        ]}
+    else:
+        content_data = {
+            'url': f'https://videos.example.com/lesson-{order}.mp4',
+            'description': 'Lesson notes. ' * 60,
+        }
+    return {
+        '_id': ObjectId(),
+        'title': f'Lesson {order}',
+        'order': order,
+        'content_type': 'quiz' if is_quiz else 'video',
+        'content_data': content_data,
+        'is_previewable': order == 1,
+    }
+
+
+def build_course(lesson_count, quiz_every, question_count):
+    return {
+        '_id': ObjectId(),
+        'title': 'Synthetic course',
+        'slug': 'synthetic-course',
+        'description': 'A generated course used for benchmarking. ' * 10,
+        'instructor_id': 1,
+        'category': 'Benchmarks',
+        'status': 'published',
+        'cover_image_url': '',
+        'created_at': datetime.datetime.now(),
+        'lessons': [
+            build_lesson(order, quiz_every and order % quiz_every == 0, question_count)
+            for order in range(1, lesson_count + 1)
+        ],
+    }
+
+
+def project(document, projection):
+    """ Applies an inclusion projection with 'field' and 'array.field' paths, like MongoDB does. """
+    projected = {'_id': document['_id']}
+    nested = {}
+    for path in projection:
+        field, _, subfield = path.partition('.')
+        if subfield:
+            nested.setdefault(field, []).append(subfield)
+        elif field in document:
+            projected[field] = document[field]
+    for field, subfields in nested.items():
+        projected[field] = [{key: item[key] for key in subfields if key in item} for item in document.get(field, [])]
+    return projected
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--lessons', type=int, default=200)
+    parser.add_argument('--quiz-every', type=int, default=5, help="Every Nth lesson is a quiz (0 for none).")
+    parser.add_argument('--questions', type=int, default=20, help="Questions per quiz.")
+    args = parser.parse_args()
+
+    course = build_course(args.lessons, args.quiz_every, args.questions)
+    full = len(bson.encode(course))
+    summary = len(bson.encode(project(course, COURSE_SUMMARY_PROJECTION)))
+    lesson = max(course['lessons'], key=lambda l: len(bson.encode(l)))
+    single_lesson = len(bson.encode({'_id': course['_id'], 'lessons': [lesson]}))
+
+    print(f"Course with {args.lessons} lessons (every {args.quiz_every}th a {args.questions}-question quiz)\n")
+    print(f"{'full document':<34} {full:>10,} bytes")
+    print(f"{'summary projection':<34} {summary:>10,} bytes  ({100 * (1 - summary / full):.1f}% less)")
+    print(f"{'largest single lesson ($elemMatch)':<34} {single_lesson:>10,} bytes")
+    print(f"\nLesson page: full document {full:,} bytes -> summary + one lesson {summary + single_lesson:,} bytes")
+
+
+if __name__ == '__main__':
+    main()
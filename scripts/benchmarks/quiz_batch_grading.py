@@ -0,0 +1,87 @@
+"""
+Benchmark: grading a batch of synced quiz attempts.
+
+Compares the per-request grading loop that submit_quiz used to run (scan the
+lesson's questions and answers for every submission) with the batch path,
+which compiles one answer key per quiz and grades with dictionary lookups.
+No database is needed; the quiz and attempts are synthetic.
+
+Usage (from the project root):
+    python scripts/benchmarks/quiz_batch_grading.py --attempts 5000 --questions 50
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+from bson import ObjectId
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'academy_suite.settings')
+
+import django  # noqa: E402
+django.setup()
+
+from apps.learning.services import compile_answer_key, grade_quiz  # noqa: E402
+
+
+def build_quiz(question_count, answers_per_question=4):
+    questions = []
+    for _ in range(question_count):
+        answers = [{'_id': ObjectId(), 'answer_text': 'option', 'is_correct': False} for _ in range(answers_per_question)]
+        random.choice(answers)['is_correct'] = True
+        questions.append({'_id': ObjectId(), 'question_text': 'question', 'answers': answers})
+    return {'questions': questions}
+
+
+def build_attempts(content_data, attempt_count):
+    attempts = []
+    for _ in range(attempt_count):
+        attempts.append({
+            f'question_{i+1}': str(random.choice(question['answers'])['_id'])
+            for i, question in enumerate(content_data['questions'])
+        })
+    return attempts
+
+
+def grade_legacy(content_data, answers):
+    questions = content_data.get('questions', [])
+    correct_answers_count = 0
+    for i, question_data in enumerate(questions):
+        submitted_answer_id = answers.get(f'question_{i+1}')
+        correct_answer = next((ans for ans in question_data['answers'] if ans.get('is_correct')), None)
+        if correct_answer and submitted_answer_id == str(correct_answer.get('_id')):
+            correct_answers_count += 1
+    return round((correct_answers_count / len(questions)) * 100, 2) if questions else 100
+
+
+def run(label, grade, attempts):
+    started = time.perf_counter()
+    scores = [grade(answers) for answers in attempts]
+    elapsed = time.perf_counter() - started
+    print(f"{label:<28} {elapsed * 1000:9.1f} ms  {len(attempts) / elapsed:12,.0f} attempts/s")
+    return scores
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--attempts', type=int, default=5000)
+    parser.add_argument('--questions', type=int, default=50)
+    args = parser.parse_args()
+
+    content_data = build_quiz(args.questions)
+    attempts = build_attempts(content_data, args.attempts)
+    print(f"Grading {args.attempts} attempts of a {args.questions}-question quiz\n")
+
+    legacy_scores = run("per-request scan", lambda answers: grade_legacy(content_data, answers), attempts)
+
+    answer_key = compile_answer_key(content_data)
+    batch_scores = run("compiled answer key", lambda answers: grade_quiz(answer_key, answers), attempts)
+
+    assert legacy_scores == batch_scores, "Both grading paths must agree."
+
+
+if __name__ == '__main__':
+    main()
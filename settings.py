@@ -25,6 +25,13 @@ CELERY_BROKER_URL=${REDIS_URL}  # Celery can use the same Redis URL
 # Fill these with your actual n8n webhook URLs
 N8N_ENROLLMENT_CREATED_WEBHOOK_URL="http://localhost:5678/webhook/enrollment-created"
 N8N_QUESTION_POSTED_WEBHOOK_URL="http://localhost:5678/webhook/question-posted" # <-- ADDED LINE
+N8N_BULK_ENROLLMENT_WEBHOOK_URL="http://localhost:5678/webhook/enrollment-batch-created"
+
+# --- Admin Dashboard Statistics ---
+# How often the platform stats snapshot is rebuilt, and whether very large
+# collections are counted from collection metadata (estimated) instead.
+PLATFORM_STATS_REFRESH_SECONDS=900
+PLATFORM_STATS_ESTIMATE=False
 
 # Replace with your actual key from OpenRouter.ai
 OPENROUTER_API_KEY="sk-or-v1-your-secret-api-key-from-openrouter-here"